@@ -3,6 +3,28 @@ import pandas as pd
 import numpy as np
 import plotly.express as px
 import math
+import os
+import io
+
+from modelo_parametrico import calcular_costo_parametrico, calcular_costo_lote
+from indice_escalones import max_aspirantes_presupuesto
+from simulacion_costos import simular_costos
+from sensibilidad_costos import contribuciones_grilla, curvas_elasticidad, tornado
+from tarifario import obtener_tarifario
+from red_transporte import tabla_despacho
+from historico_costos import RUTA_HISTORICO, cargar_historico
+from evaluacion_modelos import cargar_o_evaluar
+from backtest_modelo import TODAS, cargar_o_backtest
+from intervalos_conformales import NIVEL_DEFECTO, cargar_o_calibrar, intervalo
+from regresion_segmentada import ajustar_segmentada, predecir_segmentada
+from asignacion_ciudades import optimizar_asignacion
+from asignacion_salones import asignar_salones, cargar_catalogo, catalogo_ejemplo
+from portafolio_concursos import calcular_portafolio
+from proyeccion_tarifas import TASAS_DEFECTO, anio_base, indices_constantes, reprecificar_concursos
+from curvas_costo import (
+    MAX_ASPIRANTES_CURVA, RUBROS, UMBRAL_WEBGL, curva_costo, descomposicion_rubros, puntos_quiebre, rango_curva,
+    reducir_para_grafico,
+)
 
 # Configuración de la página
 st.set_page_config(
@@ -131,82 +153,259 @@ st.markdown(
 )
 
 # ==============================================================================
-# LÓGICA DEL MODELO PARAMÉTRICO (Backend)
+# DATOS Y GRÁFICOS CACHEADOS (EDA)
 # ==============================================================================
-def calcular_costo_parametrico(n_aspirantes, ciudad, tipo_prueba):
+# Tope de entradas por función cacheada: cada combinación de widgets y cada
+# contenido del tarifario agrega una, y sin tope el servidor crece sin límite.
+ENTRADAS_CACHE = 32
+ENTRADAS_CACHE_GRANDES = 4  # curvas de MAX_ASPIRANTES_CURVA puntos, grillas de sensibilidad, histórico re-cotizado
+
+@st.cache_data(max_entries=ENTRADAS_CACHE)
+def generar_datos_eda(n_min=100, n_max=5000, paso=50, ciudad="Bogotá", tipo_prueba="Escrita", semilla=2025,
+                      version_tarifario=None, huella_tarifario=None):
     """
-    Motor de cálculo basado en reglas de negocio y tarifarios definidos.
+    Genera los datos simulados del "Escalón" para el EDA.
+
+    Usa una semilla fija para que el ruido (y por tanto el gráfico) sea estable
+    entre re-ejecuciones. La versión y la huella del tarifario forman parte de
+    la llave del caché, así que una recarga de tarifas regenera los datos.
     """
-    # 1. REGLAS DE NEGOCIO (Logística)
-    # ---------------------------------------------------------
-    n_sitios = math.ceil(n_aspirantes / 500)
-    
-    factor_salon = 25 # Personas por salón
-    n_salones = math.ceil(n_aspirantes / factor_salon)
-    
-    # Personal
-    n_delegados_sitio = n_sitios
-    n_jefes_salon = n_salones * (2 if tipo_prueba == "Virtual" else 1)
-    n_dactiloscopistas = math.ceil(n_salones / 4)
-    n_coord_aulas = math.ceil(n_salones / 6)
-    n_aseo = math.ceil(n_salones / 6)
-    n_seguridad = n_sitios * 2
-    
-    total_staff = n_delegados_sitio + n_jefes_salon + n_dactiloscopistas + n_coord_aulas + n_aseo + n_seguridad
-
-    # Materiales (Kits)
-    n_kits_salon = n_salones
-    n_kits_dactilo = n_dactiloscopistas
-    n_kits_aseo = n_aseo
-
-    # 2. TARIFARIO (Financiero) - Precios base aproximados
-    # ---------------------------------------------------------
-    precios = {
-        'Delegado': 300000, 'Jefe Salón': 200000, 'Dactiloscopista': 214298,
-        'Coord. Aulas': 250000, 'Aseo': 207420, 'Seguridad': 207420,
-        'Kit Salón': 18183, 'Kit Dactilo': 40669, 'Kit Aseo': 95000
-    }
-    
-    # Lógica de rangos para impresión (Economía de escala)
-    if n_aspirantes <= 1000:
-        precio_impresion = 5705
-    elif n_aspirantes <= 1500:
-        precio_impresion = 4909
-    else:
-        precio_impresion = 4500
-    
-    # Lógica de transporte (Geográfica simplificada)
-    factor_ciudad = 1.0 if ciudad == "Bogotá" else 1.8
-    costo_transporte_base = 50000 * n_sitios * factor_ciudad
+    df_sim = pd.DataFrame({'Aspirantes': range(n_min, n_max, paso)})
+    # Aplicamos una lógica simplificada para generar el costo y graficarlo
+    df_sim['Costo_Total'] = calcular_costo_lote(df_sim['Aspirantes'].to_numpy(), ciudad, tipo_prueba,
+                                                version_tarifario)['financiero']['Total']
+    # Añadimos un poco de ruido aleatorio para simular datos reales imperfectos
+    rng = np.random.default_rng(semilla)
+    df_sim['Costo_Real_Simulado'] = df_sim['Costo_Total'] * rng.uniform(0.95, 1.05, len(df_sim))
+    return df_sim
+
+
+@st.cache_data(max_entries=ENTRADAS_CACHE)
+def construir_figura_eda(df_sim, columna_costo='Costo_Real_Simulado', color=None):
+    """Dispersión con tendencia OLS; el ajuste de statsmodels se hace una sola vez por conjunto de datos."""
+    fig_scatter = px.scatter(df_sim, x='Aspirantes', y=columna_costo, color=color,
+                             title="Correlación Aspirantes vs. Costo Total",
+                             labels={columna_costo: 'Costo Total (COP)'},
+                             trendline="ols", trendline_scope="overall",
+                             render_mode="webgl" if len(df_sim) > UMBRAL_WEBGL else "auto",
+                             color_discrete_sequence=[ESAP_PALETTE['primary'], ESAP_PALETTE['accent'],
+                                                      ESAP_PALETTE['secondary']])
+    fig_scatter.update_layout(
+        font=dict(family="'Segoe UI', Tahoma, Geneva, Verdana, sans-serif", color=ESAP_PALETTE['neutral_dark']),
+        title=dict(font=dict(color=ESAP_PALETTE['primary'], size=18)),
+        plot_bgcolor='#ffffff',
+        paper_bgcolor=ESAP_PALETTE['neutral_light']
+    )
+    return fig_scatter
+
+
+@st.cache_data(max_entries=ENTRADAS_CACHE)
+def construir_figura_segmentada(df_eda, columna_costo, version_tarifario, huella_tarifario):
+    """Curva por tramos aprendida del histórico junto a la del modelo paramétrico (Bogotá, Escrita)."""
+    # Los tramos de impresión del tarifario son cortes conocidos; el resto se aprende de los datos
+    modelo = ajustar_segmentada(df_eda['Aspirantes'].to_numpy(), df_eda[columna_costo].to_numpy(),
+                                cortes_conocidos=obtener_tarifario(version_tarifario)['limites_impresion'] + 1)
+    malla = np.arange(df_eda['Aspirantes'].min(), df_eda['Aspirantes'].max() + 1)
+    df_curvas = pd.concat([
+        pd.DataFrame({'Aspirantes': malla, 'Costo': predecir_segmentada(modelo, malla),
+                      'Curva': f"Regresión segmentada ({modelo['n_segmentos']} tramos)"}),
+        pd.DataFrame({'Aspirantes': malla,
+                      'Costo': calcular_costo_lote(malla, tarifario=version_tarifario)['financiero']['Total'],
+                      'Curva': "Modelo paramétrico"}),
+    ], ignore_index=True)
+
+    fig = px.line(df_curvas, x='Aspirantes', y='Costo', color='Curva', line_shape='hv',
+                  title="Regresión Segmentada vs. Modelo Paramétrico",
+                  labels={'Costo': 'Costo Total (COP)'},
+                  color_discrete_sequence=[ESAP_PALETTE['accent'], ESAP_PALETTE['primary']])
+    for corte in modelo['cortes']:
+        fig.add_vline(x=corte, line_dash="dot", line_color=ESAP_PALETTE['neutral_mid'], opacity=0.5)
+    fig.update_layout(
+        font=dict(family="'Segoe UI', Tahoma, Geneva, Verdana, sans-serif", color=ESAP_PALETTE['neutral_dark']),
+        title=dict(font=dict(color=ESAP_PALETTE['primary'], size=18)),
+        plot_bgcolor='#ffffff',
+        paper_bgcolor=ESAP_PALETTE['neutral_light'],
+        legend=dict(orientation="h", yanchor="bottom", y=-0.3)
+    )
+    return fig, modelo
+
+
+@st.cache_data(max_entries=ENTRADAS_CACHE_GRANDES)
+def precalcular_curva(n_max, ciudad, tipo_prueba, version_tarifario, huella_tarifario):
+    """Costo exacto para N = 0..n_max; cada rango del gráfico es solo un corte de este arreglo."""
+    return curva_costo(n_max, ciudad, tipo_prueba, version_tarifario)
+
+
+@st.cache_data(max_entries=ENTRADAS_CACHE)
+def construir_figura_curva(desde, hasta, ciudad, tipo_prueba, version_tarifario, huella_tarifario):
+    """Curva exacta en el rango pedido; con muchos puntos se reduce con LTTB y se dibuja con WebGL."""
+    costo = precalcular_curva(MAX_ASPIRANTES_CURVA, ciudad, tipo_prueba, version_tarifario, huella_tarifario)
+    x, y, usar_webgl = reducir_para_grafico(*rango_curva(costo, desde, hasta))
+    fig = px.line(x=x, y=y, line_shape='hv', render_mode="webgl" if usar_webgl else "svg",
+                  title=f"Curva Exacta de Costo ({ciudad}, {tipo_prueba})",
+                  labels={'x': 'Aspirantes', 'y': 'Costo Total (COP)'},
+                  color_discrete_sequence=[ESAP_PALETTE['primary']])
+    fig.update_layout(
+        font=dict(family="'Segoe UI', Tahoma, Geneva, Verdana, sans-serif", color=ESAP_PALETTE['neutral_dark']),
+        title=dict(font=dict(color=ESAP_PALETTE['primary'], size=18)),
+        plot_bgcolor='#ffffff',
+        paper_bgcolor=ESAP_PALETTE['neutral_light']
+    )
+    return fig, hasta - desde + 1, len(x)
+
+
+@st.cache_data(max_entries=ENTRADAS_CACHE)
+def construir_figura_rubros(desde, hasta, ciudades, modalidades, version_tarifario, huella_tarifario):
+    """Área apilada de los rubros en [desde, hasta]; una sola evaluación vectorizada por combinación de filtros."""
+    df_rubros = descomposicion_rubros(desde, hasta, ciudades, modalidades, version_tarifario)
+    df_largo = df_rubros.melt(id_vars=['Aspirantes', 'Ciudad', 'Modalidad'], value_vars=RUBROS,
+                              var_name='Rubro', value_name='Costo')
+    fig = px.area(df_largo, x='Aspirantes', y='Costo', color='Rubro', line_shape='hv',
+                  facet_col='Ciudad' if len(ciudades) > 1 else None,
+                  facet_row='Modalidad' if len(modalidades) > 1 else None,
+                  title="Descomposición del Costo por Rubro",
+                  labels={'Costo': 'Costo (COP)'},
+                  color_discrete_sequence=[ESAP_PALETTE['primary'], ESAP_PALETTE['secondary'],
+                                           ESAP_PALETTE['accent'], ESAP_PALETTE['orange']])
+    for _, quiebre in puntos_quiebre(desde, hasta, version_tarifario).iterrows():
+        es_tramo = quiebre['Evento'].startswith("Tramo")
+        fig.add_vline(x=quiebre['Aspirantes'], line_dash="dash" if es_tramo else "dot",
+                      line_color=ESAP_PALETTE['accent'] if es_tramo else ESAP_PALETTE['neutral_mid'], opacity=0.6,
+                      annotation_text=quiebre['Evento'] if es_tramo else None, annotation_position="top left")
+    fig.update_layout(
+        font=dict(family="'Segoe UI', Tahoma, Geneva, Verdana, sans-serif", color=ESAP_PALETTE['neutral_dark']),
+        title=dict(font=dict(color=ESAP_PALETTE['primary'])),
+        plot_bgcolor='#ffffff',
+        paper_bgcolor=ESAP_PALETTE['neutral_light']
+    )
+    return fig
+
+
+@st.cache_data(max_entries=ENTRADAS_CACHE_GRANDES)
+def calcular_sensibilidad(n_max, variacion, version_tarifario, huella_tarifario=None):
+    """Tornado y curvas de elasticidad sobre la grilla completa (un solo cálculo por contenido del tarifario)."""
+    grilla = contribuciones_grilla(np.arange(1, n_max + 1), tarifario=version_tarifario)
+    curvas = pd.concat(
+        [curvas_elasticidad(grilla, ciudad, modalidad).assign(Ciudad=ciudad, Modalidad=modalidad)
+         for ciudad in grilla["ciudades"] for modalidad in grilla["modalidades"]],
+        ignore_index=True,
+    )
+    return tornado(grilla, variacion), curvas
+
+
+@st.cache_data(max_entries=ENTRADAS_CACHE_GRANDES)
+def construir_figuras_sensibilidad(n_max, variacion_pct, ciudad, tipo_prueba, version_tarifario, huella_tarifario):
+    """Figuras de tornado y elasticidad; los reruns de otros widgets reutilizan las ya construidas."""
+    df_tornado, df_curvas = calcular_sensibilidad(n_max, variacion_pct / 100, version_tarifario, huella_tarifario)
+
+    df_barras = df_tornado.melt(id_vars='Insumo', value_vars=['Impacto -%', 'Impacto +%'],
+                                var_name='Escenario', value_name='Cambio en el Total (%)')
+    fig_tornado = px.bar(df_barras, x='Cambio en el Total (%)', y='Insumo', color='Escenario',
+                         orientation='h', barmode='relative',
+                         title=f"Tornado: ±{variacion_pct}% en cada tarifa",
+                         category_orders={'Insumo': df_tornado['Insumo'].tolist()},
+                         color_discrete_sequence=[ESAP_PALETTE['primary'], ESAP_PALETTE['accent']])
+    fig_tornado.update_layout(
+        font=dict(family="'Segoe UI', Tahoma, Geneva, Verdana, sans-serif"),
+        title=dict(font=dict(color=ESAP_PALETTE['primary'])),
+        plot_bgcolor='#ffffff',
+        paper_bgcolor=ESAP_PALETTE['neutral_light']
+    )
+
+    df_curva_sel = df_curvas[(df_curvas['Ciudad'] == ciudad) & (df_curvas['Modalidad'] == tipo_prueba)]
+    fig_elasticidad = px.line(df_curva_sel, x='Aspirantes', y='Elasticidad', color='Insumo',
+                              title=f"Elasticidad del Costo Total por Tarifa ({ciudad}, {tipo_prueba})")
+    fig_elasticidad.update_layout(
+        font=dict(family="'Segoe UI', Tahoma, Geneva, Verdana, sans-serif"),
+        title=dict(font=dict(color=ESAP_PALETTE['primary'])),
+        plot_bgcolor='#ffffff',
+        paper_bgcolor=ESAP_PALETTE['neutral_light']
+    )
+    return fig_tornado, fig_elasticidad
+
+
+@st.cache_data(max_entries=ENTRADAS_CACHE_GRANDES)
+def construir_proyeccion(aspirantes, ciudad, tipo_prueba, df_indices, version_tarifario, huella_tarifario,
+                         modificacion_historico):
+    """
+    Cotización actual por año y figura de costo proyectado por rubro.
+
+    Con histórico en disco la figura re-cotiza todos sus concursos;
+    `modificacion_historico` invalida el caché si cambia el libro. Devuelve
+    (costos por año, concursos históricos o None, figura).
+    """
+    tarifario = obtener_tarifario(version_tarifario)
+    cotizacion = reprecificar_concursos(
+        pd.DataFrame({'Aspirantes': [aspirantes], 'Ciudad': [ciudad], 'Modalidad': [tipo_prueba]}),
+        df_indices, tarifario=tarifario)
+    try:
+        df_historico = cargar_historico()
+    except (FileNotFoundError, ValueError):
+        df_historico = None
+    por_rubro = (cotizacion if df_historico is None
+                 else reprecificar_concursos(df_historico, df_indices, tarifario=tarifario))['por_rubro']
+    df_rubros_anio = por_rubro.drop(columns='Total').reset_index().melt(id_vars='Año', var_name='Rubro',
+                                                                         value_name='Costo')
+    fig_proyeccion = px.bar(df_rubros_anio, x='Año', y='Costo', color='Rubro',
+                            title="Costo Proyectado por Rubro", labels={'Costo': 'Costo (COP)'},
+                            color_discrete_sequence=[ESAP_PALETTE['primary'], ESAP_PALETTE['secondary'],
+                                                     ESAP_PALETTE['accent'], ESAP_PALETTE['orange']])
+    fig_proyeccion.update_layout(
+        font=dict(family="'Segoe UI', Tahoma, Geneva, Verdana, sans-serif"),
+        title=dict(font=dict(color=ESAP_PALETTE['primary'])),
+        plot_bgcolor='#ffffff',
+        paper_bgcolor=ESAP_PALETTE['neutral_light']
+    )
+    return cotizacion['costos'].iloc[0], None if df_historico is None else len(df_historico), fig_proyeccion
+
+
+@st.cache_data(max_entries=ENTRADAS_CACHE)
+def obtener_calibracion(version_tarifario, huella_tarifario, modificacion_historico):
+    """Cuantiles conformales del histórico; el caché se invalida si cambia el libro o el contenido del tarifario."""
+    try:
+        return cargar_o_calibrar(cargar_historico(), version_tarifario)[0]
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def obtener_catalogo_sitios(contenido=None, nombre=None):
+    """Catálogo subido por el usuario (bytes y nombre del archivo), el local o uno de ejemplo."""
+    if contenido is not None:
+        return cargar_catalogo(io.BytesIO(contenido), os.path.splitext(nombre)[1]), "archivo cargado"
+    try:
+        return cargar_catalogo(), "catálogo local"
+    except FileNotFoundError:
+        return pd.concat([catalogo_ejemplo(300, ciudad=c, semilla=i) for i, c in enumerate(
+            ["Bogotá", "Medellín", "Cali", "Barranquilla", "Bucaramanga", "Quibdó", "San Andrés"])],
+            ignore_index=True), "catálogo de ejemplo"
+
+
+@st.cache_data(max_entries=ENTRADAS_CACHE)
+def planificar_salones(aspirantes, tipo_prueba, ciudad, version_tarifario, huella_tarifario, contenido_catalogo=None,
+                       nombre_catalogo=None):
+    """Asignación a salones reales; el caché se indexa por el contenido del catálogo subido, no por su nombre."""
+    catalogo, origen = obtener_catalogo_sitios(contenido_catalogo, nombre_catalogo)
+    plan = asignar_salones(aspirantes, catalogo, tipo_prueba, ciudad, version_tarifario)
+    return plan, origen, len(catalogo)
+
+
+@st.cache_data(max_entries=ENTRADAS_CACHE)
+def cotizar_portafolio(df_portafolio, version_tarifario, huella_tarifario):
+    """Costo conjunto y por separado del portafolio; solo se recalcula si cambian los concursos o las tarifas."""
+    return calcular_portafolio(df_portafolio, tarifario=obtener_tarifario(version_tarifario))
+
+
+@st.cache_data(max_entries=ENTRADAS_CACHE)
+def repartir_demanda(demanda, df_limites, tipo_prueba, version_tarifario, huella_tarifario):
+    """Reparto óptimo entre ciudades; solo se recalcula si cambian los datos o el contenido del tarifario."""
+    return optimizar_asignacion(
+        demanda, df_limites['Ciudad'], tipo_prueba,
+        minimos=dict(zip(df_limites['Ciudad'], df_limites['Mínimo'])),
+        maximos=dict(zip(df_limites['Ciudad'], df_limites['Máximo'])),
+        factores=dict(zip(df_limites['Ciudad'], df_limites['Factor Transporte'])),
+        tarifario=obtener_tarifario(version_tarifario),
+    )
 
-    # 3. CÁLCULO DE COSTOS
-    # ---------------------------------------------------------
-    costo_impresion = n_aspirantes * precio_impresion
-    
-    costo_staff = (n_delegados_sitio * precios['Delegado']) + \
-                  (n_jefes_salon * precios['Jefe Salón']) + \
-                  (n_dactiloscopistas * precios['Dactiloscopista']) + \
-                  (n_coord_aulas * precios['Coord. Aulas']) + \
-                  (n_aseo * precios['Aseo']) + \
-                  (n_seguridad * precios['Seguridad'])
-                  
-    costo_insumos = (n_kits_salon * precios['Kit Salón']) + \
-                    (n_kits_dactilo * precios['Kit Dactilo']) + \
-                    (n_kits_aseo * precios['Kit Aseo'])
-    
-    total = costo_impresion + costo_staff + costo_insumos + costo_transporte_base
-    
-    return {
-        "logistica": {
-            "Sitios": n_sitios, "Salones": n_salones, "Staff Total": total_staff,
-            "Jefes de Salón": n_jefes_salon, "Dactiloscopistas": n_dactiloscopistas
-        },
-        "financiero": {
-            "Impresión": costo_impresion, "Personal": costo_staff,
-            "Insumos": costo_insumos, "Logística": costo_transporte_base,
-            "Total": total
-        }
-    }
 
 # ==============================================================================
 # INTERFAZ DE USUARIO (Frontend)
@@ -248,38 +447,49 @@ st.markdown(
     unsafe_allow_html=True
 )
 
-# Crear Pestañas para organizar la historia
-tab1, tab2, tab3 = st.tabs(["1. Análisis Exploratorio (EDA)", "2. Evaluación Modelos AI", "3. Calculadora Final"])
-
 # ------------------------------------------------------------------------------
 # TAB 1: ANÁLISIS EXPLORATORIO (SIMULADO)
 # ------------------------------------------------------------------------------
-with tab1:
+def mostrar_tab_eda():
+    """Pestaña 1: análisis exploratorio de la estructura de costos."""
     st.header("Comportamiento Histórico de Costos")
-    st.markdown("Simulación de la estructura de datos basada en el análisis de *Recopilado_Perso.xlsx*.")
-    
-    # Generar datos simulados para visualizar el "Escalón"
-    df_sim = pd.DataFrame({'Aspirantes': range(100, 5000, 50)})
-    # Aplicamos una lógica simplificada para generar el costo y graficarlo
-    df_sim['Costo_Total'] = df_sim['Aspirantes'].apply(lambda x: calcular_costo_parametrico(x, "Bogotá", "Escrita")['financiero']['Total'])
-    # Añadimos un poco de ruido aleatorio para simular datos reales imperfectos
-    df_sim['Costo_Real_Simulado'] = df_sim['Costo_Total'] * np.random.uniform(0.95, 1.05, len(df_sim))
+    tarifario = obtener_tarifario()
+    # Histórico real desde el caché Parquet; si no está el libro, se simula su estructura
+    try:
+        df_eda = cargar_historico()
+        columna_costo = 'Costo_Total'
+        color = 'Modalidad' if 'Modalidad' in df_eda.columns else None
+        st.markdown(f"Datos reales de *Recopilado_Perso.xlsx* ({len(df_eda):,} registros).")
+    except FileNotFoundError:
+        df_eda = generar_datos_eda(version_tarifario=tarifario["version"], huella_tarifario=tarifario["huella"])
+        columna_costo, color = 'Costo_Real_Simulado', None
+        st.markdown("Simulación de la estructura de datos basada en el análisis de *Recopilado_Perso.xlsx*.")
+    except ValueError as e:
+        st.error(f"No se pudo leer el histórico: {e}")
+        return
 
     col1, col2 = st.columns([2, 1])
     
     with col1:
-        fig_scatter = px.scatter(df_sim, x='Aspirantes', y='Costo_Real_Simulado', 
-                                 title="Correlación Aspirantes vs. Costo Total",
-                                 labels={'Costo_Real_Simulado': 'Costo Total (COP)'},
-                                 trendline="ols",
-                                 color_discrete_sequence=[ESAP_PALETTE['primary']])
-        fig_scatter.update_layout(
-            font=dict(family="'Segoe UI', Tahoma, Geneva, Verdana, sans-serif", color=ESAP_PALETTE['neutral_dark']),
-            title=dict(font=dict(color=ESAP_PALETTE['primary'], size=18)),
-            plot_bgcolor='#ffffff',
-            paper_bgcolor=ESAP_PALETTE['neutral_light']
-        )
+        fig_scatter = construir_figura_eda(df_eda, columna_costo, color)
         st.plotly_chart(fig_scatter, use_container_width=True)
+
+        fig_segmentada, modelo_segmentado = construir_figura_segmentada(df_eda, columna_costo, tarifario["version"],
+                                                                        tarifario["huella"])
+        st.plotly_chart(fig_segmentada, use_container_width=True)
+
+        st.subheader("Curva exacta del modelo paramétrico")
+        col_c1, col_c2 = st.columns(2)
+        ciudad_curva = col_c1.selectbox("Ciudad", ["Bogotá", "Medellín", "Cali", "Barranquilla", "Bucaramanga",
+                                                   "Quibdó", "San Andrés"], key="ciudad_curva")
+        tipo_curva = col_c2.radio("Modalidad", ["Escrita", "Virtual"], horizontal=True, key="tipo_curva")
+        desde_curva, hasta_curva = st.slider("Rango de aspirantes", 1, MAX_ASPIRANTES_CURVA, (1, 50_000),
+                                             key="rango_curva")
+        fig_curva, n_puntos, n_dibujados = construir_figura_curva(desde_curva, hasta_curva, ciudad_curva, tipo_curva,
+                                                                  tarifario["version"], tarifario["huella"])
+        st.plotly_chart(fig_curva, use_container_width=True)
+        if n_dibujados < n_puntos:
+            st.caption(f"{n_puntos:,} valores exactos reducidos a {n_dibujados:,} puntos con LTTB (WebGL).")
         
     with col2:
         st.info("""
@@ -288,41 +498,137 @@ with tab1:
         2. **Efecto Escalonado:** Los saltos en el costo ocurren cuando se abre un nuevo sitio (cada 500 pax) o se cambia de rango de impresión.
         3. **Outliers:** Los puntos dispersos representan costos logísticos variables (zonas apartadas).
         """)
-        st.dataframe(df_sim.head(10), hide_index=True)
+        st.metric("R² Regresión Segmentada", f"{modelo_segmentado['r2']:.4f}",
+                  help="Cortes aprendidos: " + ", ".join(f"{c:,.0f}" for c in modelo_segmentado['cortes']))
+        st.dataframe(df_eda.head(10), hide_index=True)
 
 # ------------------------------------------------------------------------------
 # TAB 2: EVALUACIÓN DE MODELOS (LA HISTORIA DEL FALLO)
 # ------------------------------------------------------------------------------
-with tab2:
+def mostrar_conclusion_modelos(df_fallos):
+    """Conclusión escrita a partir de la tabla de resultados reentrenada sobre el histórico."""
+    evaluados = df_fallos.dropna(subset=['R² CV (Validación)'])
+    if evaluados.empty:
+        st.warning("No se pudo evaluar ningún modelo (faltan dependencias).")
+        return
+    mejor = evaluados.loc[evaluados['R² CV (Validación)'].idxmax()]
+    aceptables = evaluados[evaluados['Estado'].str.startswith("Aceptable")]
+    if len(aceptables):
+        st.success(f"""
+        **Conclusión Técnica:**
+        {', '.join(aceptables['Modelo'])} generaliza{'n' if len(aceptables) > 1 else ''} sobre el histórico: el mejor,
+        **{mejor['Modelo']}**, logra R² CV de **{mejor['R² CV (Validación)']:.2f}** y R² Test de
+        **{mejor['R² Test']:.2f}**. La calculadora sigue usando el **Modelo Paramétrico**, que aplica las reglas y
+        el tarifario vigente también en rangos sin datos; el backtest compara sus cotizaciones con los costos reales.
+        """)
+    else:
+        negativos = evaluados[evaluados['R² CV (Validación)'] < 0]
+        detalle = (f"{len(negativos)} de {len(evaluados)} modelos tienen **R² CV** negativo (peores que usar un "
+                   f"promedio simple); " if len(negativos) else "")
+        st.error(f"""
+        **Conclusión Técnica:**
+        Ningún modelo generaliza sobre el histórico: {detalle}el mejor, **{mejor['Modelo']}**, logra R² CV de
+        **{mejor['R² CV (Validación)']:.2f}**. Esto respalda el **Modelo Paramétrico (Calculadora)** basado en
+        reglas de negocio.
+        """)
+
+
+def mostrar_tab_modelos():
+    """Pestaña 2: diagnóstico de los modelos de Machine Learning."""
     st.header("Diagnóstico de Modelos Predictivos (Machine Learning)")
-    st.markdown("""
-    Se intentó predecir el costo total usando algoritmos tradicionales. 
-    **Resultado:** Los modelos fallaron debido a la naturaleza escalonada de las tarifas y la falta de datos en rangos altos.
-    """)
-    
-    # Datos hardcodeados de tu tabla de resultados anterior
-    data_fallos = {
-        'Modelo': ['Gradient Boosting', 'XGBoost (Default)', 'XGBoost (Optimizado)', 'Regresión Lineal'],
-        'R² Test': [0.5848, 0.5670, 0.4119, -0.0765],
-        'R² CV (Validación)': [-1.0156, -0.9409, -1.5192, -1.5028],
-        'Estado': ['Sobreajustado 🚩', 'Inestable 🚩', 'Inestable 🚩', 'No Converge ❌']
-    }
-    df_fallos = pd.DataFrame(data_fallos)
-    
-    st.table(df_fallos)
+    st.markdown("Se intentó predecir el costo total usando algoritmos tradicionales.")
     
-    st.error("""
-    **Conclusión Técnica:**
-    Los valores negativos en **R² CV** indican que el modelo es peor que usar un promedio simple.
-    Esto validó el cambio de estrategia hacia un **Modelo Paramétrico (Calculadora)** basado en reglas de negocio.
-    """)
+    # Con el histórico disponible se reentrenan y validan los modelos (resultados persistidos por huella)
+    df_fallos = None
+    try:
+        df_historico = cargar_historico()
+    except (FileNotFoundError, ValueError):
+        df_historico = None
+    if df_historico is not None:
+        try:
+            with st.spinner("Entrenando y validando modelos sobre el histórico..."):
+                df_fallos, huella, recalculado = cargar_o_evaluar(df_historico)
+            st.caption(f"Resultados sobre {len(df_historico):,} registros del histórico "
+                       f"({'recalculados' if recalculado else 'en caché'}, huella `{huella}`).")
+        except ImportError:
+            st.warning("Instale scikit-learn para reentrenar los modelos; se muestran los resultados anteriores.")
+        except ValueError as e:
+            st.warning(f"El histórico no alcanza para validar los modelos ({e}); se muestran los resultados "
+                       f"anteriores.")
+
+    if df_fallos is not None:
+        st.table(df_fallos)
+        mostrar_conclusion_modelos(df_fallos)
+    else:
+        # Resultados de la evaluación original (sin histórico en disco)
+        data_fallos = {
+            'Modelo': ['Gradient Boosting', 'XGBoost (Default)', 'XGBoost (Optimizado)', 'Regresión Lineal'],
+            'R² Test': [0.5848, 0.5670, 0.4119, -0.0765],
+            'R² CV (Validación)': [-1.0156, -0.9409, -1.5192, -1.5028],
+            'Estado': ['Sobreajustado 🚩', 'Inestable 🚩', 'Inestable 🚩', 'No Converge ❌']
+        }
+        st.markdown("**Resultado:** Los modelos fallaron debido a la naturaleza escalonada de las tarifas y la falta "
+                    "de datos en rangos altos.")
+        st.table(pd.DataFrame(data_fallos))
+        st.error("""
+        **Conclusión Técnica:**
+        Los valores negativos en **R² CV** indican que el modelo es peor que usar un promedio simple.
+        Esto validó el cambio de estrategia hacia un **Modelo Paramétrico (Calculadora)** basado en reglas de negocio.
+        """)
+
+    # Backtest del modelo paramétrico contra los costos reales (persistido por datos y tarifario)
+    if df_historico is None:
+        return
+    st.subheader("Backtest del Modelo Paramétrico")
+    resultado, huella_bt, recalculado_bt = cargar_o_backtest(df_historico, obtener_tarifario())
+    metricas = resultado['metricas']
+    total = metricas[metricas['Ciudad'] == TODAS].iloc[0]
+    col_b1, col_b2, col_b3 = st.columns(3)
+    col_b1.metric("MAPE", f"{total['MAPE']:.1%}")
+    col_b2.metric("MdAPE", f"{total['MdAPE']:.1%}")
+    col_b3.metric("Sesgo", f"{total['Sesgo']:+.1%}", help="Error porcentual medio; positivo = el modelo sobrecotiza.")
+    st.caption(f"{int(total['Concursos']):,} concursos, tarifario {obtener_tarifario()['version']} "
+               f"({'recalculado' if recalculado_bt else 'en caché'}, huella `{huella_bt}`).")
+
+    col_b4, col_b5 = st.columns(2)
+    with col_b4:
+        st.dataframe(metricas[metricas['Ciudad'] != TODAS].style.format({
+            'MAPE': '{:.1%}', 'MdAPE': '{:.1%}', 'Sesgo': '{:+.1%}', 'Sesgo_COP': '${:,.0f}'}),
+            hide_index=True, use_container_width=True)
+    with col_b5:
+        residuos = resultado['residuos']
+        fig_residuos = px.scatter(residuos, x='Aspirantes', y='Error_Pct', color='Modalidad', opacity=0.5,
+                                  render_mode="webgl" if len(residuos) > UMBRAL_WEBGL else "auto",
+                                  title="Residuos: (Cotizado − Real) / Real",
+                                  labels={'Error_Pct': 'Error relativo'},
+                                  color_discrete_sequence=[ESAP_PALETTE['primary'], ESAP_PALETTE['accent']])
+        fig_residuos.add_hline(y=0, line_color=ESAP_PALETTE['neutral_mid'])
+        fig_residuos.update_layout(yaxis_tickformat=".0%", plot_bgcolor='#ffffff',
+                                   paper_bgcolor=ESAP_PALETTE['neutral_light'])
+        st.plotly_chart(fig_residuos, use_container_width=True)
+
+    ventanas = resultado['ventanas']
+    if len(ventanas):
+        df_deriva = ventanas[ventanas['Ciudad'] == TODAS].melt(id_vars='Ventana', value_vars=['MAPE', 'Sesgo'],
+                                                               var_name='Métrica', value_name='Valor')
+        fig_deriva = px.line(df_deriva, x='Ventana', y='Valor', color='Métrica', markers=True,
+                             title="Deriva por Ventana Móvil de Años",
+                             color_discrete_sequence=[ESAP_PALETTE['primary'], ESAP_PALETTE['accent']])
+        fig_deriva.update_layout(yaxis_tickformat=".0%", plot_bgcolor='#ffffff',
+                                 paper_bgcolor=ESAP_PALETTE['neutral_light'])
+        st.plotly_chart(fig_deriva, use_container_width=True)
 
 # ------------------------------------------------------------------------------
 # TAB 3: CALCULADORA FINAL (INTERACTIVA)
 # ------------------------------------------------------------------------------
-with tab3:
+def mostrar_tab_calculadora():
+    """Pestaña 3: calculadora paramétrica interactiva."""
     st.header("🛠️ Calculadora Paramétrica de Costos")
     st.markdown("Ingrese las variables operativas para obtener una cotización exacta basada en el tarifario maestro.")
+
+    # Se resuelve una sola vez para que todas las cifras de la pestaña usen la misma versión
+    tarifario = obtener_tarifario()
+    st.caption(f"📋 Tarifario vigente: versión **{tarifario['version']}** (desde {tarifario['vigente_desde']})")
     
     # --- INPUTS ---
     with st.container():
@@ -343,9 +649,18 @@ with tab3:
             st.write("") # Espacio
             btn_calc = st.button("Calcular Cotización", type="primary", use_container_width=True)
 
+    # --- CONSULTA INVERSA (Presupuesto -> Aspirantes) ---
+    with st.expander("💰 Consulta inversa: ¿cuántos aspirantes caben en un presupuesto?"):
+        presupuesto_in = st.number_input("Presupuesto disponible (COP)", min_value=0, value=100_000_000, step=1_000_000)
+        max_aspirantes = max_aspirantes_presupuesto(presupuesto_in, ciudad_in, tipo_in, tarifario)
+        st.markdown(
+            f"Con **${presupuesto_in:,.0f}** en **{ciudad_in}** (modalidad {tipo_in}) se pueden atender "
+            f"hasta **{max_aspirantes:,}** aspirantes."
+        )
+
     # --- RESULTADOS ---
     if btn_calc:
-        resultado = calcular_costo_parametrico(aspirantes_in, ciudad_in, tipo_in)
+        resultado = calcular_costo_parametrico(aspirantes_in, ciudad_in, tipo_in, tarifario)
         log = resultado['logistica']
         fin = resultado['financiero']
         
@@ -357,6 +672,15 @@ with tab3:
         kpi2.metric("Costo Unitario / Aspirante", f"${fin['Total']/aspirantes_in:,.0f}")
         kpi3.metric("Total Sitios", log['Sitios'])
         kpi4.metric("Total Staff Humano", log['Staff Total'])
+
+        modificacion = os.stat(RUTA_HISTORICO).st_mtime_ns if os.path.exists(RUTA_HISTORICO) else None
+        calibracion = obtener_calibracion(tarifario['version'], tarifario['huella'], modificacion)
+        if calibracion is not None:
+            inferior, superior = intervalo(fin['Total'], ciudad_in, tipo_in, calibracion, NIVEL_DEFECTO)
+            st.caption(f"Intervalo conformal del {NIVEL_DEFECTO:.0%} (errores históricos del modelo en {ciudad_in}, "
+                       f"{tipo_in}): **${inferior:,.0f} – ${superior:,.0f}**")
+        else:
+            st.caption("Sin histórico de costos reales no se puede calcular el intervalo de la cotización.")
         
         st.divider()
         
@@ -395,4 +719,223 @@ with tab3:
             }
             st.dataframe(pd.DataFrame(detalles_op), use_container_width=True)
             
-            st.info("💡 *Nota: Estos cálculos aplican las reglas de negocio (ej. 1 Dactiloscopista cada 4 salones) extraídas del análisis de datos.*")
\ No newline at end of file
+            st.info("💡 *Nota: Estos cálculos aplican las reglas de negocio (ej. 1 Dactiloscopista cada 4 salones) extraídas del análisis de datos.*")
+    # --- SIMULACIÓN MONTE CARLO (Incertidumbre) ---
+    with st.expander("🎲 Análisis de incertidumbre (Simulación Monte Carlo)"):
+        st.markdown("Varía tarifas, ausentismo y transporte sobre las mismas reglas de la calculadora para obtener un rango de costos.")
+        col_mc1, col_mc2, col_mc3, col_mc4 = st.columns(4)
+        with col_mc1:
+            variacion_in = st.slider("Variación de tarifas (±%)", 0, 30, 10)
+        with col_mc2:
+            ausentismo_in = st.slider("Ausentismo (%)", 0, 50, (0, 10))
+        with col_mc3:
+            dispersion_in = st.slider("Dispersión transporte (±%)", 0, 50, 25)
+        with col_mc4:
+            n_sim_in = st.selectbox("Simulaciones", [10_000, 100_000, 1_000_000], index=1)
+            semilla_in = st.number_input("Semilla", min_value=0, value=42, step=1)
+
+        if st.button("Simular Escenarios", use_container_width=True):
+            simulacion = simular_costos(
+                aspirantes_in, ciudad_in, tipo_in, n_simulaciones=n_sim_in, semilla=int(semilla_in), tarifario=tarifario,
+                variacion_tarifas=variacion_in / 100,
+                ausentismo=(ausentismo_in[0] / 100, ausentismo_in[1] / 100),
+                dispersion_transporte=dispersion_in / 100,
+            )
+            resumen = simulacion['resumen']
+
+            mc1, mc2, mc3, mc4 = st.columns(4)
+            mc1.metric("P10 (Optimista)", f"${resumen.loc['P10', 'Total']:,.0f}")
+            mc2.metric("P50 (Mediana)", f"${resumen.loc['P50', 'Total']:,.0f}")
+            mc3.metric("P90 (Conservador)", f"${resumen.loc['P90', 'Total']:,.0f}")
+            mc4.metric("Estimación Puntual", f"${simulacion['punto']['Total']:,.0f}")
+
+            # Histograma del total agrupado a 100 barras para graficar
+            conteos, bordes = simulacion['histograma']
+            conteos = conteos.reshape(100, -1).sum(axis=1)
+            bordes = bordes[::(len(bordes) - 1) // 100]
+            centros = (bordes[:-1] + bordes[1:]) / 2
+            fig_mc = px.bar(x=centros, y=conteos, labels={'x': 'Costo Total (COP)', 'y': 'Frecuencia'},
+                            title="Distribución Simulada del Costo Total",
+                            color_discrete_sequence=[ESAP_PALETTE['secondary']])
+            fig_mc.add_vline(x=simulacion['punto']['Total'], line_dash="dash", line_color=ESAP_PALETTE['accent'])
+            fig_mc.update_layout(
+                font=dict(family="'Segoe UI', Tahoma, Geneva, Verdana, sans-serif"),
+                title=dict(font=dict(color=ESAP_PALETTE['primary'])),
+                plot_bgcolor='#ffffff',
+                paper_bgcolor=ESAP_PALETTE['neutral_light']
+            )
+            st.plotly_chart(fig_mc, use_container_width=True)
+
+            st.subheader("Desglose por Rubro (COP)")
+            st.dataframe(resumen.style.format("${:,.0f}"), use_container_width=True)
+
+    # --- SENSIBILIDAD DE TARIFAS (Tornado) ---
+    with st.expander("📈 Sensibilidad de tarifas (Tornado y elasticidades)"):
+        st.markdown("Impacto de variar cada tarifa sobre el costo total, promediado en toda la grilla aspirantes × ciudad × modalidad.")
+        col_s1, col_s2 = st.columns(2)
+        with col_s1:
+            n_max_sens = st.select_slider("Rango de aspirantes (1 a N)", [5_000, 20_000, 50_000, 100_000], value=20_000)
+        with col_s2:
+            variacion_sens = st.slider("Variación de cada tarifa (±%)", 1, 50, 10)
+
+        fig_tornado, fig_elasticidad = construir_figuras_sensibilidad(n_max_sens, variacion_sens, ciudad_in, tipo_in,
+                                                                      tarifario['version'], tarifario['huella'])
+        st.plotly_chart(fig_tornado, use_container_width=True)
+        st.plotly_chart(fig_elasticidad, use_container_width=True)
+
+    # --- DESCOMPOSICIÓN DE RUBROS POR VOLUMEN ---
+    with st.expander("📊 Descomposición de rubros por volumen"):
+        st.markdown("Impresión, Personal, Insumos y Logística a lo largo de un rango de aspirantes. "
+                    "Las líneas punteadas marcan la apertura de sitios y las discontinuas los cambios de tramo "
+                    "de impresión.")
+        desde_rubros, hasta_rubros = st.slider("Rango de aspirantes", 1, 100_000, (1, 5_000), key="rango_rubros")
+        col_r1, col_r2 = st.columns(2)
+        ciudades_rubros = col_r1.multiselect("Ciudades", ["Bogotá", "Medellín", "Cali", "Barranquilla",
+                                                          "Bucaramanga", "Quibdó", "San Andrés"],
+                                             default=[ciudad_in], key="ciudades_rubros")
+        modalidades_rubros = col_r2.multiselect("Modalidades", ["Escrita", "Virtual"], default=[tipo_in],
+                                                key="modalidades_rubros")
+        if ciudades_rubros and modalidades_rubros:
+            st.plotly_chart(construir_figura_rubros(desde_rubros, hasta_rubros, tuple(ciudades_rubros),
+                                                    tuple(modalidades_rubros), tarifario['version'],
+                                                    tarifario['huella']),
+                            use_container_width=True)
+        else:
+            st.info("Seleccione al menos una ciudad y una modalidad.")
+
+    # --- PROYECCIÓN DE TARIFAS ---
+    with st.expander("📆 Proyección de tarifas (IPC y salario mínimo)"):
+        st.markdown("Proyecta el tarifario con variaciones anuales editables: el personal se indexa con el "
+                    "salario mínimo y los kits, la impresión y el transporte con el IPC.")
+        horizonte = st.slider("Años a proyectar", 1, 20, 10, key="horizonte_proyeccion")
+        df_indices = st.data_editor(
+            indices_constantes(anio_base(tarifario) + 1, horizonte, TASAS_DEFECTO).reset_index(),
+            hide_index=True, use_container_width=True, disabled=['Año'], key=f"indices_proyeccion_{horizonte}",
+            column_config={serie: st.column_config.NumberColumn(serie, format="percent", step=0.005)
+                           for serie in TASAS_DEFECTO})
+        df_indices = df_indices.set_index('Año')
+
+        modificacion = os.stat(RUTA_HISTORICO).st_mtime_ns if os.path.exists(RUTA_HISTORICO) else None
+        costos_anio, n_historico, fig_proyeccion = construir_proyeccion(
+            aspirantes_in, ciudad_in, tipo_in, df_indices, tarifario['version'], tarifario['huella'], modificacion)
+        st.metric(f"Cotización actual en {costos_anio.index[-1]}", f"${costos_anio.iloc[-1]:,.0f}",
+                  delta=f"{costos_anio.iloc[-1] / costos_anio.iloc[0] - 1:.1%} vs. {costos_anio.index[0]}",
+                  delta_color="inverse")
+
+        if n_historico is not None:
+            st.markdown(f"**{n_historico:,} concursos históricos** re-cotizados con las tarifas de cada año:")
+        else:
+            st.caption("Sin histórico en disco: se muestra solo la cotización actual.")
+        st.plotly_chart(fig_proyeccion, use_container_width=True)
+
+    # --- ASIGNACIÓN A SITIOS Y SALONES REALES ---
+    with st.expander("🏫 Asignación a sitios y salones reales"):
+        st.markdown("Asigna los aspirantes a salones concretos de un catálogo de sitios y recalcula el costo con los conteos reales.")
+        archivo_catalogo = st.file_uploader("Catálogo de sitios (.csv o .xlsx con Ciudad, Sitio, Salón, Capacidad)",
+                                            type=["csv", "xlsx"])
+        contenido_catalogo = archivo_catalogo.getvalue() if archivo_catalogo is not None else None
+        try:
+            plan, origen_catalogo, n_salones_catalogo = planificar_salones(
+                aspirantes_in, tipo_in, ciudad_in, tarifario['version'], tarifario['huella'], contenido_catalogo,
+                archivo_catalogo.name if archivo_catalogo is not None else None)
+        except ValueError as e:
+            st.error(str(e))
+        else:
+            st.caption(f"Usando {origen_catalogo} ({n_salones_catalogo:,} salones).")
+            real, reglas = plan['costo'], plan['costo_reglas']
+            col_a1, col_a2, col_a3, col_a4 = st.columns(4)
+            col_a1.metric("Sitios", real['logistica']['Sitios'],
+                          delta=real['logistica']['Sitios'] - reglas['logistica']['Sitios'], delta_color="inverse")
+            col_a2.metric("Salones", real['logistica']['Salones'],
+                          delta=real['logistica']['Salones'] - reglas['logistica']['Salones'], delta_color="inverse")
+            col_a3.metric("Costo Total (salones reales)", f"${real['financiero']['Total']:,.0f}",
+                          delta=f"${real['financiero']['Total'] - reglas['financiero']['Total']:,.0f}",
+                          delta_color="inverse")
+            col_a4.metric("Brecha vs. cota inferior", f"{plan['brecha']:.2%}",
+                          help="Costo de apertura de sitios y salones frente a la relajación lineal del problema.")
+            st.dataframe(plan['sitios'], hide_index=True, use_container_width=True)
+
+    # --- RED DE TRANSPORTE ---
+    if tarifario['red'] is not None:
+        with st.expander("🚚 Red de transporte"):
+            st.markdown(f"El factor de transporte de cada ciudad sale de la ruta más barata desde los centros de "
+                        f"despacho ({', '.join(tarifario['red']['centros'])}). Las ciudades fuera de la red usan "
+                        f"el factor por defecto ({tarifario['factor_ciudad_defecto']}).")
+            st.dataframe(tabla_despacho(tarifario['red'], tarifario['costo_transporte_sitio']).style.format(
+                {'Costo Despacho': '${:,.0f}', 'Factor Transporte': '{:.2f}'}), hide_index=True,
+                use_container_width=True)
+
+    # --- DISTRIBUCIÓN ÓPTIMA ENTRE CIUDADES ---
+    with st.expander("🗺️ Distribución óptima entre ciudades"):
+        st.markdown("Reparte la demanda total entre varias ciudades al menor costo, respetando mínimos y máximos por ciudad.")
+        demanda_in = st.number_input("Demanda total de aspirantes", min_value=1, value=50_000, step=1_000)
+        df_limites = pd.DataFrame({
+            'Ciudad': ["Bogotá", "Medellín", "Cali", "Barranquilla", "Bucaramanga", "Quibdó", "San Andrés"],
+            'Mínimo': 0,
+            'Máximo': demanda_in,
+        })
+        df_limites['Factor Transporte'] = [tarifario['factor_por_ciudad'].get(c, tarifario['factor_ciudad_defecto'])
+                                           for c in df_limites['Ciudad']]
+        df_limites = st.data_editor(df_limites, hide_index=True, use_container_width=True, disabled=['Ciudad'])
+
+        try:
+            optimo = repartir_demanda(demanda_in, df_limites, tipo_in, tarifario['version'], tarifario['huella'])
+        except ValueError as e:
+            st.error(str(e))
+        else:
+            st.metric("Costo Total del Reparto Óptimo", f"${optimo['costo_total']:,.0f}",
+                      help=f"Costo unitario: ${optimo['costo_total'] / demanda_in:,.0f} por aspirante")
+            st.dataframe(optimo['asignacion'][optimo['asignacion']['Aspirantes'] > 0]
+                         .style.format({'Aspirantes': '{:,}', 'Costo': '${:,.0f}'}),
+                         hide_index=True, use_container_width=True)
+
+    # --- PORTAFOLIO DE CONCURSOS (SITIOS COMPARTIDOS) ---
+    with st.expander("📅 Portafolio de concursos (sitios compartidos)"):
+        st.markdown("Los concursos aplicados el mismo día en la misma ciudad comparten sitios, delegados, "
+                    "seguridad, aseo y transporte. Compare el costo conjunto con cotizarlos por separado.")
+        archivo_portafolio = st.file_uploader("Concursos (.csv o .xlsx con Fecha, Ciudad, Modalidad, Aspirantes)",
+                                              type=["csv", "xlsx"], key="archivo_portafolio")
+        if archivo_portafolio is not None:
+            leer = pd.read_csv if archivo_portafolio.name.lower().endswith(".csv") else pd.read_excel
+            df_portafolio = leer(archivo_portafolio)
+        else:
+            df_portafolio = st.data_editor(pd.DataFrame({
+                'Concurso': ["Concurso A", "Concurso B", "Concurso C"],
+                'Fecha': pd.to_datetime(["2025-09-14", "2025-09-14", "2025-09-21"]),
+                'Ciudad': [ciudad_in, ciudad_in, ciudad_in],
+                'Modalidad': [tipo_in, "Escrita", tipo_in],
+                'Aspirantes': [1_200, 730, 4_200],
+            }), num_rows="dynamic", hide_index=True, use_container_width=True, key="editor_portafolio")
+        try:
+            portafolio = cotizar_portafolio(df_portafolio.dropna(subset=['Aspirantes']), tarifario['version'],
+                                            tarifario['huella'])
+        except (KeyError, ValueError, TypeError) as e:
+            st.error(f"No se pudo cotizar el portafolio: {e}")
+        else:
+            col_p1, col_p2, col_p3 = st.columns(3)
+            col_p1.metric("Costo por Separado", f"${portafolio['costo_separado']:,.0f}")
+            col_p2.metric("Costo Conjunto", f"${portafolio['costo_conjunto']:,.0f}")
+            col_p3.metric("Ahorro", f"${portafolio['ahorro']:,.0f}",
+                          delta=f"{portafolio['ahorro'] / portafolio['costo_separado']:.1%}"
+                          if portafolio['costo_separado'] else None)
+            st.dataframe(portafolio['grupos'].style.format({
+                'Aspirantes': '{:,}', 'Costo Separado': '${:,.0f}', 'Costo Conjunto': '${:,.0f}', 'Ahorro': '${:,.0f}'
+            }), hide_index=True, use_container_width=True)
+
+
+# ------------------------------------------------------------------------------
+# PESTAÑAS (EJECUCIÓN PEREZOSA)
+# ------------------------------------------------------------------------------
+# Con `on_change="rerun"` Streamlit solo marca como abierta la pestaña activa, así
+# que las demás no calculan datos ni figuras. Versiones anteriores de Streamlit no
+# aceptan el parámetro; en ese caso todas las pestañas se ejecutan como antes.
+NOMBRES_TABS = ["1. Análisis Exploratorio (EDA)", "2. Evaluación Modelos AI", "3. Calculadora Final"]
+try:
+    tabs = st.tabs(NOMBRES_TABS, key="tab_activa", on_change="rerun")
+except TypeError:
+    tabs = st.tabs(NOMBRES_TABS)
+
+for tab, mostrar_tab in zip(tabs, [mostrar_tab_eda, mostrar_tab_modelos, mostrar_tab_calculadora]):
+    with tab:
+        if getattr(tab, "open", True):
+            mostrar_tab()
@@ -5,6 +5,8 @@ import base64
 from datetime import datetime
 import html # Para escapar HTML en el reporte
 
+from rubricas import calificar, compilar_rubrica, vector_puntajes
+
 # --- Configuración de la Página ---
 st.set_page_config(layout="wide", page_title="Javier Mauririo Sierra")
 
@@ -67,6 +69,9 @@ puntos_posibles_por_criterio_r3 = 4
 fortalezas_lista_r3 = [ "Selección apropiada del dataset y objetivos claros", "Análisis exploratorio sistemático y visualizaciones efectivas", "Tratamiento técnicamente correcto de datos faltantes", "Propuestas creativas en ingeniería de características", "Metodología bien fundamentada y coherente", "Documentación clara y profesional", "Código limpio y reproducible" ]
 areas_mejora_lista_r3 = [ "Profundizar en la justificación teórica de decisiones metodológicas", "Mejorar la calidad y narrativa de visualizaciones", "Fortalecer el análisis de patrones de datos faltantes", "Desarrollar mayor creatividad en ingeniería de características", "Mejorar la coherencia entre objetivos y metodología propuesta", "Ampliar la evaluación de viabilidad e implementación", "Mejorar la documentación técnica y reproducibilidad" ]
 
+# Índice plano de criterios y pesos: la nota es un producto punto (ver rubricas.py)
+RUBRICA_COMPILADA = compilar_rubrica(rubrica_data_r3)
+
 # --- Inicialización del Estado de Sesión ---
 def inicializar_estado_r3():
     if 'current_page_r3' not in st.session_state: st.session_state.current_page_r3 = "Descripción de la Actividad" 
@@ -127,15 +132,14 @@ def render_rubric_section_r3(seccion_nombre, detalles_seccion):
 
 def calcular_resultados_r3():
     resultados = {"secciones": {}, "total_puntos_obtenidos_final": 0 }
-    for seccion, detalles_seccion in rubrica_data_r3.items():
-        puntos_raw_seccion = 0;
-        for criterio_key in detalles_seccion["criterios"].keys():
-            score = st.session_state.calificaciones_r3.get(seccion, {}).get(criterio_key)
-            if score is not None: puntos_raw_seccion += score
+    # Puntos escalados = puntajes @ (puntos_componente / max_raw_score) por criterio (ver rubricas.py)
+    calificacion = calificar(RUBRICA_COMPILADA, vector_puntajes(RUBRICA_COMPILADA, st.session_state.calificaciones_r3))
+    for j, (seccion, detalles_seccion) in enumerate(rubrica_data_r3.items()):
+        puntos_raw_seccion = int(calificacion["sumas"][j])
         max_raw_seccion = detalles_seccion["max_raw_score"]
-        puntos_escalados_seccion = (puntos_raw_seccion / max_raw_seccion) * detalles_seccion["puntos_componente"] if max_raw_seccion > 0 else 0
+        puntos_escalados_seccion = calificacion["secciones"][j]
         resultados["secciones"][seccion] = { "obtenido_raw": puntos_raw_seccion, "max_raw": max_raw_seccion, "obtenido_escalado": puntos_escalados_seccion, "max_escalado": detalles_seccion["puntos_componente"], "evaluada": True } # 'evaluada' es True porque todas las secciones de rubrica_data_r3 se procesan
-        resultados["total_puntos_obtenidos_final"] += puntos_escalados_seccion
+    resultados["total_puntos_obtenidos_final"] = calificacion["final"]
     return resultados
 
 def get_qualitative_grade_r3(score_100):
@@ -2,6 +2,8 @@ import streamlit as st
 import pandas as pd
 import datetime
 
+from rubricas import calificar, compilar_rubrica, vector_puntajes
+
 # --- Configuración de la Página ---
 st.set_page_config(
     page_title="Calificador Automático de Rúbrica",
@@ -121,6 +123,9 @@ rubric_data = {
     }
 }
 
+# Índice plano de criterios y pesos: la nota es un producto punto (ver rubricas.py)
+RUBRICA_COMPILADA = compilar_rubrica(rubric_data)
+
 # --- Función para generar el reporte HTML ---
 def generar_html(project_name, group_members, evaluation_date, subject, desglose_df, summary_df, calificacion_final, observaciones):
     integrantes_html = group_members.replace('\n', '<br>')
@@ -215,12 +220,9 @@ st.markdown("---")
 # --- Cuerpo del Calificador ---
 st.header("2. Calificación por Criterios")
 calificaciones = {}
-calificaciones_ponderadas = {}
 
 def render_section(section_data, form_key):
     st.subheader(f"Parte: {section_data['title']} (Ponderación Total: {section_data['ponderacion_total']:.0%})")
-    total_ponderado_seccion = 0
-    
     with st.container(border=True):
         for criterio, detalles in section_data['criterios'].items():
             st.markdown(f"**Criterio:** {criterio} (Ponderación: {detalles['ponderacion']:.0%})")
@@ -236,24 +238,24 @@ def render_section(section_data, form_key):
             
             calificaciones[criterio] = calificacion_actual
             calificacion_ponderada = calificacion_actual * detalles['ponderacion']
-            calificaciones_ponderadas[criterio] = calificacion_ponderada
-            total_ponderado_seccion += calificacion_ponderada
             
             st.info(f"Calificación Ponderada del Criterio: **{calificacion_ponderada:.3f}**")
             # Evita poner una línea extra al final de la sección
             if criterio != list(section_data['criterios'].keys())[-1]:
                  st.markdown("---")
-            
-    return total_ponderado_seccion
 
 # --- Renderizar cada sección ---
-total_informe = render_section(rubric_data['Informe'], form_key)
-total_presentacion = render_section(rubric_data['Presentacion'], form_key)
-total_exposicion = render_section(rubric_data['Exposicion'], form_key)
+render_section(rubric_data['Informe'], form_key)
+render_section(rubric_data['Presentacion'], form_key)
+render_section(rubric_data['Exposicion'], form_key)
 
 # --- Resumen y Calificación Final ---
 st.header("3. Resultados y Acciones")
-calificacion_final = total_informe + total_presentacion + total_exposicion
+calificacion = calificar(RUBRICA_COMPILADA, vector_puntajes(RUBRICA_COMPILADA, calificaciones))
+total_informe, total_presentacion, total_exposicion = calificacion["secciones"]
+calificaciones_ponderadas = {criterio: aporte for (_, criterio), aporte
+                             in zip(RUBRICA_COMPILADA["criterios"], calificacion["aportes"])}
+calificacion_final = calificacion["final"]
 
 with st.container(border=True):
     col1, col2 = st.columns([1, 2])
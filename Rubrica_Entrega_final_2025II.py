@@ -3,6 +3,8 @@ import pandas as pd
 import datetime
 import io
 
+from rubricas import calificar, compilar_rubrica, vector_puntajes
+
 try:
     import xlsxwriter  # noqa: F401
     EXCEL_WRITER_ENGINE = "xlsxwriter"
@@ -168,6 +170,9 @@ RUBRIC_DATA = {
     }
 }
 
+# Índice plano de criterios y pesos: la nota es un producto punto (ver rubricas.py)
+RUBRICA_COMPILADA = compilar_rubrica(RUBRIC_DATA)
+
 # --- FUNCIONES HELPERS ---
 
 def initialize_session_state(rubric):
@@ -462,17 +467,21 @@ def display_component_criteria(component_data):
         
         st.divider()
 
-def calculate_results(rubric):
+def calculate_results(rubric, compilada=None):
     """
     Calcula la calificación final ponderada y prepara los datos para el DF.
     """
-    total_score_pct = 0
     component_scores = {}
     criteria_details = []
     component_summary_rows = []
 
-    for comp_id, comp_data in rubric.items():
-        comp_score_pct = 0
+    compilada = compilar_rubrica(rubric) if compilada is None else compilada
+    puntajes = vector_puntajes(compilada, {criterion['id']: st.session_state[f"{criterion['id']}_score"]
+                                           for comp_data in rubric.values() for criterion in comp_data["criteria"]})
+    calificacion = calificar(compilada, puntajes)
+    aportes = iter(calificacion["aportes"])
+
+    for (comp_id, comp_data), comp_score_pct in zip(rubric.items(), calificacion["secciones"]):
         short_name = comp_data.get("short_name", comp_data["name"])
         for criterion in comp_data["criteria"]:
             score = st.session_state[f"{criterion['id']}_score"]
@@ -480,8 +489,7 @@ def calculate_results(rubric):
             weight_pct = criterion['weight']
             
             # Contribución ponderada de este criterio al 100% total
-            criterion_weighted_points = (score / 5.0) * weight_pct
-            comp_score_pct += criterion_weighted_points
+            criterion_weighted_points = next(aportes)
             
             criteria_details.append({
                 "Componente": short_name,
@@ -501,7 +509,6 @@ def calculate_results(rubric):
             "weight": comp_data['weight'],
             "normalized_score": normalized_component_score
         }
-        total_score_pct += comp_score_pct
         component_summary_rows.append({
             "Componente": short_name,
             "Peso (%)": comp_data['weight'],
@@ -511,7 +518,8 @@ def calculate_results(rubric):
         })
 
     # La calificación final es el total de puntos (sobre 100) re-escalado a 5.0
-    final_grade_5_0_scale = (total_score_pct / 100.0) * 5.0
+    total_score_pct = calificacion["total"]
+    final_grade_5_0_scale = calificacion["final"]
     
     results_df = pd.DataFrame(criteria_details)
     component_summary_df = pd.DataFrame(component_summary_rows)
@@ -815,7 +823,7 @@ def main():
 
     # 5. Calcular y mostrar los resultados (se re-calcula en cada interacción)
     #    Esto es el núcleo de la reactividad de Streamlit
-    results = calculate_results(RUBRIC_DATA)
+    results = calculate_results(RUBRIC_DATA, RUBRICA_COMPILADA)
     display_results_sidebar(results, project_info, results_placeholder, RUBRIC_DATA)
 
     with report_tab:
@@ -4,6 +4,9 @@ import datetime
 import io
 import json
 
+from calificacion_riesgo import RUBRIC_DATA, RUBRICA_COMPILADA
+from rubricas import calificar, compilar_rubrica, vector_puntajes
+
 try:
     import plotly.graph_objects as go
     PLOTLY_AVAILABLE = True
@@ -28,184 +31,6 @@ USTA_PALETTE = {
     "neutral_dark": "#17213c",
 }
 
-# --- Definición de la Rúbrica ---
-RUBRIC_DATA = {
-    "A": {
-        "name": "COMPONENTE A: INFORME TÉCNICO (HTML + RMARKDOWN)",
-        "short_name": "Componente A",
-        "weight": 40,
-        "criteria": [
-            {
-                "id": "A1", "name": "Estado del arte y contextualización", "weight": 4,
-                "levels": {
-                    "insuficiente": "Ausente o irrelevante. No sitúa el tema en un contexto científico.",
-                    "basico": "Contextualización débil, escasa conexión con el campo del riesgo financiero.",
-                    "satisfactorio": "Presenta una revisión clara del tema, aunque con limitada profundidad crítica o alcance bibliográfico.",
-                    "destacado": "Revisa críticamente múltiples fuentes, sitúa el artículo en un debate científico actual y justifica su relevancia con solidez."
-                }
-            },
-            {
-                "id": "A2", "name": "Comprensión y análisis exploratorio de datos (AED)", "weight": 6,
-                "levels": {
-                    "insuficiente": "No se presenta AED o es inaplicable.",
-                    "basico": "Análisis incompleto o con errores metodológicos graves.",
-                    "satisfactorio": "Realiza un AED básico con gráficos y resúmenes, pero sin profundidad analítica.",
-                    "destacado": "Realiza un AED completo: detecta patrones, asimetrías, outliers, relaciones entre variables y justifica transformaciones."
-                }
-            },
-            {
-                "id": "A3", "name": "Imputación de datos", "weight": 5,
-                "levels": {
-                    "insuficiente": "Omite el tratamiento de datos faltantes.",
-                    "basico": "Usa imputación inadecuada o sin explicación.",
-                    "satisfactorio": "Aplica un método válido (ej. media, KNN), pero sin comparación ni justificación profunda.",
-                    "destacado": "Evalúa mecanismos de pérdida (MCAR/MAR), compara métodos y elige el más apropiado con fundamentación."
-                }
-            },
-            {
-                "id": "A4", "name": "Ingeniería de características", "weight": 5,
-                "levels": {
-                    "insuficiente": "No aplica ingeniería de variables.",
-                    "basico": "Características poco relevantes o mal construidas.",
-                    "satisfactorio": "Genera nuevas variables útiles, aunque con poca originalidad o justificación limitada.",
-                    "destacado": "Diseña variables innovadoras bien fundamentadas (índices, ratios) que aportan valor sustancial."
-                }
-            },
-            {
-                "id": "A5", "name": "Documentación técnica y reproducibilidad", "weight": 6,
-                "levels": {
-                    "insuficiente": "No compila o es imposible replicar.",
-                    "basico": "Dificultad para seguir el flujo; falta de comentarios o errores.",
-                    "satisfactorio": "Código funcional y entendible, aunque con mejoras en estilo o documentación.",
-                    "destacado": "Código totalmente reproducible, bien comentado, con buenas prácticas. HTML bien formateado."
-                }
-            },
-            {
-                "id": "A6", "name": "Crítica metodológica y argumentación grupal", "weight": 8,
-                "levels": {
-                    "insuficiente": "Ausente o meramente descriptiva.",
-                    "basico": "Crítica superficial o desenfocada.",
-                    "satisfactorio": "Identifica algunos aspectos débiles del artículo, pero sin profundidad analítica.",
-                    "destacado": "Ofrece una crítica rigurosa basada en evidencia, cuestiona supuestos, limitaciones y sesgos con propuestas alternativas."
-                }
-            },
-            {
-                "id": "A7", "name": "Bibliografía y normas académicas", "weight": 6,
-                "levels": {
-                    "insuficiente": "Sin referencias o plagio.",
-                    "basico": "Algunas referencias faltantes o fuentes no académicas.",
-                    "satisfactorio": "Citas completas con pequeños errores de formato.",
-                    "destacado": "Cumple rigurosamente con las normas, usa fuentes académicas de alto impacto."
-                }
-            }
-        ]
-    },
-    "B": {
-        "name": "COMPONENTE B: DASHBOARD INTERACTIVO",
-        "short_name": "Componente B",
-        "weight": 30,
-        "criteria": [
-            {
-                "id": "B1", "name": "Claridad del propósito y audiencia", "weight": 5,
-                "levels": {
-                    "insuficiente": "Sin propósito claro. No es evidente a quién está dirigido.",
-                    "basico": "Objetivo ambiguo. Audiencia poco explícita.",
-                    "satisfactorio": "Propósito identificado, pero audiencia poco explícita.",
-                    "destacado": "Propósito claro, audiencia bien definida y todas las funciones están alineadas con sus necesidades."
-                }
-            },
-            {
-                "id": "B2", "name": "Selección y priorización de KPIs", "weight": 6,
-                "levels": {
-                    "insuficiente": "Ausentes o incorrectos.",
-                    "basico": "Indicadores poco representativos.",
-                    "satisfactorio": "Incluye KPIs relevantes, pero con redundancia o falta de enfoque.",
-                    "destacado": "KPIs altamente pertinentes, jerarquizados y contextualizados."
-                }
-            },
-            {
-                "id": "B3", "name": "Calidad técnica y visual de visualizaciones", "weight": 7,
-                "levels": {
-                    "insuficiente": "Mal diseñados o con errores graves.",
-                    "basico": "Errores visuales (ej. 3D innecesario, escalas engañosas).",
-                    "satisfactorio": "Gráficos correctos, aunque con detalles mejorables (leyendas, colores).",
-                    "destacado": "Visualizaciones precisas, estéticamente pulidas, accesibles y libres de distorsiones."
-                }
-            },
-            {
-                "id": "B4", "name": "Interactividad y navegabilidad", "weight": 6,
-                "levels": {
-                    "insuficiente": "Sin interactividad.",
-                    "basico": "Interactividad mínima o con errores.",
-                    "satisfactorio": "Funcionalidades básicas implementadas (filtros), pero con limitaciones.",
-                    "destacado": "Alta interactividad intuitiva que permite explorar múltiples escenarios."
-                }
-            },
-            {
-                "id": "B5", "name": "Insights y accionabilidad", "weight": 6,
-                "levels": {
-                    "insuficiente": "No aporta insights.",
-                    "basico": "Limitado valor práctico.",
-                    "satisfactorio": "Presenta información útil, pero requiere interpretación adicional.",
-                    "destacado": "Destaca hallazgos clave con alertas, resúmenes dinámicos y sugerencias para la acción."
-                }
-            }
-        ]
-    },
-    "C": {
-        "name": "COMPONENTE C: EXPOSICIÓN ORAL EN VIDEO (10–15 min)",
-        "short_name": "Componente C",
-        "weight": 30,
-        "criteria": [
-            {
-                "id": "C1", "name": "Dominio conceptual y técnico", "weight": 6,
-                "levels": {
-                    "insuficiente": "Falta dominio. Inseguridad conceptual evidente.",
-                    "basico": "Conocimiento parcial; confunde conceptos.",
-                    "satisfactorio": "Demuestra buen conocimiento, aunque con algunas vacilaciones.",
-                    "destacado": "Explica con claridad conceptos complejos, responde preguntas implícitas y defiende decisiones."
-                }
-            },
-            {
-                "id": "C2", "name": "Uso estratégico del dashboard", "weight": 6,
-                "levels": {
-                    "insuficiente": "No lo utiliza.",
-                    "basico": "Lo menciona brevemente sin demostración.",
-                    "satisfactorio": "Muestra el dashboard, pero con poca integración narrativa.",
-                    "destacado": "Usa el dashboard como herramienta narrativa, navegando con propósito y destacando insights."
-                }
-            },
-            {
-                "id": "C3", "name": "Estructura y claridad comunicativa", "weight": 6,
-                "levels": {
-                    "insuficiente": "Caótica. Difícil de seguir.",
-                    "basico": "Difícil de seguir; sin introducción o cierre.",
-                    "satisfactorio": "Estructura clara, aunque con digresiones o ritmo irregular.",
-                    "destacado": "Narrativa bien estructurada, lenguaje preciso, transiciones suaves."
-                }
-            },
-            {
-                "id": "C4", "name": "Síntesis y manejo del tiempo", "weight": 6,
-                "levels": {
-                    "insuficiente": "Muy por fuera del tiempo (±3 min).",
-                    "basico": "Fuera de tiempo (±2 min) o desbalanceado.",
-                    "satisfactorio": "Ligera sobreexposición o omisión de puntos clave.",
-                    "destacado": "Tiempo optimizado, contenido conciso y enfocado en lo más relevante."
-                }
-            },
-            {
-                "id": "C5", "name": "Argumentación crítica y pensamiento reflexivo", "weight": 6,
-                "levels": {
-                    "insuficiente": "Reproduce sin cuestionar.",
-                    "basico": "Crítica superficial o ausente.",
-                    "satisfactorio": "Plantea críticas válidas, aunque con enfoque limitado.",
-                    "destacado": "Ofrece una reflexión profunda sobre validez, aplicabilidad y ética del estudio."
-                }
-            }
-        ]
-    }
-}
-
 def initialize_session_state(rubric):
     """Inicializa el session_state para cada criterio de la rúbrica."""
     for comp_data in rubric.values():
@@ -515,23 +340,26 @@ def create_radar_chart(component_scores):
     
     return fig
 
-def calculate_results(rubric):
+def calculate_results(rubric, compilada=None):
     """Calcula la calificación final ponderada y prepara los datos para el DF."""
-    total_score_pct = 0
     component_scores = {}
     criteria_details = []
     component_summary_rows = []
 
-    for comp_id, comp_data in rubric.items():
-        comp_score_pct = 0
+    compilada = compilar_rubrica(rubric) if compilada is None else compilada
+    puntajes = vector_puntajes(compilada, {criterion['id']: st.session_state[f"{criterion['id']}_score"]
+                                           for comp_data in rubric.values() for criterion in comp_data["criteria"]})
+    calificacion = calificar(compilada, puntajes)
+    aportes = iter(calificacion["aportes"])
+
+    for (comp_id, comp_data), comp_score_pct in zip(rubric.items(), calificacion["secciones"]):
         short_name = comp_data.get("short_name", comp_data["name"])
         for criterion in comp_data["criteria"]:
             score = st.session_state[f"{criterion['id']}_score"]
             feedback = st.session_state[f"{criterion['id']}_feedback"]
             weight_pct = criterion['weight']
             
-            criterion_weighted_points = (score / 5.0) * weight_pct
-            comp_score_pct += criterion_weighted_points
+            criterion_weighted_points = next(aportes)
             
             criteria_details.append({
                 "Componente": short_name,
@@ -551,7 +379,6 @@ def calculate_results(rubric):
             "weight": comp_data['weight'],
             "normalized_score": normalized_component_score
         }
-        total_score_pct += comp_score_pct
         component_summary_rows.append({
             "Componente": short_name,
             "Peso (%)": comp_data['weight'],
@@ -560,7 +387,8 @@ def calculate_results(rubric):
             "Calificación (0-5)": normalized_component_score * 5
         })
 
-    final_grade_5_0_scale = (total_score_pct / 100.0) * 5.0
+    total_score_pct = calificacion["total"]
+    final_grade_5_0_scale = calificacion["final"]
     
     results_df = pd.DataFrame(criteria_details)
     component_summary_df = pd.DataFrame(component_summary_rows)
@@ -734,7 +562,7 @@ def main():
         display_component_criteria(RUBRIC_DATA["C"])
     
     # Calcular resultados
-    results = calculate_results(RUBRIC_DATA)
+    results = calculate_results(RUBRIC_DATA, RUBRICA_COMPILADA)
     
     # Mostrar resultados en sidebar
     display_results_sidebar(results, project_info, sidebar_placeholder, RUBRIC_DATA)
@@ -4,6 +4,8 @@ import pandas as pd
 import base64
 from datetime import datetime
 
+from rubricas import calificar, compilar_rubrica, vector_puntajes
+
 # --- Configuración de la Página ---
 st.set_page_config(layout="wide", page_title="Rúbrica")
 
@@ -188,6 +190,9 @@ criterios_por_seccion_key = {
     "s1": criterios_seccion1, "s2": criterios_seccion2,
     "s3": criterios_seccion3, "s4": criterios_seccion4,
 }
+# Índice plano de criterios por sección con su peso (ver rubricas.py)
+RUBRICA_COMPILADA = compilar_rubrica({nombre_largo: criterios_por_seccion_key[secciones_map[nombre_largo]]
+                                      for nombre_largo in pesos}, pesos)
 
 # --- Inicialización del Estado de Sesión ---
 def inicializar_estado():
@@ -269,29 +274,28 @@ def guardar_datos_seccion_actual(seccion_key_short, criterios_dict):
     # Calcular y actualizar el promedio después de guardar
     calcular_promedio_seccion(seccion_key_short, criterios_dict)
 
+def calcular_resultados():
+    """Califica todas las secciones de una vez, actualiza los promedios almacenados y devuelve el total ponderado (0-100)."""
+    puntajes = {}
+    for nombre_largo in RUBRICA_COMPILADA["secciones"]:
+        seccion_data = st.session_state.datos_evaluacion.get(secciones_map[nombre_largo], {}).get("criterios", {})
+        puntajes[nombre_largo] = {}
+        for idx, criterio in enumerate(criterios_por_seccion_key[secciones_map[nombre_largo]]):
+            crit_data = seccion_data.get(idx, {"score": 0, "na": True}) # Obtener datos guardados
+            puntajes[nombre_largo][criterio] = None if crit_data.get("na", False) else crit_data.get("score", 0)
+
+    # Promedio de los criterios no marcados N/A por sección y suma ponderada por `pesos`
+    calificacion = calificar(RUBRICA_COMPILADA, vector_puntajes(RUBRICA_COMPILADA, puntajes))
+    if 'puntuaciones_secciones_bruto' not in st.session_state: # Inicializar si falta
+         st.session_state.puntuaciones_secciones_bruto = {nl: 0.0 for nl in pesos.keys()}
+    st.session_state.puntuaciones_secciones_bruto.update(zip(RUBRICA_COMPILADA["secciones"], calificacion["promedios"]))
+    return calificacion["final"]
+
 def calcular_promedio_seccion(seccion_key_short, criterios_dict):
     """Calcula el promedio basado en st.session_state.datos_evaluacion."""
-    suma_puntajes = 0; criterios_evaluados = 0
-    seccion_data = st.session_state.datos_evaluacion.get(seccion_key_short, {}).get("criterios", {})
-    num_criterios_definidos = len(criterios_dict)
-
-    for idx in range(num_criterios_definidos):
-        crit_data = seccion_data.get(idx, {"score": 0, "na": True}) # Obtener datos guardados
-        if not crit_data.get("na", False):
-            suma_puntajes += crit_data.get("score", 0)
-            criterios_evaluados += 1
-            
-    promedio = suma_puntajes / criterios_evaluados if criterios_evaluados > 0 else 0.0
-    
+    calcular_resultados()
     nombre_largo_seccion_actual = next((k for k, v in secciones_map.items() if v == seccion_key_short), None)
-    
-    # Asegurar que la clave exista en el diccionario de promedios antes de asignar
-    if nombre_largo_seccion_actual and nombre_largo_seccion_actual in pesos: # Solo si la sección tiene peso
-        if 'puntuaciones_secciones_bruto' not in st.session_state: # Inicializar si falta
-             st.session_state.puntuaciones_secciones_bruto = {nl: 0.0 for nl in pesos.keys()}
-        st.session_state.puntuaciones_secciones_bruto[nombre_largo_seccion_actual] = promedio
-
-    return promedio
+    return st.session_state.puntuaciones_secciones_bruto.get(nombre_largo_seccion_actual, 0.0)
 
 def navegar_a(nombre_pagina_display):
     st.session_state.current_page = nombre_pagina_display
@@ -305,14 +309,7 @@ def accion_navegacion(seccion_key_short_actual, criterios_dict_actual, proxima_p
 # --- Generador de HTML (Leerá datos actualizados de st.session_state.datos_evaluacion) ---
 def generar_html_reporte_v7():
     # Asegurar que los promedios estén actualizados antes de generar el reporte
-    for skey_html, crit_dict_html in criterios_por_seccion_key.items():
-        calcular_promedio_seccion(skey_html, crit_dict_html)
-
-    total_ponderado_html = 0
-    # Calcular puntaje total basado en los promedios almacenados
-    for nombre_largo_html, promedio_bruto_html in st.session_state.puntuaciones_secciones_bruto.items():
-         if nombre_largo_html in pesos: # Solo considerar secciones con peso
-              total_ponderado_html += promedio_bruto_html * pesos[nombre_largo_html]
+    total_ponderado_html = calcular_resultados()
 
     # Inicio del HTML (estilos y encabezado)
     html_text = f"""
@@ -515,11 +512,7 @@ elif current_page_display in secciones_display_order[2:-1]:
 # Página de Resultados Finales
 elif current_page_display == "Resultados y Comentarios Finales":
     st.header("📊 Puntuación Final y Comentarios Generales")
-    for skey_res, crit_dict_res in criterios_por_seccion_key.items(): calcular_promedio_seccion(skey_res, crit_dict_res) # Asegurar promedios actualizados
-    
-    puntaje_total_ponderado = 0
-    for nombre_largo_res, promedio_bruto_res in st.session_state.puntuaciones_secciones_bruto.items():
-        if nombre_largo_res in pesos: puntaje_total_ponderado += promedio_bruto_res * pesos[nombre_largo_res]
+    puntaje_total_ponderado = calcular_resultados() # Asegura promedios actualizados
 
     st.subheader(f"Puntuación Total Ponderada: {puntaje_total_ponderado:.2f} / 100")
     st.progress(min(max(0, int(puntaje_total_ponderado)), 100)) # Asegurar entre 0 y 100
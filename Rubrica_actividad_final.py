@@ -5,6 +5,8 @@ import base64
 from datetime import datetime
 import html # Para escapar HTML en el reporte
 
+from rubricas import calificar, compilar_rubrica, vector_puntajes
+
 # --- Configuración de la Página ---
 st.set_page_config(layout="wide", page_title="Rúbrica Visualización Python V7.7")
 
@@ -115,6 +117,9 @@ rubrica_data = {
 niveles_desempeno_rubrica = {4: "Excelente", 3: "Bueno", 2: "Regular", 1: "Insuficiente", 0: "No Presentado"}
 puntos_posibles_por_criterio = 4
 
+# Índice plano de criterios y pesos (ver rubricas.py)
+RUBRICA_COMPILADA = compilar_rubrica(rubrica_data)
+
 # --- Inicialización del Estado de Sesión ---
 def inicializar_estado_nueva_rubrica():
     if 'current_page_nr2' not in st.session_state: st.session_state.current_page_nr2 = "Información General"
@@ -187,29 +192,26 @@ def render_rubric_table_section(seccion_nombre, detalles_seccion):
 def calcular_resultados_nr2():
     # (Sin cambios funcionales mayores respecto a V7.4, se asume que lee bien de calificaciones_nr2)
     resultados = {"secciones": {}, "total_obtenido": 0, "max_posible_evaluado": 0, "calificacion_final_ponderada": 0}
-    peso_total_efectivo = 0
+    activas = []
     for seccion, detalles_seccion in rubrica_data.items():
         evaluar_seccion = True
         if detalles_seccion.get("opcional", False):
             if seccion == "Presentación Oral / Demostración" and not st.session_state.get("presentacion_oral_activa_nr2", True): evaluar_seccion = False
             if seccion == "Contribución del Equipo" and not st.session_state.get("contribucion_equipo_activa_nr2", True): evaluar_seccion = False
-        if not evaluar_seccion:
+        activas.append(evaluar_seccion)
+    # Promedio de los criterios calificados por sección y renormalización por las secciones activas (ver rubricas.py)
+    calificacion = calificar(RUBRICA_COMPILADA, vector_puntajes(RUBRICA_COMPILADA, st.session_state.calificaciones_nr2), activas)
+    for j, (seccion, detalles_seccion) in enumerate(rubrica_data.items()):
+        if not activas[j]:
             resultados["secciones"][seccion] = {"obtenido": "N/A", "max_posible": "N/A", "rendimiento_0_1": "N/A", "peso_aplicado": 0, "evaluada": False}
             continue
-        puntos_obtenidos_seccion = 0; max_puntos_posibles_seccion = 0;
-        for criterio_key in detalles_seccion["criterios"].keys():
-            score = st.session_state.calificaciones_nr2.get(seccion, {}).get(criterio_key)
-            if score is not None:
-                puntos_obtenidos_seccion += score; max_puntos_posibles_seccion += puntos_posibles_por_criterio;
-        rendimiento_seccion = puntos_obtenidos_seccion / max_puntos_posibles_seccion if max_puntos_posibles_seccion > 0 else 0
+        puntos_obtenidos_seccion = int(calificacion["sumas"][j]); max_puntos_posibles_seccion = int(calificacion["calificados"][j]) * puntos_posibles_por_criterio
+        rendimiento_seccion = calificacion["promedios"][j] / puntos_posibles_por_criterio
         resultados["secciones"][seccion] = {"obtenido": puntos_obtenidos_seccion, "max_posible": max_puntos_posibles_seccion, "rendimiento_0_1": rendimiento_seccion, "peso_aplicado": detalles_seccion["peso"], "evaluada": True}
-        if evaluar_seccion: 
-            resultados["total_obtenido"] += puntos_obtenidos_seccion
-            resultados["max_posible_evaluado"] += max_puntos_posibles_seccion
-            resultados["calificacion_final_ponderada"] += rendimiento_seccion * detalles_seccion["peso"]
-            peso_total_efectivo += detalles_seccion["peso"]
-    if peso_total_efectivo > 0: resultados["calificacion_final_100"] = (resultados["calificacion_final_ponderada"] / peso_total_efectivo) * 100
-    else: resultados["calificacion_final_100"] = 0
+        resultados["total_obtenido"] += puntos_obtenidos_seccion
+        resultados["max_posible_evaluado"] += max_puntos_posibles_seccion
+    resultados["calificacion_final_ponderada"] = calificacion["secciones"].sum()
+    resultados["calificacion_final_100"] = calificacion["final"]
     if resultados["max_posible_evaluado"] > 0: resultados["puntuacion_total_ratio_100"] = (resultados["total_obtenido"] / resultados["max_posible_evaluado"]) * 100
     else: resultados["puntuacion_total_ratio_100"] = 0
     return resultados
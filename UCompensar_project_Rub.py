@@ -2,6 +2,9 @@ import streamlit as st
 import pandas as pd
 import datetime
 import json
+
+from rubricas import calificar, compilar_rubrica, vector_puntajes
+
 try:
     import plotly.graph_objects as go
     PLOTLY_AVAILABLE = True
@@ -112,6 +115,9 @@ RUBRIC_DATA = {
     }
 }
 
+# Índice plano de criterios y pesos: la nota es un producto punto (ver rubricas.py)
+RUBRICA_COMPILADA = compilar_rubrica(RUBRIC_DATA)
+
 # --- Textos de Instrucciones y Diseño ---
 INSTRUCTIONS_MD = """
 **Introducción:**
@@ -903,17 +909,9 @@ with tab_rubric:
 
         if is_valid:
             # --- Cálculo de la Puntuación ---
-            total_score_pct = 0
-            weighted_scores = {}
-
-            for key, item in RUBRIC_DATA.items():
-                score = scores[key]
-                weight = item["weight"]
-                item_score_pct = (score / 5) * (weight * 100)
-                weighted_scores[key] = round(item_score_pct, 2)
-                total_score_pct += item_score_pct
-
-            total_score_pct = round(total_score_pct, 2)
+            calificacion = calificar(RUBRICA_COMPILADA, vector_puntajes(RUBRICA_COMPILADA, scores))
+            weighted_scores = {key: round(aporte, 2) for key, aporte in zip(RUBRIC_DATA, calificacion["aportes"])}
+            total_score_pct = round(calificacion["final"], 2)
 
             # --- Mostrar Resultados en Panel Derecho ---
             with col_results:
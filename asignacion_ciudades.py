@@ -0,0 +1,190 @@
+"""
+Distribución óptima de aspirantes entre ciudades (modelo paramétrico ESAP).
+
+Un concurso con N aspirantes puede aplicarse en varias ciudades a la vez, cada
+una con su mínimo, su máximo y su factor de transporte. Cada ciudad se cotiza
+por separado con las reglas de `calcular_costo_parametrico`, así que el
+problema es elegir n_c (Σ n_c = N) que minimice Σ costo_c(n_c).
+
+Se resuelve con programación dinámica sobre las ciudades; el estado es el
+número de aspirantes ya asignados. La transición aprovecha la estructura
+escalonada del costo:
+
+- dentro de un bloque de 25 aspirantes (un salón) el costo es
+  fijo(salones) + precio_tramo · n, lineal en n, y los tramos de impresión
+  coinciden con bordes de bloque; así, el mejor n de cada bloque sale de un
+  mínimo en ventana de 25 sobre la tabla anterior;
+- el costo fijo se repite cada `PERIODO_SALONES` salones (60 salones = 3
+  sitios de 500) con un incremento constante, así que en el último tramo de
+  impresión todos los bloques congruentes módulo 60 se resuelven juntos con un
+  mínimo acumulado.
+
+Cada ciudad cuesta del orden de 200 operaciones vectoriales sobre N + 1
+estados, en lugar de N²/2 comparaciones.
+"""
+import numpy as np
+import pandas as pd
+
+from indice_escalones import PERIODO_SALONES, _costo_fijo, construir_indice
+from modelo_parametrico import ASPIRANTES_POR_SALON, SALONES_POR_SITIO, _techo
+from tarifario import resolver_tarifario
+
+
+def _minimo_ventana(valores, ancho):
+    """m[v] = min(valores[v : v + ancho]), con inf más allá del final."""
+    extendido = np.concatenate([valores, np.full(ancho - 1, np.inf)])
+    return np.lib.stride_tricks.sliding_window_view(extendido, ancho).min(axis=1)
+
+
+def _minimo_ventana_filas(valores, ancho):
+    """m[i] = min(valores[max(0, i - ancho + 1) : i + 1]) por columnas (ventana hacia atrás en el eje 0)."""
+    if ancho >= len(valores):
+        return np.minimum.accumulate(valores, axis=0)
+    relleno = np.full((ancho - 1,) + valores.shape[1:], np.inf)
+    extendido = np.concatenate([relleno, valores])
+    return np.lib.stride_tricks.sliding_window_view(extendido, ancho, axis=0).min(axis=-1)
+
+
+def _costos_ciudad(indice, factor, max_salones):
+    """Costo fijo (personal, insumos y transporte) para 0..max_salones salones."""
+    salones = np.arange(max_salones + 1, dtype=np.int64)
+    fijo, _ = _costo_fijo(indice, salones)
+    transporte = indice["costo_transporte_sitio"] * _techo(salones, SALONES_POR_SITIO) * factor
+    return fijo + transporte
+
+
+def _precio_por_salon(indice, max_salones):
+    precio = np.empty(max_salones + 1)
+    for inicio, fin, p in indice["tramos"]:
+        desde = _techo(inicio, ASPIRANTES_POR_SALON)
+        hasta = max_salones if fin is None else min(fin // ASPIRANTES_POR_SALON, max_salones)
+        precio[desde:hasta + 1] = p
+    precio[0] = 0
+    return precio
+
+
+def _costo_n(costo_salones, precio_salon, n):
+    """Costo exacto de atender n aspirantes (arreglo) en una ciudad."""
+    salones = _techo(n, ASPIRANTES_POR_SALON)
+    return np.where(n > 0, costo_salones[salones] + precio_salon[salones] * n, 0.0)
+
+
+def _paso(anterior, costo_salones, precio_salon, minimo, maximo):
+    """
+    Tabla nueva[t] = min_n anterior[t - n] + costo(n) con n en {0 si minimo == 0} ∪ [minimo, maximo].
+    """
+    N = len(anterior) - 1
+    t = np.arange(N + 1, dtype=np.float64)
+    nuevo = anterior.copy() if minimo == 0 else np.full(N + 1, np.inf)
+    minimo, maximo = max(minimo, 1), min(maximo, N)
+    if minimo > maximo:
+        return nuevo
+
+    def relajar(desde, candidato):
+        np.minimum(nuevo[desde:], candidato, out=nuevo[desde:])
+
+    # Bloques de borde (parcialmente dentro de [minimo, maximo]): n por n
+    s_lo = _techo(minimo, ASPIRANTES_POR_SALON)
+    s_hi = _techo(maximo, ASPIRANTES_POR_SALON)
+    bordes = {s_lo, s_hi}
+    for s in bordes:
+        for n in range(max(minimo, (s - 1) * ASPIRANTES_POR_SALON + 1), min(maximo, s * ASPIRANTES_POR_SALON) + 1):
+            relajar(n, anterior[:N + 1 - n] + (costo_salones[s] + precio_salon[s] * n))
+
+    # Bloques interiores: min sobre el bloque de anterior[u] + p·(t - u) con u = t - n
+    interiores = np.arange(s_lo + 1, s_hi)
+    if len(interiores) == 0:
+        return nuevo
+    # ventanas[p][k] = min(anterior[u] - p·u) para u en [k - 25, k - 1]
+    ventanas = {}
+    for p in np.unique(precio_salon[interiores]):
+        escalado = np.concatenate([np.full(ASPIRANTES_POR_SALON, np.inf), anterior - p * t])
+        ventanas[p] = _minimo_ventana(escalado, ASPIRANTES_POR_SALON)
+
+    def relajar_bloque(s, p, ventana, costo_fijo):
+        # n en el bloque s equivale a u = t - n en [t - 25s, t - 25s + 24], es decir k = t - 25(s - 1)
+        desde = ASPIRANTES_POR_SALON * (s - 1)
+        if desde <= N:
+            relajar(desde, costo_fijo + p * t[desde:] + ventana[:N + 1 - desde])
+
+    ultimo = interiores[precio_salon[interiores] == precio_salon[interiores[-1]]]
+    cortos = interiores[:len(interiores) - len(ultimo)]
+    if len(ultimo) <= 2 * PERIODO_SALONES:
+        cortos, ultimo = interiores, interiores[:0]
+    for s in cortos:
+        p = precio_salon[s]
+        relajar_bloque(s, p, ventanas[p], costo_salones[s])
+
+    if len(ultimo):
+        # Último tramo: s = s0 + r + 60·m; el costo fijo sube `delta` por cada periodo completo
+        s0, s1 = int(ultimo[0]), int(ultimo[-1])
+        p = precio_salon[s0]
+        delta = costo_salones[s0 + PERIODO_SALONES] - costo_salones[s0]
+        paso_aspirantes = PERIODO_SALONES * ASPIRANTES_POR_SALON
+        ventana = ventanas[p]
+        filas = -(-len(ventana) // paso_aspirantes)
+        tabla = np.concatenate([ventana, np.full(filas * paso_aspirantes - len(ventana), np.inf)])
+        tabla = tabla.reshape(filas, paso_aspirantes) - delta * np.arange(filas)[:, None]
+        acumulados = {}
+        for r in range(min(PERIODO_SALONES, s1 - s0 + 1)):
+            m_max = (s1 - s0 - r) // PERIODO_SALONES
+            if m_max not in acumulados:
+                minimo_filas = _minimo_ventana_filas(tabla, m_max + 1)
+                acumulados[m_max] = (minimo_filas + delta * np.arange(filas)[:, None]).ravel()[:len(ventana)]
+            relajar_bloque(s0 + r, p, acumulados[m_max], costo_salones[s0 + r])
+    return nuevo
+
+
+def optimizar_asignacion(total_aspirantes, ciudades, tipo_prueba="Escrita", minimos=None, maximos=None,
+                         factores=None, tarifario=None):
+    """
+    Reparto de `total_aspirantes` entre `ciudades` con el menor costo total.
+
+    `minimos`, `maximos` y `factores` son diccionarios opcionales por ciudad
+    (por defecto 0, sin tope y el factor de transporte del tarifario). Devuelve
+    un diccionario con "asignacion" (DataFrame con Ciudad, Aspirantes,
+    Salones, Sitios y Costo), "costo_total" y la versión del tarifario. Lanza
+    `ValueError` si los mínimos y máximos no permiten repartir la demanda.
+    """
+    tarifario = resolver_tarifario(tarifario)
+    ciudades = list(ciudades)
+    N = int(total_aspirantes)
+    minimos = {c: int((minimos or {}).get(c, 0)) for c in ciudades}
+    maximos = {c: int(min((maximos or {}).get(c, N), N)) for c in ciudades}
+    if any(minimos[c] > maximos[c] for c in ciudades) or sum(minimos.values()) > N \
+            or sum(maximos.values()) < N:
+        raise ValueError("Los mínimos y máximos por ciudad no permiten repartir la demanda total.")
+
+    max_salones = _techo(N, ASPIRANTES_POR_SALON) + PERIODO_SALONES
+    tablas = [np.r_[0.0, np.full(N, np.inf)]]
+    costos = []
+    for ciudad in ciudades:
+        indice = construir_indice(ciudad, tipo_prueba, tarifario)
+        if any(fin is not None and fin % ASPIRANTES_POR_SALON for _, fin, _ in indice["tramos"]):
+            raise ValueError("Los tramos de impresión deben terminar en múltiplos de "
+                             f"{ASPIRANTES_POR_SALON} aspirantes para optimizar el reparto.")
+        factor = (factores or {}).get(ciudad, indice["factor_ciudad"])
+        costo_salones = _costos_ciudad(indice, factor, max_salones)
+        precio_salon = _precio_por_salon(indice, max_salones)
+        costos.append((costo_salones, precio_salon))
+        tablas.append(_paso(tablas[-1], costo_salones, precio_salon, minimos[ciudad], maximos[ciudad]))
+
+    # Reconstrucción: para cada ciudad, el n que explica el valor óptimo de la tabla
+    asignacion = {}
+    restante = N
+    for i in range(len(ciudades) - 1, -1, -1):
+        ciudad = ciudades[i]
+        n = np.arange(minimos[ciudad], min(maximos[ciudad], restante) + 1)
+        valores = tablas[i][restante - n] + _costo_n(*costos[i], n)
+        asignacion[ciudad] = int(n[np.argmin(valores)])
+        restante -= asignacion[ciudad]
+
+    filas = []
+    for i, ciudad in enumerate(ciudades):
+        n = asignacion[ciudad]
+        salones = _techo(n, ASPIRANTES_POR_SALON)
+        filas.append({"Ciudad": ciudad, "Aspirantes": n, "Salones": salones,
+                      "Sitios": _techo(salones, SALONES_POR_SITIO),
+                      "Costo": float(_costo_n(*costos[i], np.array(n)))})
+    df = pd.DataFrame(filas)
+    return {"asignacion": df, "costo_total": float(df["Costo"].sum()), "tarifario": tarifario["version"]}
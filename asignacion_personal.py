@@ -0,0 +1,222 @@
+"""
+Planilla de personal para el día de la prueba.
+
+Convierte los conteos de personal del modelo (delegados, jefes de salón,
+dactiloscopistas, coordinadores, aseo y seguridad) en asignaciones concretas
+persona -> sitio/salón a partir de un archivo local con el personal
+disponible. Reglas:
+
+- solo se asigna personal disponible, de la ciudad de la prueba y con el rol
+  pedido (los que tengan columna `Prioridad` se asignan primero),
+- cada persona queda en un único sitio (y una única asignación),
+- los cupos se calculan por sitio con las reglas de negocio: un delegado y
+  `SEGURIDAD_POR_SITIO` vigilantes por sitio, un jefe por salón (dos en
+  modalidad Virtual) y un dactiloscopista, coordinador o aseo por cada grupo
+  de 4 o 6 salones *del mismo sitio*. Como una persona no puede repartirse
+  entre sitios, la planilla puede pedir algunas personas más que el conteo
+  agregado de `calcular_costo_parametrico` (la línea de comandos muestra ambos).
+
+Las asignaciones se guardan como arreglos de enteros (rol, sitio, salón,
+persona) y solo se convierten a texto al exportar, así que planillas
+nacionales con decenas de miles de personas se generan en milisegundos.
+
+Uso:
+    python asignacion_personal.py personal.csv planilla.parquet --aspirantes 100000 --ciudad Bogotá
+    python asignacion_personal.py personal.csv planilla.csv --aspirantes 8000 --catalogo catalogo_sitios.csv
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from cotizacion_masiva import ESCRITORES
+from modelo_parametrico import (
+    ASPIRANTES_POR_SALON, RECURSOS_PERSONAL, SALONES_POR_ASEO, SALONES_POR_COORDINADOR,
+    SALONES_POR_DACTILOSCOPISTA, SALONES_POR_SITIO, SEGURIDAD_POR_SITIO, _techo, calcular_costo_parametrico,
+)
+
+COLUMNAS_PERSONAL = ["Documento", "Nombre", "Rol", "Ciudad"]
+VALORES_DISPONIBLE = {"si", "sí", "s", "true", "1", "x", "disponible"}
+
+# Rol -> salones que cubre cada persona (None = una por sitio)
+SALONES_POR_ROL = {
+    'Delegado': None,
+    'Jefe Salón': 1,
+    'Dactiloscopista': SALONES_POR_DACTILOSCOPISTA,
+    'Coord. Aulas': SALONES_POR_COORDINADOR,
+    'Aseo': SALONES_POR_ASEO,
+    'Seguridad': None,
+}
+assert list(SALONES_POR_ROL) == RECURSOS_PERSONAL
+
+
+def cargar_personal(ruta):
+    """Lee el personal (.csv o .xlsx) con las columnas de `COLUMNAS_PERSONAL` y opcionalmente Disponible."""
+    extension = os.path.splitext(ruta)[1].lower()
+    tipos = {c: str for c in COLUMNAS_PERSONAL}
+    if extension == ".csv":
+        personal = pd.read_csv(ruta, dtype=tipos)
+    elif extension in (".xlsx", ".xlsm"):
+        personal = pd.read_excel(ruta, dtype=tipos)
+    else:
+        raise ValueError(f"Formato de personal no soportado: {extension} (use .csv o .xlsx)")
+    faltantes = [c for c in COLUMNAS_PERSONAL if c not in personal.columns]
+    if faltantes:
+        raise ValueError(f"Faltan columnas en el archivo de personal: {faltantes}")
+    return personal
+
+
+def salones_por_reglas(n_aspirantes):
+    """Sitios y salones de las reglas de negocio (salones de 25, sitios de 20 salones)."""
+    n_salones = _techo(n_aspirantes, ASPIRANTES_POR_SALON)
+    salon = np.arange(n_salones)
+    return pd.DataFrame({"Sitio": [f"Sitio {i + 1}" for i in salon // SALONES_POR_SITIO],
+                         "Salón": [f"Salón {j + 1}" for j in salon % SALONES_POR_SITIO]})
+
+
+def _disponibles(personal, ciudad):
+    mascara = np.ones(len(personal), dtype=bool)
+    if "Disponible" in personal:
+        disponible = personal["Disponible"]
+        if disponible.dtype != bool:
+            disponible = disponible.astype("string").str.strip().str.lower().isin(VALORES_DISPONIBLE)
+        mascara &= disponible.to_numpy(dtype=bool, na_value=False)
+    if ciudad is not None:
+        mascara &= (personal["Ciudad"] == ciudad).to_numpy(dtype=bool, na_value=False)
+    return mascara
+
+
+def generar_planilla(salones, personal, tipo_prueba="Escrita", ciudad=None):
+    """
+    Asigna el personal a los sitios y salones de `salones` (DataFrame con Sitio y Salón).
+
+    `salones` puede ser la salida de `asignacion_salones.asignar_salones(...)["salones"]`
+    o la de `salones_por_reglas`. Devuelve un diccionario con los arreglos de
+    la planilla ("rol", "sitio", "salon", "cubre", "persona"; persona = -1
+    si el cupo quedó sin cubrir), las tablas de búsqueda ("roles", "sitios",
+    "salones", "personal") y un "resumen" por rol.
+    """
+    sitio_codigo, sitios = pd.factorize(salones["Sitio"], sort=False)
+    orden = np.argsort(sitio_codigo, kind="stable")
+    sitio_codigo = sitio_codigo[orden]
+    nombres_salon = salones["Salón"].to_numpy()[orden]
+    salones_sitio = np.bincount(sitio_codigo, minlength=len(sitios))
+    primer_salon = np.concatenate([[0], np.cumsum(salones_sitio)[:-1]])
+
+    # Cupos por rol como arreglos (sitio, primer salón cubierto, salones cubiertos)
+    cupos = []
+    for codigo_rol, (rol, por_persona) in enumerate(SALONES_POR_ROL.items()):
+        if por_persona is None:
+            por_sitio = SEGURIDAD_POR_SITIO if rol == 'Seguridad' else 1
+            sitio = np.repeat(np.arange(len(sitios)), por_sitio)
+            salon = np.full(len(sitio), -1)
+            cubre = salones_sitio[sitio]
+        else:
+            grupos = _techo(salones_sitio, por_persona)
+            if rol == 'Jefe Salón' and tipo_prueba == "Virtual":
+                grupos = grupos * 2
+            sitio = np.repeat(np.arange(len(sitios)), grupos)
+            k = np.arange(len(sitio)) - np.repeat(np.cumsum(grupos) - grupos, grupos)
+            if rol == 'Jefe Salón' and tipo_prueba == "Virtual":
+                k = k // 2
+            salon = primer_salon[sitio] + k * por_persona
+            cubre = np.minimum(por_persona, salones_sitio[sitio] - k * por_persona)
+        cupos.append((np.full(len(sitio), codigo_rol, dtype=np.int8), sitio, salon, cubre))
+    rol, sitio, salon, cubre = (np.concatenate(partes) for partes in zip(*cupos))
+
+    # Personal elegible por rol, en orden de prioridad; cada persona entra a lo sumo una vez
+    elegible = _disponibles(personal, ciudad)
+    rol_persona = pd.Categorical(personal["Rol"], categories=list(SALONES_POR_ROL)).codes
+    if "Prioridad" in personal:
+        prioridad = pd.to_numeric(personal["Prioridad"], errors="coerce").fillna(np.inf).to_numpy()
+    else:
+        prioridad = np.zeros(len(personal))
+    candidatos = np.flatnonzero(elegible & (rol_persona >= 0) & ~personal["Documento"].duplicated().to_numpy())
+    candidatos = candidatos[np.lexsort((prioridad[candidatos], rol_persona[candidatos]))]
+    inicio_rol = np.searchsorted(rol_persona[candidatos], np.arange(len(SALONES_POR_ROL) + 1))
+
+    persona = np.full(len(rol), -1, dtype=np.int64)
+    inicio_cupo = np.searchsorted(rol, np.arange(len(SALONES_POR_ROL) + 1))
+    resumen = []
+    for codigo_rol, nombre_rol in enumerate(SALONES_POR_ROL):
+        disponibles = candidatos[inicio_rol[codigo_rol]:inicio_rol[codigo_rol + 1]]
+        desde, hasta = inicio_cupo[codigo_rol], inicio_cupo[codigo_rol + 1]
+        cubiertos = min(hasta - desde, len(disponibles))
+        persona[desde:desde + cubiertos] = disponibles[:cubiertos]
+        resumen.append({"Rol": nombre_rol, "Cupos": hasta - desde, "Asignados": cubiertos,
+                        "Faltantes": hasta - desde - cubiertos, "Disponibles": len(disponibles)})
+
+    return {
+        "rol": rol, "sitio": sitio.astype(np.int32), "salon": salon.astype(np.int32),
+        "cubre": cubre.astype(np.int32), "persona": persona,
+        "roles": list(SALONES_POR_ROL), "sitios": np.asarray(sitios), "salones": nombres_salon,
+        "personal": personal, "resumen": pd.DataFrame(resumen),
+    }
+
+
+def planilla_a_dataframe(planilla):
+    """Planilla en formato tabular (una fila por cupo) para revisar o exportar."""
+    persona = planilla["persona"]
+    asignada = persona >= 0
+    personal = planilla["personal"]
+    salon = planilla["salon"]
+
+    def de_personal(columna):
+        valores = pd.array(personal[columna].to_numpy()[np.where(asignada, persona, 0)], dtype="string")
+        valores[~asignada] = pd.NA
+        return valores
+
+    nombres_salon = pd.array(planilla["salones"][np.maximum(salon, 0)], dtype="string")
+    nombres_salon[salon < 0] = pd.NA
+    return pd.DataFrame({
+        "Rol": pd.Categorical.from_codes(planilla["rol"], planilla["roles"]),
+        "Sitio": planilla["sitios"][planilla["sitio"]],
+        "Salón": nombres_salon,
+        "Salones Cubiertos": planilla["cubre"],
+        "Documento": de_personal("Documento"),
+        "Nombre": de_personal("Nombre"),
+    })
+
+
+def exportar_planilla(planilla, ruta):
+    """Escribe la planilla en .csv o .parquet. Devuelve las filas escritas."""
+    extension = os.path.splitext(ruta)[1].lower()
+    if extension not in ESCRITORES:
+        raise ValueError(f"Formato de salida no soportado: {extension} (use .csv o .parquet)")
+    return ESCRITORES[extension](ruta, [planilla_a_dataframe(planilla)])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Planilla de personal por sitio y salón (ESAP).")
+    parser.add_argument("personal", help="Archivo .csv o .xlsx con el personal (Documento, Nombre, Rol, Ciudad)")
+    parser.add_argument("salida", help="Archivo de salida .csv o .parquet")
+    parser.add_argument("--aspirantes", type=int, required=True)
+    parser.add_argument("--ciudad", default="Bogotá")
+    parser.add_argument("--modalidad", default="Escrita", choices=["Escrita", "Virtual"])
+    parser.add_argument("--catalogo", default=None,
+                        help="Catálogo de sitios para asignar salones reales (por defecto, reglas de 500/25)")
+    args = parser.parse_args(argv)
+
+    try:
+        personal = cargar_personal(args.personal)
+        if args.catalogo:
+            from asignacion_salones import asignar_salones, cargar_catalogo
+            salones = asignar_salones(args.aspirantes, cargar_catalogo(args.catalogo), args.modalidad,
+                                      args.ciudad)["salones"]
+        else:
+            salones = salones_por_reglas(args.aspirantes)
+        planilla = generar_planilla(salones, personal, args.modalidad, args.ciudad)
+        filas = exportar_planilla(planilla, args.salida)
+    except (OSError, ValueError, KeyError, ImportError) as e:
+        parser.error(str(e))
+
+    modelo = calcular_costo_parametrico(args.aspirantes, args.ciudad, args.modalidad)["logistica"]
+    print(planilla["resumen"].to_string(index=False))
+    print(f"Staff del modelo agregado: {modelo['Staff Total']:,}; cupos de la planilla: {filas:,} -> {args.salida}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
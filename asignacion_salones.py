@@ -0,0 +1,210 @@
+"""
+Asignación de aspirantes a sitios y salones reales para el día de la prueba.
+
+El modelo paramétrico supone sitios de 500 y salones de 25 aspirantes. Con un
+catálogo de sitios (cada salón con su capacidad) este módulo elige qué sitios
+y salones abrir y cuántos aspirantes van a cada uno, y con esos conteos reales
+recalcula el desglose de costos.
+
+Abrir un sitio cuesta su delegado, la seguridad y el transporte; abrir un
+salón cuesta su jefe y su kit más la fracción de dactiloscopista, coordinador
+y aseo que le corresponde. Como todos los salones cuestan lo mismo, en cada
+sitio conviene abrir primero los más grandes, y el costo por cupo de un sitio
+es una curva convexa: un primer tramo con sus k* salones más grandes (el k que
+minimiza (costo_sitio + k·costo_salón) / cupos) y después salón por salón.
+
+1. Los tramos de todos los sitios se ordenan por costo por cupo; ese orden
+   llenado fraccionalmente es la relajación lineal del problema y da una cota
+   inferior del costo de apertura.
+2. La heurística toma los tramos en ese mismo orden, enteros, hasta que el
+   siguiente ya no cabe completo.
+3. El remanente se cubre con la opción más barata entre: ampliar los sitios
+   ya abiertos con sus salones más grandes, o abrir los salones justos de un
+   sitio nuevo.
+
+La brecha reportada compara el costo de apertura de la solución con la cota.
+
+Todo se hace con operaciones agrupadas de pandas/NumPy sobre el catálogo, sin
+recorrer aspirantes.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from modelo_parametrico import (
+    SALONES_POR_ASEO, SALONES_POR_COORDINADOR, SALONES_POR_DACTILOSCOPISTA, SEGURIDAD_POR_SITIO,
+    calcular_costo_parametrico, factor_ciudad_lote,
+)
+from tarifario import resolver_tarifario
+
+RUTA_CATALOGO = os.environ.get("ESAP_CATALOGO_SITIOS",
+                               os.path.join(os.path.dirname(os.path.abspath(__file__)), "catalogo_sitios.csv"))
+COLUMNAS_CATALOGO = ["Ciudad", "Sitio", "Salón", "Capacidad"]
+
+
+def cargar_catalogo(ruta=None, extension=None):
+    """
+    Lee el catálogo de salones (.csv o .xlsx) con las columnas de `COLUMNAS_CATALOGO`.
+
+    `ruta` también puede ser un archivo ya abierto (p. ej. el que sube el
+    usuario en la Calculadora); `extension` indica entonces el formato.
+    """
+    ruta = ruta or RUTA_CATALOGO
+    extension = (extension or os.path.splitext(ruta)[1]).lower()
+    if extension == ".csv":
+        catalogo = pd.read_csv(ruta, dtype={"Ciudad": str, "Sitio": str, "Salón": str})
+    elif extension in (".xlsx", ".xlsm"):
+        catalogo = pd.read_excel(ruta, dtype={"Ciudad": str, "Sitio": str, "Salón": str})
+    else:
+        raise ValueError(f"Formato de catálogo no soportado: {extension} (use .csv o .xlsx)")
+    return validar_catalogo(catalogo)
+
+
+def validar_catalogo(catalogo):
+    faltantes = [c for c in COLUMNAS_CATALOGO if c not in catalogo.columns]
+    if faltantes:
+        raise ValueError(f"Faltan columnas en el catálogo de sitios: {faltantes}")
+    catalogo = catalogo[COLUMNAS_CATALOGO].copy()
+    catalogo["Capacidad"] = pd.to_numeric(catalogo["Capacidad"], errors="coerce").fillna(0).astype(np.int64)
+    return catalogo[catalogo["Capacidad"] > 0].reset_index(drop=True)
+
+
+def catalogo_ejemplo(n_sitios=300, ciudad="Bogotá", semilla=2025):
+    """Catálogo sintético (colegios y universidades de 5 a 60 salones de 15 a 45 cupos) para pruebas."""
+    rng = np.random.default_rng(semilla)
+    salones_por_sitio = rng.integers(5, 61, n_sitios)
+    sitio = np.repeat(np.arange(n_sitios), salones_por_sitio)
+    salon = np.concatenate([np.arange(1, k + 1) for k in salones_por_sitio])
+    return pd.DataFrame({
+        "Ciudad": ciudad,
+        "Sitio": [f"S{i + 1:04d}" for i in sitio],
+        "Salón": [f"A{j:03d}" for j in salon],
+        "Capacidad": rng.choice([15, 20, 25, 30, 35, 40, 45], len(sitio), p=[.05, .15, .3, .25, .15, .07, .03]),
+    })
+
+
+def costos_apertura(tipo_prueba="Escrita", ciudad="Bogotá", tarifario=None):
+    """Costo de abrir un sitio y costo (prorrateado) de abrir un salón."""
+    tarifario = resolver_tarifario(tarifario)
+    precio = tarifario["precio"]
+    factor = float(factor_ciudad_lote(ciudad, tarifario))
+    costo_sitio = (precio['Delegado'] + SEGURIDAD_POR_SITIO * precio['Seguridad']
+                   + tarifario["costo_transporte_sitio"] * factor)
+    costo_salon = (precio['Jefe Salón'] * (2 if tipo_prueba == "Virtual" else 1) + precio['Kit Salón']
+                   + (precio['Dactiloscopista'] + precio['Kit Dactilo']) / SALONES_POR_DACTILOSCOPISTA
+                   + precio['Coord. Aulas'] / SALONES_POR_COORDINADOR
+                   + (precio['Aseo'] + precio['Kit Aseo']) / SALONES_POR_ASEO)
+    return costo_sitio, costo_salon
+
+
+def asignar_salones(n_aspirantes, catalogo, tipo_prueba="Escrita", ciudad="Bogotá", tarifario=None):
+    """
+    Abre sitios y salones del catálogo de `ciudad` para `n_aspirantes` y asigna los aspirantes.
+
+    Devuelve un diccionario con:
+
+    - "salones": DataFrame de los salones abiertos (Sitio, Salón, Capacidad, Asignados),
+    - "sitios": resumen por sitio abierto,
+    - "costo": desglose de `calcular_costo_parametrico` con los sitios y salones reales,
+    - "costo_reglas": el desglose con las reglas de 500/25 para comparar,
+    - "cota_inferior" y "brecha": cota de la relajación lineal del costo de
+      apertura y brecha relativa de la solución contra ella.
+
+    Lanza `ValueError` si la capacidad del catálogo no alcanza.
+    """
+    tarifario = resolver_tarifario(tarifario)
+    salones = validar_catalogo(catalogo)
+    if ciudad is not None:
+        salones = salones[salones["Ciudad"] == ciudad]
+    if salones["Capacidad"].sum() < n_aspirantes:
+        raise ValueError(f"La capacidad del catálogo en {ciudad} ({salones['Capacidad'].sum():,}) "
+                         f"no alcanza para {n_aspirantes:,} aspirantes.")
+    costo_sitio, costo_salon = costos_apertura(tipo_prueba, ciudad, tarifario)
+
+    # Salones de cada sitio del más grande al más pequeño (menos salones por cupo)
+    salones = salones.sort_values(["Sitio", "Capacidad"], ascending=[True, False], kind="stable")
+    por_sitio = salones.groupby("Sitio", sort=False)
+    salones = salones.assign(Acumulado_Sitio=por_sitio["Capacidad"].cumsum(), Orden_Sitio=por_sitio.cumcount() + 1)
+
+    # Tramos: el mejor prefijo k* de cada sitio y luego cada salón restante por separado
+    eficiencia = (costo_sitio + costo_salon * salones["Orden_Sitio"]) / salones["Acumulado_Sitio"]
+    k_optimo = salones.loc[eficiencia.groupby(salones["Sitio"], sort=False).idxmin(), ["Sitio", "Orden_Sitio"]]
+    salones = salones.merge(k_optimo.rename(columns={"Orden_Sitio": "K_Optimo"}), on="Sitio")
+    en_prefijo = salones["Orden_Sitio"] <= salones["K_Optimo"]
+    tramos = pd.concat([
+        pd.DataFrame({"Sitio": k_optimo["Sitio"].to_numpy(), "Salones": k_optimo["Orden_Sitio"].to_numpy(),
+                      "Capacidad": salones.loc[en_prefijo].groupby("Sitio", sort=False)["Capacidad"].sum()
+                      .reindex(k_optimo["Sitio"]).to_numpy(),
+                      "Abre_Sitio": True}),
+        pd.DataFrame({"Sitio": salones.loc[~en_prefijo, "Sitio"].to_numpy(), "Salones": 1,
+                      "Capacidad": salones.loc[~en_prefijo, "Capacidad"].to_numpy(), "Abre_Sitio": False}),
+    ], ignore_index=True)
+    tramos["Costo"] = costo_salon * tramos["Salones"] + costo_sitio * tramos["Abre_Sitio"]
+    tramos = tramos.assign(Costo_Cupo=tramos["Costo"] / tramos["Capacidad"]) \
+        .sort_values(["Costo_Cupo", "Abre_Sitio"], ascending=[True, False], kind="stable")
+    capacidad = tramos["Capacidad"].to_numpy()
+    previo = np.concatenate([[0], np.cumsum(capacidad)[:-1]])
+
+    # 1. Cota inferior: relajación lineal (el último tramo se toma fraccionado)
+    usado = np.clip(n_aspirantes - previo, 0, capacidad)
+    cota = float(np.sum(usado / capacidad * tramos["Costo"].to_numpy()))
+    # Cota entera trivial: al menos un sitio y los salones más grandes que alcancen
+    salones_minimos = -(-n_aspirantes // int(salones["Capacidad"].max()))
+    cota = max(cota, costo_sitio + costo_salon * salones_minimos)
+
+    # 2. Tramos enteros mientras quepan completos
+    completos = tramos[previo + capacidad <= n_aspirantes]
+    remanente = n_aspirantes - int(completos["Capacidad"].sum())
+    abiertos = completos.groupby("Sitio", sort=False)["Salones"].sum().to_dict()  # sitio -> salones más grandes
+
+    # 3. Remanente: ampliar sitios abiertos o abrir los salones justos de un sitio nuevo
+    if remanente > 0:
+        opciones = []
+        restantes = salones[salones["Sitio"].isin(list(abiertos))
+                            & (salones["Orden_Sitio"] > salones["Sitio"].map(abiertos))]
+        acumulado = restantes["Capacidad"].sort_values(ascending=False).cumsum()
+        if len(acumulado) and acumulado.iloc[-1] >= remanente:
+            n_extra = int(np.searchsorted(acumulado.to_numpy(), remanente) + 1)
+            opciones.append((costo_salon * n_extra, "ampliar", n_extra))
+        nuevos = salones[~salones["Sitio"].isin(list(abiertos)) & (salones["Acumulado_Sitio"] >= remanente)]
+        nuevos = nuevos.groupby("Sitio", sort=False).head(1)
+        if len(nuevos):
+            mejor = nuevos.loc[nuevos["Orden_Sitio"].idxmin()]
+            opciones.append((costo_sitio + costo_salon * mejor["Orden_Sitio"], "nuevo", mejor))
+        if not opciones:
+            raise ValueError("No se pudo cubrir el remanente con el catálogo disponible.")
+        _, tipo, detalle = min(opciones, key=lambda o: o[0])
+        if tipo == "nuevo":
+            abiertos[detalle["Sitio"]] = int(detalle["Orden_Sitio"])
+        else:
+            extra = restantes.loc[restantes["Capacidad"].sort_values(ascending=False).index[:detalle]]
+            # Dentro de cada sitio los salones ya están de mayor a menor: los extra amplían su prefijo
+            for sitio, cantidad in extra.groupby("Sitio", sort=False).size().items():
+                abiertos[sitio] += cantidad
+
+    seleccion = salones[salones["Sitio"].isin(list(abiertos))]
+    seleccion = seleccion[seleccion["Orden_Sitio"] <= seleccion["Sitio"].map(abiertos)]
+
+    # 4. Asignación: se llenan los salones en orden hasta cubrir la demanda
+    orden_sitios = {sitio: i for i, sitio in enumerate(abiertos)}
+    seleccion = (seleccion.assign(Orden_Apertura=seleccion["Sitio"].map(orden_sitios))
+                 .sort_values(["Orden_Apertura", "Capacidad"], ascending=[True, False], kind="stable"))
+    capacidad = seleccion["Capacidad"].to_numpy()
+    previo = np.concatenate([[0], np.cumsum(capacidad)[:-1]])
+    seleccion = seleccion.assign(Asignados=np.clip(n_aspirantes - previo, 0, capacidad))
+    seleccion = seleccion[seleccion["Asignados"] > 0][["Ciudad", "Sitio", "Salón", "Capacidad", "Asignados"]]
+    resumen_sitios = seleccion.groupby("Sitio", sort=False).agg(
+        Salones=("Salón", "size"), Capacidad=("Capacidad", "sum"), Asignados=("Asignados", "sum")).reset_index()
+
+    n_sitios, n_salones = len(resumen_sitios), len(seleccion)
+    costo_apertura = costo_sitio * n_sitios + costo_salon * n_salones
+    return {
+        "salones": seleccion.reset_index(drop=True),
+        "sitios": resumen_sitios,
+        "costo": calcular_costo_parametrico(n_aspirantes, ciudad, tipo_prueba, tarifario,
+                                            n_sitios=n_sitios, n_salones=n_salones),
+        "costo_reglas": calcular_costo_parametrico(n_aspirantes, ciudad, tipo_prueba, tarifario),
+        "cota_inferior": cota,
+        "brecha": costo_apertura / cota - 1 if cota > 0 else 0.0,
+    }
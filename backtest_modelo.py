@@ -0,0 +1,159 @@
+"""
+Backtest del modelo paramétrico contra los costos reales del histórico.
+
+Cruza cada concurso del histórico con la cotización vectorizada de
+`calcular_costo_dataframe` (una sola pasada para todo el histórico) y mide
+cuánto se aleja la cotización del costo real:
+
+- error porcentual por concurso: (cotizado - real) / real,
+- MAPE, MdAPE y sesgo (error porcentual medio, positivo = el modelo
+  sobrecotiza) por ciudad y modalidad, y en total,
+- las mismas métricas en ventanas móviles de años (`ANCHO_VENTANA` años que
+  avanzan de a uno), para ver si la deriva crece con el tiempo.
+
+Las ventanas son independientes y se agregan en un pool de procesos que
+recibe los errores una sola vez. Los resultados se guardan en la carpeta de
+caché del histórico con la huella de los datos y del tarifario en el nombre,
+así que el tablero los lee al instante hasta que cambia alguno de los dos.
+"""
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from historico_costos import RUTA_CACHE
+from modelo_parametrico import calcular_costo_dataframe
+from tarifario import resolver_tarifario
+
+ANCHO_VENTANA = 3
+GRUPOS = ["Ciudad", "Modalidad"]
+TODAS = "Todas"
+
+# Por debajo de este número de ventanas no compensa arrancar procesos
+MIN_VENTANAS_PARALELO = 8
+
+_datos_proceso = {}  # errores del backtest en cada proceso del pool
+
+
+def residuos_backtest(df, tarifario=None):
+    """Histórico con Costo_Modelo, Error (COP) y Error_Pct por concurso."""
+    tarifario = resolver_tarifario(tarifario)
+    cotizado = calcular_costo_dataframe(df[["Aspirantes"] + [c for c in GRUPOS if c in df.columns]],
+                                        tarifario=tarifario)["Total"]
+    residuos = df.copy()
+    residuos["Costo_Modelo"] = cotizado.to_numpy()
+    residuos["Error"] = residuos["Costo_Modelo"] - residuos["Costo_Total"]
+    residuos["Error_Pct"] = residuos["Error"] / residuos["Costo_Total"]
+    for columna, defecto in (("Ciudad", "Bogotá"), ("Modalidad", "Escrita")):
+        if columna not in residuos.columns:
+            residuos[columna] = defecto
+    return residuos
+
+
+def periodo(df):
+    """Año de cada concurso (columna Año o año de Fecha); None si el histórico no tiene fechas."""
+    if "Año" in df.columns:
+        return pd.to_numeric(df["Año"], errors="coerce")
+    if "Fecha" in df.columns:
+        return pd.to_datetime(df["Fecha"], errors="coerce").dt.year
+    return None
+
+
+def ventanas_moviles(anios, ancho=ANCHO_VENTANA):
+    """Lista de (etiqueta, año inicial, año final) de ancho `ancho` que avanzan de a un año."""
+    anios = sorted({int(a) for a in anios if pd.notna(a)})
+    if not anios:
+        return []
+    inicios = range(anios[0], max(anios[0], anios[-1] - ancho + 1) + 1)
+    return [(f"{a}" if ancho == 1 else f"{a}–{a + ancho - 1}", a, a + ancho - 1) for a in inicios]
+
+
+def metricas_error(residuos):
+    """MAPE, MdAPE y sesgo por ciudad y modalidad, más una fila con el total."""
+    absoluto = residuos["Error_Pct"].abs()
+    tabla = residuos.assign(APE=absoluto)
+    por_grupo = tabla.groupby(GRUPOS, observed=True).agg(
+        Concursos=("APE", "size"), MAPE=("APE", "mean"), MdAPE=("APE", "median"),
+        Sesgo=("Error_Pct", "mean"), Sesgo_COP=("Error", "mean")).reset_index()
+    total = pd.DataFrame([{"Ciudad": TODAS, "Modalidad": TODAS, "Concursos": len(tabla),
+                           "MAPE": absoluto.mean(), "MdAPE": absoluto.median(),
+                           "Sesgo": tabla["Error_Pct"].mean(), "Sesgo_COP": tabla["Error"].mean()}])
+    por_grupo[GRUPOS] = por_grupo[GRUPOS].astype(str)
+    return pd.concat([total, por_grupo], ignore_index=True)
+
+
+def _iniciar_proceso(residuos):
+    _datos_proceso["residuos"] = residuos
+
+
+def _metricas_ventana(etiqueta, desde, hasta):
+    residuos = _datos_proceso["residuos"]
+    en_ventana = residuos[(residuos["Periodo"] >= desde) & (residuos["Periodo"] <= hasta)]
+    return metricas_error(en_ventana).assign(Ventana=etiqueta, Desde=desde, Hasta=hasta)
+
+
+def backtest(df, tarifario=None, ancho=ANCHO_VENTANA, workers=None):
+    """
+    Backtest completo del modelo sobre el histórico `df`.
+
+    Devuelve un diccionario con "residuos" (un registro por concurso),
+    "metricas" (MAPE/MdAPE/sesgo por ciudad y modalidad sobre todo el
+    histórico) y "ventanas" (las mismas métricas por ventana móvil de
+    `ancho` años; vacío si el histórico no tiene Año ni Fecha).
+    """
+    tarifario = resolver_tarifario(tarifario)
+    residuos = residuos_backtest(df, tarifario)
+    anios = periodo(df)
+    ventanas = ventanas_moviles(anios.dropna().unique(), ancho) if anios is not None else []
+
+    if not ventanas:
+        por_ventana = pd.DataFrame()
+    else:
+        datos = residuos[["Ciudad", "Modalidad", "Error", "Error_Pct"]].assign(Periodo=anios.to_numpy())
+        if len(ventanas) < MIN_VENTANAS_PARALELO or workers == 1:
+            _iniciar_proceso(datos)
+            partes = [_metricas_ventana(*v) for v in ventanas]
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_iniciar_proceso, initargs=(datos,)) as pool:
+                partes = list(pool.map(_metricas_ventana, *zip(*ventanas)))
+        por_ventana = pd.concat(partes, ignore_index=True)
+
+    return {"residuos": residuos, "metricas": metricas_error(residuos), "ventanas": por_ventana}
+
+
+def huella_backtest(df, tarifario, ancho=ANCHO_VENTANA):
+    """Huella de los datos usados, del tarifario (versión y contenido) y del ancho de ventana."""
+    columnas = [c for c in ["Aspirantes", "Costo_Total", "Ciudad", "Modalidad", "Año", "Fecha"] if c in df.columns]
+    sha = hashlib.sha1(pd.util.hash_pandas_object(df[columnas], index=False).to_numpy().tobytes())
+    sha.update(json.dumps({"tarifario": tarifario["version"], "huella": tarifario["huella"], "ancho": ancho},
+                          sort_keys=True).encode())
+    return sha.hexdigest()[:16]
+
+
+def rutas_resultados(huella):
+    return {parte: os.path.join(RUTA_CACHE, f"backtest-{huella}-{parte}.parquet")
+            for parte in ("residuos", "metricas", "ventanas")}
+
+
+def cargar_o_backtest(df, tarifario=None, ancho=ANCHO_VENTANA, workers=None):
+    """
+    Backtest persistido para estos datos y este tarifario, o uno nuevo.
+
+    Los residuos, las métricas y las ventanas se guardan en tres Parquet con
+    la misma huella. Devuelve (resultado de `backtest`, huella, recalculado).
+    """
+    tarifario = resolver_tarifario(tarifario)
+    huella = huella_backtest(df, tarifario, ancho)
+    rutas = rutas_resultados(huella)
+    if all(os.path.exists(r) for r in rutas.values()):
+        return {parte: pd.read_parquet(r) for parte, r in rutas.items()}, huella, False
+
+    resultado = backtest(df, tarifario, ancho, workers)
+    os.makedirs(RUTA_CACHE, exist_ok=True)
+    for parte, ruta in rutas.items():
+        temporal = ruta + ".tmp"
+        resultado[parte].to_parquet(temporal, index=False)
+        os.replace(temporal, ruta)
+    return resultado, huella, True
@@ -0,0 +1,211 @@
+"""
+Benchmark reproducible del modelo paramétrico ESAP.
+
+Mide cuatro casos con los mismos datos de entrada en cada ejecución (semilla
+fija):
+
+- "escalar": una llamada a `calcular_costo_parametrico`,
+- "apply": el `DataFrame.apply` fila por fila sobre la grilla de `df_sim`
+  del tab 1 (así se calculaba el EDA antes del motor por lotes),
+- "lote": `calcular_costo_lote` sobre la misma grilla y sobre un lote grande,
+- "rerun": una re-ejecución completa de Calculadora.py con `AppTest` de
+  Streamlit (con el caché ya caliente, como en una interacción del usuario).
+
+Para cada caso reporta operaciones/segundo, latencia p50/p99 y memoria pico
+(medida con `tracemalloc` en una pasada aparte, para no inflar los tiempos).
+El resultado es un JSON con los metadatos del entorno (commit, versiones),
+pensado para comparar commits en la misma máquina.
+
+Uso:
+    python benchmark_modelo.py --salida bench.json
+    python benchmark_modelo.py --casos escalar lote --repeticiones 200
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from modelo_parametrico import CIUDADES, MODALIDADES, calcular_costo_lote, calcular_costo_parametrico
+from tarifario import obtener_tarifario
+
+RUTA_APP = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Calculadora.py")
+SEMILLA = 2025
+TAMANO_LOTE_GRANDE = 1_000_000
+
+# Repeticiones por defecto de cada caso (los casos lentos se repiten menos)
+REPETICIONES = {"escalar": 2000, "apply": 50, "lote": 50, "lote_grande": 20, "rerun": 20}
+
+
+def _entradas(tamano, rng):
+    """Concursos aleatorios reproducibles (aspirantes, ciudad, modalidad)."""
+    return (rng.integers(1, 20_001, tamano),
+            rng.choice(CIUDADES, tamano),
+            rng.choice(MODALIDADES, tamano))
+
+
+def _grilla_eda():
+    """La misma grilla que `generar_datos_eda` usa por defecto en el tab 1."""
+    return pd.DataFrame({'Aspirantes': range(100, 5000, 50)})
+
+
+# ==============================================================================
+# CASOS
+# ==============================================================================
+# Cada constructor prepara los datos fuera de la medición y devuelve
+# (función a medir, filas procesadas por llamada).
+def caso_escalar(tarifario):
+    n, ciudad, tipo = _entradas(4096, np.random.default_rng(SEMILLA))
+    n, ciudad, tipo = n.tolist(), ciudad.tolist(), tipo.tolist()
+    estado = {"i": 0}
+
+    def correr():
+        i = estado["i"] = (estado["i"] + 1) % len(n)
+        calcular_costo_parametrico(n[i], ciudad[i], tipo[i], tarifario)
+    return correr, 1
+
+
+def caso_apply(tarifario):
+    df_sim = _grilla_eda()
+
+    def correr():
+        df_sim.apply(lambda row: calcular_costo_parametrico(row['Aspirantes'], "Bogotá", "Escrita",
+                                                            tarifario)['financiero']['Total'], axis=1)
+    return correr, len(df_sim)
+
+
+def caso_lote(tarifario):
+    n = _grilla_eda()['Aspirantes'].to_numpy()
+
+    def correr():
+        calcular_costo_lote(n, "Bogotá", "Escrita", tarifario)
+    return correr, len(n)
+
+
+def caso_lote_grande(tarifario):
+    n, ciudad, tipo = _entradas(TAMANO_LOTE_GRANDE, np.random.default_rng(SEMILLA))
+
+    def correr():
+        calcular_costo_lote(n, ciudad, tipo, tarifario)
+    return correr, len(n)
+
+
+def caso_rerun(tarifario):
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_file(RUTA_APP, default_timeout=120)
+    app.run()  # primera ejecución: llena los cachés
+    if app.exception:
+        raise RuntimeError(f"Calculadora.py falló en AppTest: {app.exception[0].message}")
+
+    def correr():
+        app.run()
+    return correr, 1
+
+
+CASOS = {
+    "escalar": caso_escalar,
+    "apply": caso_apply,
+    "lote": caso_lote,
+    "lote_grande": caso_lote_grande,
+    "rerun": caso_rerun,
+}
+
+
+# ==============================================================================
+# MEDICIÓN
+# ==============================================================================
+def medir(correr, filas, repeticiones, calentamiento=3):
+    """Latencias de `repeticiones` llamadas más una pasada aparte para la memoria pico."""
+    for _ in range(calentamiento):
+        correr()
+
+    latencias = np.empty(repeticiones)
+    for i in range(repeticiones):
+        inicio = time.perf_counter_ns()
+        correr()
+        latencias[i] = time.perf_counter_ns() - inicio
+    latencias /= 1e9
+
+    tracemalloc.start()
+    correr()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    total = float(latencias.sum())
+    return {
+        "repeticiones": repeticiones,
+        "filas_por_llamada": filas,
+        "ops_por_segundo": repeticiones / total,
+        "filas_por_segundo": repeticiones * filas / total,
+        "p50_ms": float(np.percentile(latencias, 50) * 1e3),
+        "p99_ms": float(np.percentile(latencias, 99) * 1e3),
+        "media_ms": float(latencias.mean() * 1e3),
+        "memoria_pico_mb": pico / 2**20,
+    }
+
+
+def _commit_actual():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(RUTA_APP), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def metadatos(tarifario):
+    import streamlit
+
+    return {
+        "fecha": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "commit": _commit_actual(),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "cpus": os.cpu_count(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "streamlit": streamlit.__version__,
+        "tarifario": tarifario["version"],
+        "semilla": SEMILLA,
+    }
+
+
+def correr_benchmark(casos=None, repeticiones=None):
+    """Ejecuta los casos pedidos (por defecto, todos) y devuelve el reporte como diccionario."""
+    tarifario = obtener_tarifario()
+    resultados = {}
+    for nombre in casos or CASOS:
+        correr, filas = CASOS[nombre](tarifario)
+        resultados[nombre] = medir(correr, filas, repeticiones or REPETICIONES[nombre])
+    return {"metadatos": metadatos(tarifario), "resultados": resultados}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark del modelo paramétrico ESAP (salida JSON).")
+    parser.add_argument("--casos", nargs="+", choices=list(CASOS), default=None,
+                        help="Casos a medir (por defecto, todos)")
+    parser.add_argument("--repeticiones", type=int, default=None,
+                        help="Repeticiones por caso (por defecto, según el caso)")
+    parser.add_argument("--salida", default=None, help="Archivo JSON de salida (por defecto, stdout)")
+    args = parser.parse_args(argv)
+
+    reporte = correr_benchmark(args.casos, args.repeticiones)
+    texto = json.dumps(reporte, indent=2, ensure_ascii=False)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            f.write(texto + "\n")
+        print(f"Reporte escrito en {args.salida}", file=sys.stderr)
+    else:
+        print(texto)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,393 @@
+"""
+Rúbrica de Entrega final 2025-II (Riesgo Financiero) y calificación por cohorte.
+
+`RUBRIC_DATA` vive aquí, sin Streamlit, para que la aplicación
+Rubrica_Entrega_final_2025II_Riesgo.py y la calificación por lotes usen la
+misma definición. `calificar_cohorte` recibe la matriz estudiantes × criterios
+y calcula con un único llamado a `rubricas.calificar` la nota final, el
+puntaje de cada componente y `component_summary_df` de todo el curso, con los
+mismos valores que `calculate_results` da para cada estudiante.
+
+La cohorte se lee de un CSV ancho (una fila por estudiante y una columna por
+criterio: Estudiante, A1, ..., C5), de archivos JSON guardados desde la
+aplicación ("💾 Guardar evaluación") o de una carpeta con cualquiera de ellos.
+
+Uso:
+    python calificacion_riesgo.py evaluaciones/ notas.csv --resumen componentes.csv
+    python calificacion_riesgo.py curso.csv notas.parquet --relleno 3.0
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from rubricas import ESCALA_SLIDER, calificar, compilar_rubrica
+
+# --- Definición de la Rúbrica ---
+RUBRIC_DATA = {
+    "A": {
+        "name": "COMPONENTE A: INFORME TÉCNICO (HTML + RMARKDOWN)",
+        "short_name": "Componente A",
+        "weight": 40,
+        "criteria": [
+            {
+                "id": "A1", "name": "Estado del arte y contextualización", "weight": 4,
+                "levels": {
+                    "insuficiente": "Ausente o irrelevante. No sitúa el tema en un contexto científico.",
+                    "basico": "Contextualización débil, escasa conexión con el campo del riesgo financiero.",
+                    "satisfactorio": "Presenta una revisión clara del tema, aunque con limitada profundidad crítica o alcance bibliográfico.",
+                    "destacado": "Revisa críticamente múltiples fuentes, sitúa el artículo en un debate científico actual y justifica su relevancia con solidez."
+                }
+            },
+            {
+                "id": "A2", "name": "Comprensión y análisis exploratorio de datos (AED)", "weight": 6,
+                "levels": {
+                    "insuficiente": "No se presenta AED o es inaplicable.",
+                    "basico": "Análisis incompleto o con errores metodológicos graves.",
+                    "satisfactorio": "Realiza un AED básico con gráficos y resúmenes, pero sin profundidad analítica.",
+                    "destacado": "Realiza un AED completo: detecta patrones, asimetrías, outliers, relaciones entre variables y justifica transformaciones."
+                }
+            },
+            {
+                "id": "A3", "name": "Imputación de datos", "weight": 5,
+                "levels": {
+                    "insuficiente": "Omite el tratamiento de datos faltantes.",
+                    "basico": "Usa imputación inadecuada o sin explicación.",
+                    "satisfactorio": "Aplica un método válido (ej. media, KNN), pero sin comparación ni justificación profunda.",
+                    "destacado": "Evalúa mecanismos de pérdida (MCAR/MAR), compara métodos y elige el más apropiado con fundamentación."
+                }
+            },
+            {
+                "id": "A4", "name": "Ingeniería de características", "weight": 5,
+                "levels": {
+                    "insuficiente": "No aplica ingeniería de variables.",
+                    "basico": "Características poco relevantes o mal construidas.",
+                    "satisfactorio": "Genera nuevas variables útiles, aunque con poca originalidad o justificación limitada.",
+                    "destacado": "Diseña variables innovadoras bien fundamentadas (índices, ratios) que aportan valor sustancial."
+                }
+            },
+            {
+                "id": "A5", "name": "Documentación técnica y reproducibilidad", "weight": 6,
+                "levels": {
+                    "insuficiente": "No compila o es imposible replicar.",
+                    "basico": "Dificultad para seguir el flujo; falta de comentarios o errores.",
+                    "satisfactorio": "Código funcional y entendible, aunque con mejoras en estilo o documentación.",
+                    "destacado": "Código totalmente reproducible, bien comentado, con buenas prácticas. HTML bien formateado."
+                }
+            },
+            {
+                "id": "A6", "name": "Crítica metodológica y argumentación grupal", "weight": 8,
+                "levels": {
+                    "insuficiente": "Ausente o meramente descriptiva.",
+                    "basico": "Crítica superficial o desenfocada.",
+                    "satisfactorio": "Identifica algunos aspectos débiles del artículo, pero sin profundidad analítica.",
+                    "destacado": "Ofrece una crítica rigurosa basada en evidencia, cuestiona supuestos, limitaciones y sesgos con propuestas alternativas."
+                }
+            },
+            {
+                "id": "A7", "name": "Bibliografía y normas académicas", "weight": 6,
+                "levels": {
+                    "insuficiente": "Sin referencias o plagio.",
+                    "basico": "Algunas referencias faltantes o fuentes no académicas.",
+                    "satisfactorio": "Citas completas con pequeños errores de formato.",
+                    "destacado": "Cumple rigurosamente con las normas, usa fuentes académicas de alto impacto."
+                }
+            }
+        ]
+    },
+    "B": {
+        "name": "COMPONENTE B: DASHBOARD INTERACTIVO",
+        "short_name": "Componente B",
+        "weight": 30,
+        "criteria": [
+            {
+                "id": "B1", "name": "Claridad del propósito y audiencia", "weight": 5,
+                "levels": {
+                    "insuficiente": "Sin propósito claro. No es evidente a quién está dirigido.",
+                    "basico": "Objetivo ambiguo. Audiencia poco explícita.",
+                    "satisfactorio": "Propósito identificado, pero audiencia poco explícita.",
+                    "destacado": "Propósito claro, audiencia bien definida y todas las funciones están alineadas con sus necesidades."
+                }
+            },
+            {
+                "id": "B2", "name": "Selección y priorización de KPIs", "weight": 6,
+                "levels": {
+                    "insuficiente": "Ausentes o incorrectos.",
+                    "basico": "Indicadores poco representativos.",
+                    "satisfactorio": "Incluye KPIs relevantes, pero con redundancia o falta de enfoque.",
+                    "destacado": "KPIs altamente pertinentes, jerarquizados y contextualizados."
+                }
+            },
+            {
+                "id": "B3", "name": "Calidad técnica y visual de visualizaciones", "weight": 7,
+                "levels": {
+                    "insuficiente": "Mal diseñados o con errores graves.",
+                    "basico": "Errores visuales (ej. 3D innecesario, escalas engañosas).",
+                    "satisfactorio": "Gráficos correctos, aunque con detalles mejorables (leyendas, colores).",
+                    "destacado": "Visualizaciones precisas, estéticamente pulidas, accesibles y libres de distorsiones."
+                }
+            },
+            {
+                "id": "B4", "name": "Interactividad y navegabilidad", "weight": 6,
+                "levels": {
+                    "insuficiente": "Sin interactividad.",
+                    "basico": "Interactividad mínima o con errores.",
+                    "satisfactorio": "Funcionalidades básicas implementadas (filtros), pero con limitaciones.",
+                    "destacado": "Alta interactividad intuitiva que permite explorar múltiples escenarios."
+                }
+            },
+            {
+                "id": "B5", "name": "Insights y accionabilidad", "weight": 6,
+                "levels": {
+                    "insuficiente": "No aporta insights.",
+                    "basico": "Limitado valor práctico.",
+                    "satisfactorio": "Presenta información útil, pero requiere interpretación adicional.",
+                    "destacado": "Destaca hallazgos clave con alertas, resúmenes dinámicos y sugerencias para la acción."
+                }
+            }
+        ]
+    },
+    "C": {
+        "name": "COMPONENTE C: EXPOSICIÓN ORAL EN VIDEO (10–15 min)",
+        "short_name": "Componente C",
+        "weight": 30,
+        "criteria": [
+            {
+                "id": "C1", "name": "Dominio conceptual y técnico", "weight": 6,
+                "levels": {
+                    "insuficiente": "Falta dominio. Inseguridad conceptual evidente.",
+                    "basico": "Conocimiento parcial; confunde conceptos.",
+                    "satisfactorio": "Demuestra buen conocimiento, aunque con algunas vacilaciones.",
+                    "destacado": "Explica con claridad conceptos complejos, responde preguntas implícitas y defiende decisiones."
+                }
+            },
+            {
+                "id": "C2", "name": "Uso estratégico del dashboard", "weight": 6,
+                "levels": {
+                    "insuficiente": "No lo utiliza.",
+                    "basico": "Lo menciona brevemente sin demostración.",
+                    "satisfactorio": "Muestra el dashboard, pero con poca integración narrativa.",
+                    "destacado": "Usa el dashboard como herramienta narrativa, navegando con propósito y destacando insights."
+                }
+            },
+            {
+                "id": "C3", "name": "Estructura y claridad comunicativa", "weight": 6,
+                "levels": {
+                    "insuficiente": "Caótica. Difícil de seguir.",
+                    "basico": "Difícil de seguir; sin introducción o cierre.",
+                    "satisfactorio": "Estructura clara, aunque con digresiones o ritmo irregular.",
+                    "destacado": "Narrativa bien estructurada, lenguaje preciso, transiciones suaves."
+                }
+            },
+            {
+                "id": "C4", "name": "Síntesis y manejo del tiempo", "weight": 6,
+                "levels": {
+                    "insuficiente": "Muy por fuera del tiempo (±3 min).",
+                    "basico": "Fuera de tiempo (±2 min) o desbalanceado.",
+                    "satisfactorio": "Ligera sobreexposición o omisión de puntos clave.",
+                    "destacado": "Tiempo optimizado, contenido conciso y enfocado en lo más relevante."
+                }
+            },
+            {
+                "id": "C5", "name": "Argumentación crítica y pensamiento reflexivo", "weight": 6,
+                "levels": {
+                    "insuficiente": "Reproduce sin cuestionar.",
+                    "basico": "Crítica superficial o ausente.",
+                    "satisfactorio": "Plantea críticas válidas, aunque con enfoque limitado.",
+                    "destacado": "Ofrece una reflexión profunda sobre validez, aplicabilidad y ética del estudio."
+                }
+            }
+        ]
+    }
+}
+
+# Índice plano de criterios y pesos: la nota es un producto punto (ver rubricas.py)
+RUBRICA_COMPILADA = compilar_rubrica(RUBRIC_DATA)
+
+COLUMNA_ESTUDIANTE = "Estudiante"
+FORMATOS_ENTRADA = (".csv", ".json")
+
+
+# ==============================================================================
+# LECTURA DE LA COHORTE
+# ==============================================================================
+def _evaluaciones_json(ruta):
+    """Filas {Estudiante, criterio: puntaje} de un JSON guardado por la aplicación (o una lista de ellos)."""
+    with open(ruta, encoding="utf-8") as f:
+        contenido = json.load(f)
+    evaluaciones = contenido if isinstance(contenido, list) else [contenido]
+    nombre_archivo = os.path.splitext(os.path.basename(ruta))[0]
+    filas = []
+    for i, evaluacion in enumerate(evaluaciones):
+        if not isinstance(evaluacion, dict):
+            raise ValueError(f"{ruta}: cada evaluación debe ser un objeto JSON.")
+        # Formato de save_evaluation_to_json: {"project_info": {...}, "scores": {...}, "feedbacks": {...}}
+        puntajes = evaluacion.get("scores", evaluacion)
+        estudiante = evaluacion.get(COLUMNA_ESTUDIANTE) or evaluacion.get("project_info", {}).get("project_name") \
+            or (nombre_archivo if len(evaluaciones) == 1 else f"{nombre_archivo}-{i + 1}")
+        filas.append({COLUMNA_ESTUDIANTE: estudiante, **{k: v for k, v in puntajes.items() if k != COLUMNA_ESTUDIANTE}})
+    return pd.DataFrame(filas)
+
+
+def leer_cohorte(ruta, columna_id=COLUMNA_ESTUDIANTE):
+    """
+    DataFrame estudiantes × criterios (índice `columna_id`) desde un CSV, un JSON o una carpeta de ellos.
+
+    Las columnas que no son criterios de la rúbrica (nombre, correo, ...) se
+    descartan; los criterios ausentes quedan como NaN para que
+    `matriz_puntajes` los reporte.
+    """
+    if os.path.isdir(ruta):
+        archivos = sorted(a for a in glob.glob(os.path.join(ruta, "*")) if a.lower().endswith(FORMATOS_ENTRADA))
+        if not archivos:
+            raise ValueError(f"No hay archivos .csv ni .json en {ruta}")
+    else:
+        archivos = [ruta]
+
+    tablas = []
+    for archivo in archivos:
+        extension = os.path.splitext(archivo)[1].lower()
+        if extension == ".csv":
+            tabla = pd.read_csv(archivo, dtype={columna_id: str})
+            if columna_id not in tabla:
+                raise ValueError(f"{archivo}: falta la columna '{columna_id}'")
+        elif extension == ".json":
+            tabla = _evaluaciones_json(archivo).rename(columns={COLUMNA_ESTUDIANTE: columna_id})
+        else:
+            raise ValueError(f"Formato de entrada no soportado: {extension} (use .csv o .json)")
+        tablas.append(tabla)
+
+    criterios = [criterio for _, criterio in RUBRICA_COMPILADA["criterios"]]
+    cohorte = pd.concat(tablas, ignore_index=True)
+    return cohorte.set_index(cohorte[columna_id].astype(str).rename(columna_id)).reindex(columns=criterios)
+
+
+def matriz_puntajes(cohorte, compilada=RUBRICA_COMPILADA, relleno=None):
+    """
+    Matriz de puntajes (estudiantes × criterios, en el orden de la rúbrica compilada) validada.
+
+    Los puntajes deben estar entre 0 y 5, como en los sliders. Las celdas
+    vacías son un error salvo que se indique `relleno` (p. ej. 3.0, el valor
+    inicial de los sliders en la aplicación), y también lo es un estudiante
+    con más de una evaluación.
+    """
+    repetidos = cohorte.index[cohorte.index.duplicated()].unique()
+    if len(repetidos):
+        raise ValueError(f"{len(repetidos):,} estudiantes tienen más de una evaluación "
+                         f"(p. ej. {list(repetidos[:5])}); deje una sola por estudiante.")
+    criterios = [criterio for _, criterio in compilada["criterios"]]
+    faltantes = [c for c in criterios if c not in cohorte]
+    if faltantes:
+        raise ValueError(f"Faltan criterios en la cohorte: {faltantes}")
+    try:
+        matriz = cohorte[criterios].to_numpy(dtype=np.float64, na_value=np.nan, copy=True)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Hay puntajes no numéricos en la cohorte: {e}") from None
+
+    vacias = np.isnan(matriz)
+    if vacias.any():
+        if relleno is None:
+            filas = np.flatnonzero(vacias.any(axis=1))
+            raise ValueError(f"{vacias.sum():,} puntajes sin calificar en {len(filas):,} evaluaciones "
+                             f"(p. ej. {list(cohorte.index[filas[:5]])}); use `relleno` para completarlos.")
+        matriz[vacias] = relleno
+    if np.any((matriz < 0) | (matriz > ESCALA_SLIDER)):
+        filas = np.flatnonzero(((matriz < 0) | (matriz > ESCALA_SLIDER)).any(axis=1))
+        raise ValueError(f"Puntajes fuera de 0.0 - {ESCALA_SLIDER} en {len(filas):,} evaluaciones "
+                         f"(p. ej. {list(cohorte.index[filas[:5]])}).")
+    return matriz
+
+
+# ==============================================================================
+# CALIFICACIÓN POR LOTES
+# ==============================================================================
+def calificar_cohorte(cohorte, rubric=RUBRIC_DATA, compilada=None, relleno=None):
+    """
+    Versión por lotes de `calculate_results` para una cohorte estudiantes × criterios.
+
+    Devuelve un diccionario con "final_grade" y "total_score_pct" (Series por
+    estudiante), "component_scores" (estudiantes × componentes, en puntos),
+    "component_summary_df" (las mismas columnas de la aplicación, con una
+    fila por estudiante y componente) y "grades_df" (una fila por estudiante
+    con la nota final y la de cada componente, lista para exportar).
+    """
+    if compilada is None:
+        compilada = RUBRICA_COMPILADA if rubric is RUBRIC_DATA else compilar_rubrica(rubric)
+    calificacion = calificar(compilada, matriz_puntajes(cohorte, compilada, relleno))
+
+    estudiantes = cohorte.index
+    componentes = compilada["secciones"]
+    nombres = [rubric[c].get("short_name", rubric[c]["name"]) for c in componentes]
+    pesos = compilada["peso_seccion"]
+    puntos = calificacion["secciones"]
+    normalizado = np.divide(puntos, pesos, out=np.zeros_like(puntos), where=pesos != 0)
+
+    final_grade = pd.Series(calificacion["final"], index=estudiantes, name="Calificación final (0-5)")
+    total_score_pct = pd.Series(calificacion["total"], index=estudiantes, name="Puntaje total (sobre 100)")
+    n = len(estudiantes)
+    component_summary_df = pd.DataFrame({
+        estudiantes.name or COLUMNA_ESTUDIANTE: np.repeat(estudiantes.to_numpy(), len(componentes)),
+        "Componente": np.tile(nombres, n),
+        "Peso (%)": np.tile(pesos, n),
+        "Puntaje obtenido (pts)": puntos.ravel(),
+        "Avance (%)": normalizado.ravel() * 100,
+        "Calificación (0-5)": normalizado.ravel() * 5,
+    })
+    grades_df = pd.concat([
+        final_grade, total_score_pct,
+        pd.DataFrame(normalizado * 5, index=estudiantes, columns=[f"{nombre} (0-5)" for nombre in nombres]),
+    ], axis=1)
+
+    return {
+        "final_grade": final_grade,
+        "total_score_pct": total_score_pct,
+        "component_scores": pd.DataFrame(puntos, index=estudiantes, columns=componentes),
+        "component_summary_df": component_summary_df,
+        "grades_df": grades_df,
+    }
+
+
+def _escribir(df, ruta, indice):
+    extension = os.path.splitext(ruta)[1].lower()
+    if extension == ".csv":
+        df.to_csv(ruta, index=indice)
+    elif extension == ".parquet":
+        df.to_parquet(ruta, index=indice)
+    else:
+        raise ValueError(f"Formato de salida no soportado: {extension} (use .csv o .parquet)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Calificación por cohorte de la rúbrica de Riesgo Financiero.")
+    parser.add_argument("entrada", help="CSV, JSON o carpeta con las evaluaciones por criterio")
+    parser.add_argument("salida", help="Notas por estudiante (.csv o .parquet)")
+    parser.add_argument("--resumen", default=None, help="component_summary_df de toda la cohorte (.csv o .parquet)")
+    parser.add_argument("--col-id", default=COLUMNA_ESTUDIANTE, help="Columna con el identificador del estudiante")
+    parser.add_argument("--relleno", type=float, default=None,
+                        help="Puntaje para los criterios sin calificar (por defecto, es un error)")
+    args = parser.parse_args(argv)
+
+    try:
+        cohorte = leer_cohorte(args.entrada, args.col_id)
+        inicio = time.perf_counter()
+        resultados = calificar_cohorte(cohorte, relleno=args.relleno)
+        transcurrido = time.perf_counter() - inicio
+        _escribir(resultados["grades_df"], args.salida, indice=True)
+        if args.resumen:
+            _escribir(resultados["component_summary_df"], args.resumen, indice=False)
+    except (OSError, ValueError, ImportError) as e:
+        parser.error(str(e))
+
+    notas = resultados["final_grade"]
+    print(f"{len(notas):,} evaluaciones calificadas en {transcurrido:.3f} s -> {args.salida}")
+    print(f"Nota final: promedio {notas.mean():.2f} | mínima {notas.min():.2f} | máxima {notas.max():.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,6 +3,8 @@ import pandas as pd
 import datetime
 import base64
 
+from rubricas import calificar, compilar_rubrica, vector_puntajes
+
 # --- Configuración de la Página ---
 st.set_page_config(
     page_title="Calificador Automático de Rúbrica",
@@ -129,6 +131,10 @@ rubric_data = {
         }
     }
 }
+
+# Índice plano de criterios y pesos: la nota es un producto punto (ver rubricas.py)
+RUBRICA_COMPILADA = compilar_rubrica(rubric_data)
+
 # --- Inicialización del Estado de la Sesión para el Reset ---
 if 'form_id' not in st.session_state:
     st.session_state.form_id = 0
@@ -235,12 +241,9 @@ st.markdown("---")
 st.header("2. Calificación por Criterios")
 
 calificaciones = {}
-calificaciones_ponderadas = {}
 
 def render_section(section_title, section_data, form_key):
     st.subheader(f"Parte: {section_title} (Ponderación Total: {section_data['ponderacion_total']:.0%})")
-    total_ponderado_seccion = 0
-    
     with st.container(border=True):
         for criterio, detalles in section_data['criterios'].items():
             st.markdown(f"**Criterio:** {criterio} (Ponderación: {detalles['ponderacion']:.0%})")
@@ -257,22 +260,22 @@ def render_section(section_title, section_data, form_key):
             
             calificaciones[criterio] = calificacion_actual
             calificacion_ponderada = calificacion_actual * detalles['ponderacion']
-            calificaciones_ponderadas[criterio] = calificacion_ponderada
-            total_ponderado_seccion += calificacion_ponderada
             
             st.info(f"Calificación Ponderada del Criterio: **{calificacion_ponderada:.3f}**")
             st.markdown("---")
-            
-    return total_ponderado_seccion
 
-total_informe = render_section("Informe Escrito en LaTeX", rubric_data['Informe'], form_key)
-total_presentacion = render_section("Presentación en Beamer", rubric_data['Presentacion'], form_key)
-total_exposicion = render_section("Exposición Oral", rubric_data['Exposicion'], form_key)
+render_section("Informe Escrito en LaTeX", rubric_data['Informe'], form_key)
+render_section("Presentación en Beamer", rubric_data['Presentacion'], form_key)
+render_section("Exposición Oral", rubric_data['Exposicion'], form_key)
 
 # --- Resumen y Calificación Final ---
 st.header("3. Resultados y Acciones")
 
-calificacion_final = total_informe + total_presentacion + total_exposicion
+calificacion = calificar(RUBRICA_COMPILADA, vector_puntajes(RUBRICA_COMPILADA, calificaciones))
+total_informe, total_presentacion, total_exposicion = calificacion["secciones"]
+calificaciones_ponderadas = {criterio: aporte for (_, criterio), aporte
+                             in zip(RUBRICA_COMPILADA["criterios"], calificacion["aportes"])}
+calificacion_final = calificacion["final"]
 
 with st.container(border=True):
     col1, col2 = st.columns([1, 2])
@@ -0,0 +1,199 @@
+"""
+Cotización masiva de concursos ESAP desde la línea de comandos.
+
+Lee una hoja de cálculo (CSV o XLSX) con una fila por concurso (id, aspirantes,
+ciudad, modalidad), la procesa por bloques en un pool de procesos con las
+mismas reglas de `modelo_parametrico` y escribe el desglose logístico y
+financiero de forma incremental en CSV o Parquet. No importa Streamlit.
+
+Uso:
+    python cotizacion_masiva.py concursos.xlsx cotizaciones.parquet --workers 8
+"""
+import argparse
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from modelo_parametrico import calcular_costo_dataframe
+from tarifario import obtener_tarifario
+
+COLUMNAS_ENTRADA = {"id": "Concurso", "aspirantes": "Aspirantes", "ciudad": "Ciudad", "tipo": "Modalidad"}
+TAMANO_BLOQUE = 100_000
+
+
+# ==============================================================================
+# LECTURA POR BLOQUES
+# ==============================================================================
+def leer_bloques_csv(ruta, tamano_bloque, columnas):
+    tipos = {columnas["id"]: str, columnas["ciudad"]: str, columnas["tipo"]: str}
+    yield from pd.read_csv(ruta, chunksize=tamano_bloque, dtype=tipos)
+
+
+def leer_bloques_xlsx(ruta, tamano_bloque):
+    """Recorre la primera hoja en modo solo lectura, sin cargar el libro completo (omite las filas vacías)."""
+    from openpyxl import load_workbook
+
+    libro = load_workbook(ruta, read_only=True, data_only=True)
+    try:
+        filas = libro.worksheets[0].iter_rows(values_only=True)
+        encabezado = next(filas, None)
+        if encabezado is None:
+            raise ValueError(f"El archivo está vacío (sin encabezado): {ruta}")
+        encabezado = [str(c) for c in encabezado]
+        bloque = []
+        for fila in filas:
+            if all(c is None for c in fila):  # filas en blanco con formato: openpyxl las entrega con solo None
+                continue
+            bloque.append(fila)
+            if len(bloque) == tamano_bloque:
+                yield pd.DataFrame(bloque, columns=encabezado)
+                bloque = []
+        if bloque:
+            yield pd.DataFrame(bloque, columns=encabezado)
+    finally:
+        libro.close()
+
+
+def leer_bloques(ruta, tamano_bloque=TAMANO_BLOQUE, columnas=COLUMNAS_ENTRADA):
+    extension = os.path.splitext(ruta)[1].lower()
+    if extension == ".csv":
+        return leer_bloques_csv(ruta, tamano_bloque, columnas)
+    if extension in (".xlsx", ".xlsm"):
+        return leer_bloques_xlsx(ruta, tamano_bloque)
+    raise ValueError(f"Formato de entrada no soportado: {extension} (use .csv o .xlsx)")
+
+
+# ==============================================================================
+# COTIZACIÓN Y ESCRITURA
+# ==============================================================================
+def cotizar_bloque(bloque, columnas=COLUMNAS_ENTRADA, tarifario=None, calibracion=None, nivel=None):
+    """
+    Desglose completo de un bloque de concursos (se ejecuta en un proceso del pool).
+
+    Con `calibracion` (ver `intervalos_conformales`) agrega el intervalo
+    conformal del total al `nivel` pedido.
+    """
+    faltantes = [c for c in columnas.values() if c not in bloque.columns]
+    if faltantes:
+        raise ValueError(f"Faltan columnas en la entrada: {faltantes}")
+    bloque = bloque[list(columnas.values())].astype({
+        columnas["id"]: str, columnas["ciudad"]: str, columnas["tipo"]: str,
+    })
+    cotizado = calcular_costo_dataframe(bloque, col_aspirantes=columnas["aspirantes"],
+                                        col_ciudad=columnas["ciudad"], col_tipo=columnas["tipo"],
+                                        tarifario=tarifario)
+    if calibracion is not None:
+        from intervalos_conformales import agregar_intervalos
+        cotizado = agregar_intervalos(cotizado, calibracion, nivel, col_ciudad=columnas["ciudad"],
+                                      col_tipo=columnas["tipo"])
+    return cotizado
+
+
+def escribir_csv(ruta, bloques):
+    filas = 0
+    for i, df in enumerate(bloques):
+        df.to_csv(ruta, mode="w" if i == 0 else "a", header=i == 0, index=False)
+        filas += len(df)
+    return filas
+
+
+def escribir_parquet(ruta, bloques):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    filas = 0
+    escritor = None
+    try:
+        for df in bloques:
+            tabla = pa.Table.from_pandas(df, preserve_index=False)
+            if escritor is None:
+                escritor = pq.ParquetWriter(ruta, tabla.schema)
+            escritor.write_table(tabla.cast(escritor.schema))
+            filas += len(df)
+    finally:
+        if escritor is not None:
+            escritor.close()
+    return filas
+
+
+ESCRITORES = {".csv": escribir_csv, ".parquet": escribir_parquet}
+
+
+def cotizar_en_paralelo(bloques, workers=None, columnas=COLUMNAS_ENTRADA, tarifario=None, calibracion=None,
+                        nivel=None):
+    """
+    Reparte los bloques en un pool de procesos y los devuelve cotizados, en orden.
+
+    Como máximo hay `2 * workers` bloques en vuelo, así que la memoria depende
+    del tamaño de bloque y no del tamaño de la entrada. El tarifario se resuelve
+    una sola vez y se envía a los procesos, de modo que todo el archivo se cotiza
+    con la misma versión aunque el tarifario cambie durante la ejecución.
+    """
+    if not isinstance(tarifario, dict):
+        tarifario = obtener_tarifario(tarifario)
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pendientes = deque()
+        for bloque in bloques:
+            pendientes.append(pool.submit(cotizar_bloque, bloque, columnas, tarifario, calibracion, nivel))
+            if len(pendientes) >= 2 * workers:
+                yield pendientes.popleft().result()
+        while pendientes:
+            yield pendientes.popleft().result()
+
+
+def cotizar_archivo(entrada, salida, workers=None, tamano_bloque=TAMANO_BLOQUE, columnas=COLUMNAS_ENTRADA,
+                    tarifario=None, nivel=None):
+    """
+    Cotiza todos los concursos de `entrada` y escribe el resultado en `salida`. Devuelve las filas escritas.
+
+    Con `nivel` (p. ej. 0.9) cada cotización lleva su intervalo conformal,
+    calibrado una sola vez con el histórico de costos reales.
+    """
+    extension = os.path.splitext(salida)[1].lower()
+    if extension not in ESCRITORES:
+        raise ValueError(f"Formato de salida no soportado: {extension} (use .csv o .parquet)")
+    calibracion = None
+    if nivel is not None:
+        from historico_costos import cargar_historico
+        from intervalos_conformales import NIVELES, cargar_o_calibrar
+
+        if not isinstance(tarifario, dict):
+            tarifario = obtener_tarifario(tarifario)
+        calibracion, _ = cargar_o_calibrar(cargar_historico(), tarifario, sorted({*NIVELES, float(nivel)}))
+    bloques = leer_bloques(entrada, tamano_bloque, columnas)
+    return ESCRITORES[extension](salida, cotizar_en_paralelo(bloques, workers, columnas, tarifario, calibracion,
+                                                             nivel))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cotización masiva de concursos ESAP (modelo paramétrico).")
+    parser.add_argument("entrada", help="Archivo .csv o .xlsx con los concursos")
+    parser.add_argument("salida", help="Archivo de salida .csv o .parquet")
+    parser.add_argument("--workers", type=int, default=None, help="Procesos del pool (por defecto, núcleos disponibles)")
+    parser.add_argument("--tamano-bloque", type=int, default=TAMANO_BLOQUE, help="Filas por bloque")
+    parser.add_argument("--tarifario", default=None, help="Versión del tarifario (por defecto, la vigente)")
+    parser.add_argument("--nivel", type=float, default=None,
+                        help="Agrega el intervalo conformal del total a este nivel (p. ej. 0.9); requiere el histórico")
+    parser.add_argument("--col-id", default=COLUMNAS_ENTRADA["id"])
+    parser.add_argument("--col-aspirantes", default=COLUMNAS_ENTRADA["aspirantes"])
+    parser.add_argument("--col-ciudad", default=COLUMNAS_ENTRADA["ciudad"])
+    parser.add_argument("--col-modalidad", default=COLUMNAS_ENTRADA["tipo"])
+    args = parser.parse_args(argv)
+
+    columnas = {"id": args.col_id, "aspirantes": args.col_aspirantes,
+                "ciudad": args.col_ciudad, "tipo": args.col_modalidad}
+    try:
+        filas = cotizar_archivo(args.entrada, args.salida, args.workers, args.tamano_bloque, columnas,
+                                args.tarifario, args.nivel)
+    except (OSError, ValueError, KeyError, TypeError, ImportError) as e:
+        parser.error(str(e))
+    print(f"{filas:,} concursos cotizados -> {args.salida}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
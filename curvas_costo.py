@@ -0,0 +1,132 @@
+"""
+Curva exacta del costo total y reducción de puntos para graficarla.
+
+El costo del modelo paramétrico se precalcula para todos los N en 0..n_max
+con una sola llamada a `calcular_costo_lote`, así que consultar cualquier
+rango es un corte de arreglo. Para no mandar cientos de miles de puntos al
+navegador, `lttb` reduce la serie con Largest-Triangle-Three-Buckets, que
+conserva la forma visual (incluidos los escalones) con unos pocos miles de
+puntos, y los gráficos grandes se dibujan con WebGL (`scattergl`).
+
+`descomposicion_rubros` reparte el costo en sus cuatro rubros para un rango
+de N y varias ciudades y modalidades con una sola llamada vectorizada, sobre
+una malla que incluye los dos lados de cada punto de quiebre (apertura de
+sitio o cambio de tramo de impresión) para que los escalones queden exactos.
+"""
+import numpy as np
+import pandas as pd
+
+from modelo_parametrico import ASPIRANTES_POR_SITIO, COLUMNAS_FINANCIERO, calcular_costo_lote
+from tarifario import resolver_tarifario
+
+# Por encima de este número de puntos se dibuja con WebGL y se aplica LTTB
+UMBRAL_WEBGL = 5_000
+PUNTOS_LTTB = 4_000
+MAX_ASPIRANTES_CURVA = 500_000
+
+RUBROS = [c for c in COLUMNAS_FINANCIERO if c != "Total"]
+PUNTOS_DESCOMPOSICION = 1_000
+
+
+def curva_costo(n_max, ciudad="Bogotá", tipo_prueba="Escrita", tarifario=None, rubro="Total"):
+    """Arreglo `costo[N]` con el costo exacto para N = 0..n_max (costo[0] = 0)."""
+    n = np.arange(n_max + 1, dtype=np.int64)
+    costo = calcular_costo_lote(n, ciudad, tipo_prueba, tarifario)["financiero"][rubro]
+    return np.asarray(costo, dtype=np.float64)
+
+
+def rango_curva(costo, desde, hasta):
+    """Puntos (N, costo) de la curva precalculada entre `desde` y `hasta` inclusive."""
+    desde, hasta = max(int(desde), 0), min(int(hasta), len(costo) - 1)
+    return np.arange(desde, hasta + 1), costo[desde:hasta + 1]
+
+
+def lttb(x, y, n_salida=PUNTOS_LTTB):
+    """
+    Índices de los puntos que conserva Largest-Triangle-Three-Buckets.
+
+    Mantiene el primero y el último; el resto se reparte en `n_salida - 2`
+    cubetas y en cada una se elige el punto que forma el triángulo de mayor
+    área con el punto elegido en la cubeta anterior y el promedio de la
+    siguiente. Si la serie ya tiene `n_salida` puntos o menos, devuelve todos.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if n_salida >= n or n_salida < 3:
+        return np.arange(n)
+
+    bordes = np.linspace(1, n - 1, n_salida - 1).astype(np.int64)
+    # Promedios de cada cubeta (la "siguiente" de la última es el punto final)
+    sumas_x = np.add.reduceat(x[1:n - 1], bordes[:-1] - 1)
+    sumas_y = np.add.reduceat(y[1:n - 1], bordes[:-1] - 1)
+    tamanos = np.diff(bordes)
+    promedio_x = np.r_[sumas_x / tamanos, x[-1]]
+    promedio_y = np.r_[sumas_y / tamanos, y[-1]]
+
+    elegidos = np.empty(n_salida, dtype=np.int64)
+    elegidos[0], elegidos[-1] = 0, n - 1
+    anterior = 0
+    for b in range(n_salida - 2):
+        inicio, fin = bordes[b], bordes[b + 1]
+        ax, ay = x[anterior], y[anterior]
+        area = np.abs((ax - promedio_x[b + 1]) * (y[inicio:fin] - ay)
+                      - (ax - x[inicio:fin]) * (promedio_y[b + 1] - ay))
+        anterior = inicio + int(np.argmax(area))
+        elegidos[b + 1] = anterior
+    return elegidos
+
+
+def reducir_para_grafico(x, y, umbral=UMBRAL_WEBGL, n_salida=PUNTOS_LTTB):
+    """
+    Serie lista para graficar: (x, y, usar_webgl).
+
+    Por debajo de `umbral` devuelve la serie completa en SVG; por encima, la
+    reduce con `lttb` y pide WebGL.
+    """
+    if len(x) <= umbral:
+        return x, y, False
+    indices = lttb(x, y, n_salida)
+    return np.asarray(x)[indices], np.asarray(y)[indices], True
+
+
+def puntos_quiebre(desde, hasta, tarifario=None, max_sitios=20):
+    """
+    Primer N de cada escalón dentro de [desde, hasta]: cambios de tramo de impresión y apertura de sitios.
+
+    Las aperturas de sitio solo se incluyen si son `max_sitios` o menos, para
+    que las anotaciones sigan siendo legibles en rangos grandes.
+    """
+    tarifario = resolver_tarifario(tarifario)
+    filas = [(limite + 1, f"Tramo impresión > {limite:,}") for limite, _ in tarifario["tramos_impresion"]]
+    sitios = np.arange(desde // ASPIRANTES_POR_SITIO, hasta // ASPIRANTES_POR_SITIO + 1) * ASPIRANTES_POR_SITIO + 1
+    sitios = sitios[sitios > 1]
+    if len(sitios[(sitios >= desde) & (sitios <= hasta)]) <= max_sitios:
+        filas += [(int(n), f"Sitio {(n - 1) // ASPIRANTES_POR_SITIO + 1}") for n in sitios]
+    quiebres = pd.DataFrame(filas, columns=["Aspirantes", "Evento"])
+    quiebres = quiebres[(quiebres["Aspirantes"] >= desde) & (quiebres["Aspirantes"] <= hasta)]
+    return quiebres.sort_values("Aspirantes", kind="stable").reset_index(drop=True)
+
+
+def descomposicion_rubros(desde, hasta, ciudades, modalidades, tarifario=None, puntos=PUNTOS_DESCOMPOSICION):
+    """
+    Costo por rubro en [desde, hasta] para cada combinación de ciudad y modalidad.
+
+    La malla tiene `puntos` valores equiespaciados más N - 1 y N para cada N
+    de `puntos_quiebre`. Se evalúa con una sola llamada a `calcular_costo_lote`
+    (ciudades y modalidades se difunden contra la malla). Devuelve un
+    DataFrame ancho con Aspirantes, Ciudad, Modalidad, los rubros y Total.
+    """
+    tarifario = resolver_tarifario(tarifario)
+    quiebres = puntos_quiebre(desde, hasta, tarifario, max_sitios=puntos)["Aspirantes"].to_numpy()
+    malla = np.unique(np.r_[np.linspace(desde, hasta, puntos).round().astype(np.int64), quiebres - 1, quiebres])
+    malla = malla[(malla >= desde) & (malla <= hasta)]
+
+    ciudades, modalidades = list(ciudades), list(modalidades)
+    n, c, m = (a.ravel() for a in np.meshgrid(malla, np.arange(len(ciudades)), np.arange(len(modalidades)),
+                                              indexing="ij"))
+    ciudad = pd.Categorical.from_codes(c, ciudades)
+    modalidad = pd.Categorical.from_codes(m, modalidades)
+    financiero = calcular_costo_lote(n, ciudad, modalidad, tarifario)["financiero"]
+    return pd.DataFrame({"Aspirantes": n, "Ciudad": ciudad, "Modalidad": modalidad,
+                         **{rubro: financiero[rubro] for rubro in COLUMNAS_FINANCIERO}})
@@ -0,0 +1,186 @@
+"""
+Evaluación de modelos de Machine Learning sobre el histórico de costos ESAP.
+
+Reentrena y valida los modelos de la pestaña "Evaluación Modelos AI"
+(Gradient Boosting, XGBoost por defecto y optimizado, regresión lineal) con el
+histórico normalizado de `historico_costos`. Cada combinación
+(modelo, hiperparámetros, fold) es una tarea independiente que se ejecuta en un
+pool de procesos; los datos se envían una sola vez a cada proceso.
+
+Los resultados se guardan en JSON, con la huella de los datos y de la
+configuración en el nombre, así que la pestaña los lee al instante y solo se
+recalculan cuando cambia el histórico o la lista de modelos.
+
+scikit-learn y xgboost son dependencias opcionales: se importan solo al
+entrenar y, si xgboost no está instalado, sus modelos se omiten del reporte.
+"""
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+
+import numpy as np
+import pandas as pd
+
+from historico_costos import RUTA_CACHE
+
+SEMILLA = 2025
+N_FOLDS = 5
+PROPORCION_TEST = 0.2
+COLUMNAS_CATEGORICAS = ["Ciudad", "Modalidad"]
+
+# Nombre -> (estimador, hiperparámetros fijos, candidatos a optimizar)
+MODELOS = {
+    "Gradient Boosting": ("gradient_boosting", {"random_state": SEMILLA}, {}),
+    "XGBoost (Default)": ("xgboost", {"random_state": SEMILLA}, {}),
+    "XGBoost (Optimizado)": ("xgboost", {"random_state": SEMILLA}, {
+        "n_estimators": [100, 300],
+        "max_depth": [3, 6],
+        "learning_rate": [0.05, 0.1],
+    }),
+    "Regresión Lineal": ("lineal", {}, {}),
+}
+
+_datos_proceso = {}  # X, y de cada proceso del pool (se cargan una vez por proceso)
+
+
+def _crear_estimador(tipo, parametros):
+    if tipo == "gradient_boosting":
+        from sklearn.ensemble import GradientBoostingRegressor
+        return GradientBoostingRegressor(**parametros)
+    if tipo == "xgboost":
+        from xgboost import XGBRegressor
+        return XGBRegressor(n_jobs=1, **parametros)
+    if tipo == "lineal":
+        from sklearn.linear_model import LinearRegression
+        return LinearRegression(**parametros)
+    raise ValueError(f"Tipo de modelo desconocido: {tipo}")
+
+
+def _disponible(tipo):
+    try:
+        _crear_estimador(tipo, {})
+    except ImportError:
+        return False
+    return True
+
+
+def preparar_matriz(df):
+    """Aspirantes más variables indicadoras de ciudad y modalidad (si existen)."""
+    columnas = ["Aspirantes"] + [c for c in COLUMNAS_CATEGORICAS if c in df.columns]
+    X = pd.get_dummies(df[columnas], columns=columnas[1:], drop_first=True, dtype=np.float64)
+    return X.to_numpy(dtype=np.float64), df["Costo_Total"].to_numpy(dtype=np.float64)
+
+
+def huella_evaluacion(df, modelos=MODELOS):
+    """Huella de los datos de entrenamiento y de la configuración de modelos."""
+    columnas = ["Aspirantes", "Costo_Total"] + [c for c in COLUMNAS_CATEGORICAS if c in df.columns]
+    sha = hashlib.sha1(pd.util.hash_pandas_object(df[columnas], index=False).to_numpy().tobytes())
+    config = {"modelos": modelos, "semilla": SEMILLA, "folds": N_FOLDS, "test": PROPORCION_TEST}
+    sha.update(json.dumps(config, sort_keys=True, ensure_ascii=False).encode())
+    return sha.hexdigest()[:16]
+
+
+def _iniciar_proceso(X, y):
+    _datos_proceso["X"], _datos_proceso["y"] = X, y
+
+
+def _evaluar_tarea(tipo, parametros, entrenamiento, validacion):
+    """Entrena en los índices `entrenamiento` y devuelve el R² en `validacion`."""
+    from sklearn.metrics import r2_score
+
+    X, y = _datos_proceso["X"], _datos_proceso["y"]
+    modelo = _crear_estimador(tipo, parametros).fit(X[entrenamiento], y[entrenamiento])
+    return float(r2_score(y[validacion], modelo.predict(X[validacion])))
+
+
+def _candidatos(fijos, rejilla):
+    nombres = list(rejilla)
+    return [{**fijos, **dict(zip(nombres, valores))} for valores in product(*rejilla.values())]
+
+
+def clasificar_estado(r2_test, r2_cv):
+    if r2_test < 0:
+        return "No Converge ❌"
+    if r2_cv < 0:
+        return "Inestable 🚩"
+    if r2_test - r2_cv > 0.2:
+        return "Sobreajustado 🚩"
+    return "Aceptable ✅"
+
+
+def evaluar_modelos(df, modelos=MODELOS, workers=None):
+    """
+    Validación cruzada y R² de prueba de cada modelo, en paralelo.
+
+    Los hiperparámetros candidatos se comparan por R² CV medio sobre la
+    partición de entrenamiento; el mejor se reentrena con toda esa partición y
+    se mide en la de prueba. Devuelve un DataFrame con Modelo, R² Test,
+    R² CV (Validación), Estado y Parámetros.
+    """
+    from sklearn.model_selection import KFold, train_test_split
+
+    X, y = preparar_matriz(df)
+    entrenamiento, prueba = train_test_split(np.arange(len(y)), test_size=PROPORCION_TEST, random_state=SEMILLA)
+    folds = [(entrenamiento[a], entrenamiento[b])
+             for a, b in KFold(N_FOLDS, shuffle=True, random_state=SEMILLA).split(entrenamiento)]
+
+    disponibles = {nombre: config for nombre, config in modelos.items() if _disponible(config[0])}
+    candidatos = {nombre: _candidatos(fijos, rejilla) for nombre, (_, fijos, rejilla) in disponibles.items()}
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_iniciar_proceso, initargs=(X, y)) as pool:
+        cv = {(nombre, i, k): pool.submit(_evaluar_tarea, disponibles[nombre][0], parametros, a, b)
+              for nombre, lista in candidatos.items()
+              for i, parametros in enumerate(lista)
+              for k, (a, b) in enumerate(folds)}
+        cv = {clave: futuro.result() for clave, futuro in cv.items()}
+
+        mejores = {}
+        for nombre, lista in candidatos.items():
+            medias = [np.mean([cv[(nombre, i, k)] for k in range(len(folds))]) for i in range(len(lista))]
+            mejor = int(np.argmax(medias))
+            mejores[nombre] = (lista[mejor], float(medias[mejor]))
+
+        prueba_r2 = {nombre: pool.submit(_evaluar_tarea, disponibles[nombre][0], parametros, entrenamiento, prueba)
+                     for nombre, (parametros, _) in mejores.items()}
+        prueba_r2 = {nombre: futuro.result() for nombre, futuro in prueba_r2.items()}
+
+    filas = []
+    for nombre in modelos:
+        if nombre not in mejores:
+            filas.append({"Modelo": nombre, "R² Test": np.nan, "R² CV (Validación)": np.nan,
+                          "Estado": "No disponible ⚪", "Parámetros": "dependencia no instalada"})
+            continue
+        parametros, r2_cv = mejores[nombre]
+        filas.append({
+            "Modelo": nombre,
+            "R² Test": prueba_r2[nombre],
+            "R² CV (Validación)": r2_cv,
+            "Estado": clasificar_estado(prueba_r2[nombre], r2_cv),
+            "Parámetros": json.dumps(parametros, ensure_ascii=False),
+        })
+    return pd.DataFrame(filas)
+
+
+def ruta_resultados(huella):
+    return os.path.join(RUTA_CACHE, f"evaluacion-{huella}.json")
+
+
+def cargar_o_evaluar(df, modelos=MODELOS, workers=None):
+    """
+    Resultados persistidos para estos datos y modelos, o una evaluación nueva.
+
+    Devuelve (DataFrame de resultados, huella, recalculado).
+    """
+    huella = huella_evaluacion(df, modelos)
+    ruta = ruta_resultados(huella)
+    if os.path.exists(ruta):
+        return pd.read_json(ruta, orient="records"), huella, False
+
+    resultados = evaluar_modelos(df, modelos, workers)
+    os.makedirs(RUTA_CACHE, exist_ok=True)
+    temporal = ruta + ".tmp"
+    resultados.to_json(temporal, orient="records", force_ascii=False, indent=2)
+    os.replace(temporal, ruta)
+    return resultados, huella, True
@@ -0,0 +1,218 @@
+"""
+Ingesta del histórico de costos ESAP (Recopilado_Perso.xlsx).
+
+El libro se recorre en modo solo lectura (fila por fila, sin cargarlo completo
+en memoria), las columnas se normalizan a nombres canónicos y el resultado se
+guarda como Parquet en una carpeta de caché, con la huella (SHA-1) del archivo
+fuente en el nombre. Mientras el libro no cambie, las cargas siguientes leen el
+Parquet en milisegundos en lugar de volver a interpretar el Excel; si el libro
+cambia, su huella cambia y se genera un caché nuevo.
+"""
+import hashlib
+import os
+import re
+import unicodedata
+
+import pandas as pd
+
+from modelo_parametrico import CIUDADES
+
+_CARPETA = os.path.dirname(os.path.abspath(__file__))
+RUTA_HISTORICO = os.environ.get("ESAP_HISTORICO", os.path.join(_CARPETA, "Recopilado_Perso.xlsx"))
+RUTA_CACHE = os.environ.get("ESAP_CACHE_HISTORICO", os.path.join(_CARPETA, ".cache_historico"))
+
+# Nombre normalizado de la columna en el libro -> nombre canónico
+ALIAS_COLUMNAS = {
+    "concurso": "Concurso", "proceso": "Concurso", "convocatoria": "Concurso", "id": "Concurso",
+    "aspirantes": "Aspirantes", "n_aspirantes": "Aspirantes", "numero_aspirantes": "Aspirantes",
+    "no_aspirantes": "Aspirantes", "citados": "Aspirantes", "inscritos": "Aspirantes",
+    "ciudad": "Ciudad", "municipio": "Ciudad", "sede": "Ciudad",
+    "modalidad": "Modalidad", "tipo_prueba": "Modalidad", "tipo": "Modalidad",
+    "costo_total": "Costo_Total", "total": "Costo_Total", "valor_total": "Costo_Total",
+    "costo": "Costo_Total", "valor": "Costo_Total",
+    "fecha": "Fecha", "fecha_aplicacion": "Fecha",
+    "ano": "Año", "anio": "Año", "vigencia": "Año",
+}
+COLUMNAS_OBLIGATORIAS = ["Aspirantes", "Costo_Total"]
+# Nombre normalizado (sin tildes) de la ciudad -> nombre canónico del modelo
+ALIAS_CIUDADES = {
+    **{re.sub(r"[^a-z0-9]+", "_", unicodedata.normalize("NFKD", c).encode("ascii", "ignore").decode().lower()): c
+       for c in CIUDADES},
+    "bogota_d_c": "Bogotá", "bogota_dc": "Bogotá", "santa_fe_de_bogota": "Bogotá", "santafe_de_bogota": "Bogotá",
+    "san_andres_isla": "San Andrés", "san_andres_islas": "San Andrés",
+}
+MODALIDADES_NORMALIZADAS = {"escrita": "Escrita", "presencial": "Escrita", "virtual": "Virtual", "en_linea": "Virtual"}
+
+# Cambia cuando cambia la interpretación del libro, para no reutilizar cachés generados con la anterior
+VERSION_NORMALIZACION = 3
+
+_memoria = {}  # (ruta, mtime_ns, tamaño) -> DataFrame, evita recalcular la huella en cada rerun
+
+
+def _normalizar_nombre(nombre):
+    texto = unicodedata.normalize("NFKD", str(nombre)).encode("ascii", "ignore").decode()
+    return re.sub(r"[^a-z0-9]+", "_", texto.lower()).strip("_")
+
+
+def huella_archivo(ruta, tamano_bloque=1 << 20):
+    """SHA-1 del contenido del archivo, leído por bloques."""
+    sha = hashlib.sha1()
+    with open(ruta, "rb") as f:
+        for bloque in iter(lambda: f.read(tamano_bloque), b""):
+            sha.update(bloque)
+    return sha.hexdigest()
+
+
+def leer_libro(ruta, hoja=None):
+    """
+    Lee una hoja del libro en modo solo lectura.
+
+    El encabezado es la primera fila no vacía; las filas completamente vacías
+    se descartan. Devuelve un DataFrame con los nombres de columna originales.
+    """
+    from openpyxl import load_workbook
+
+    libro = load_workbook(ruta, read_only=True, data_only=True)
+    try:
+        filas = (libro[hoja] if hoja else libro.worksheets[0]).iter_rows(values_only=True)
+        encabezado = None
+        datos = []
+        for fila in filas:
+            if all(c is None or str(c).strip() == "" for c in fila):
+                continue
+            if encabezado is None:
+                encabezado = [str(c).strip() if c is not None else f"columna_{i}" for i, c in enumerate(fila)]
+            else:
+                datos.append(fila[:len(encabezado)])
+    finally:
+        libro.close()
+    if encabezado is None:
+        raise ValueError(f"El libro {ruta} no tiene datos.")
+    return pd.DataFrame(datos, columns=encabezado)
+
+
+def _a_numero(serie):
+    """
+    Convierte montos y conteos como "$ 1.234.567,50", "850.000", "1.200" o "1234567" a número.
+
+    Formato colombiano: el punto separa miles (grupos de tres dígitos) y solo
+    la coma es decimal. Un punto seguido de otra cantidad de dígitos ("12.5")
+    se lee como decimal. Solo se interpretan así las celdas de texto: en una
+    columna mixta, un número que Excel ya entregó como float (1.234) se
+    conserva tal cual.
+    """
+    if pd.api.types.is_numeric_dtype(serie):
+        return pd.to_numeric(serie, errors="coerce")
+    es_texto = serie.map(lambda valor: isinstance(valor, str)).astype(bool)
+    numeros = pd.to_numeric(serie.where(~es_texto), errors="coerce").astype("float64")
+    texto = serie[es_texto].astype("string").str.replace(r"[^\d,.\-]", "", regex=True)
+    formato_local = texto.str.contains(",", regex=False) | texto.str.fullmatch(r"-?\d{1,3}(\.\d{3})+")
+    texto = texto.where(~formato_local, texto.str.replace(".", "", regex=False).str.replace(",", ".", regex=False))
+    numeros[es_texto] = pd.to_numeric(texto, errors="coerce").astype("float64")
+    return numeros
+
+
+def _normalizar_ciudades(serie):
+    """
+    Unifica la escritura de las ciudades ("Bogota", "BOGOTÁ D.C." -> "Bogotá").
+
+    Las ciudades del modelo (y sus alias) toman el nombre de `CIUDADES`; las
+    demás se agrupan sin tildes ni mayúsculas y toman la escritura más
+    frecuente, prefiriendo la que lleva tildes.
+    """
+    texto = serie.astype("string").str.strip().str.title()
+    unicos = pd.Series(texto.dropna().unique(), dtype="string")
+    claves = unicos.map(_normalizar_nombre)
+    conteo = texto.value_counts()
+    tiene_tilde = unicos.map(lambda c: not c.isascii())
+    preferida = (pd.DataFrame({"clave": claves, "ciudad": unicos, "n": unicos.map(conteo), "tilde": tiene_tilde})
+                 .sort_values(["n", "tilde"], ascending=False).drop_duplicates("clave").set_index("clave")["ciudad"])
+    canonica = claves.map(ALIAS_CIUDADES).fillna(claves.map(preferida))
+    return texto.map(dict(zip(unicos, canonica))).astype("category")
+
+
+def normalizar_historico(df):
+    """
+    Lleva el histórico a las columnas canónicas del modelo.
+
+    Renombra según `ALIAS_COLUMNAS`, convierte aspirantes y costos a número,
+    unifica ciudad y modalidad y descarta las filas sin aspirantes o costo
+    válidos. Las columnas no reconocidas se conservan con su nombre normalizado.
+    """
+    renombres = {}
+    for columna in df.columns:
+        normalizado = _normalizar_nombre(columna)
+        canonico = ALIAS_COLUMNAS.get(normalizado, normalizado)
+        if canonico not in renombres.values():
+            renombres[columna] = canonico
+    df = df[list(renombres)].rename(columns=renombres)
+
+    faltantes = [c for c in COLUMNAS_OBLIGATORIAS if c not in df.columns]
+    if faltantes:
+        raise ValueError(f"El histórico no tiene las columnas {faltantes} (columnas: {list(df.columns)})")
+
+    df["Aspirantes"] = _a_numero(df["Aspirantes"])
+    df["Costo_Total"] = _a_numero(df["Costo_Total"])
+    df = df[(df["Aspirantes"] > 0) & (df["Costo_Total"] > 0)].copy()
+    df["Aspirantes"] = df["Aspirantes"].astype("float64").round().astype("int64")
+    df["Costo_Total"] = df["Costo_Total"].astype("float64")
+
+    if "Ciudad" in df.columns:
+        df["Ciudad"] = _normalizar_ciudades(df["Ciudad"])
+    if "Modalidad" in df.columns:
+        clave = df["Modalidad"].astype("string").map(_normalizar_nombre, na_action="ignore")
+        df["Modalidad"] = clave.map(MODALIDADES_NORMALIZADAS).fillna(df["Modalidad"].astype("string"))
+        df["Modalidad"] = df["Modalidad"].astype("category")
+    if "Concurso" in df.columns:
+        df["Concurso"] = df["Concurso"].astype("string")
+    if "Fecha" in df.columns:
+        df["Fecha"] = pd.to_datetime(df["Fecha"], errors="coerce")
+    for columna in df.columns.difference(["Aspirantes", "Costo_Total", "Ciudad", "Modalidad", "Concurso", "Fecha"]):
+        if df[columna].dtype == object:
+            df[columna] = df[columna].astype("string")
+
+    df["Costo_Por_Aspirante"] = df["Costo_Total"] / df["Aspirantes"]
+    return df.sort_values("Aspirantes", ignore_index=True)
+
+
+def _prefijo_cache(ruta, hoja=None):
+    nombre = os.path.splitext(os.path.basename(ruta))[0]
+    return f"{nombre}-{_normalizar_nombre(hoja)}-" if hoja else f"{nombre}-"
+
+
+def ruta_cache(ruta, huella, hoja=None):
+    return os.path.join(RUTA_CACHE, f"{_prefijo_cache(ruta, hoja)}{huella[:16]}.parquet")
+
+
+def cargar_historico(ruta=None, hoja=None):
+    """
+    Histórico normalizado, desde el caché Parquet si existe para esta versión del libro.
+
+    Lanza `FileNotFoundError` si el libro no existe. Los cachés de versiones
+    anteriores del mismo libro se eliminan al generar uno nuevo. Devuelve
+    una copia: modificarla no altera el histórico en memoria.
+    """
+    ruta = os.path.abspath(ruta or RUTA_HISTORICO)
+    estado = os.stat(ruta)
+    clave = (ruta, hoja, estado.st_mtime_ns, estado.st_size)
+    if clave in _memoria:
+        return _memoria[clave].copy()
+
+    huella = hashlib.sha1(f"{huella_archivo(ruta)}-v{VERSION_NORMALIZACION}".encode()).hexdigest()
+    destino = ruta_cache(ruta, huella, hoja)
+    if os.path.exists(destino):
+        df = pd.read_parquet(destino)
+    else:
+        df = normalizar_historico(leer_libro(ruta, hoja))
+        os.makedirs(RUTA_CACHE, exist_ok=True)
+        anteriores = re.compile(re.escape(_prefijo_cache(ruta, hoja)) + r"[0-9a-f]{16}\.parquet")
+        for anterior in os.listdir(RUTA_CACHE):
+            if anteriores.fullmatch(anterior):
+                os.remove(os.path.join(RUTA_CACHE, anterior))
+        temporal = destino + ".tmp"
+        df.to_parquet(temporal, index=False)
+        os.replace(temporal, destino)  # escritura atómica: otro proceso nunca lee un Parquet a medias
+
+    _memoria.clear()
+    _memoria[clave] = df
+    return df.copy()
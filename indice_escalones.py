@@ -0,0 +1,156 @@
+"""
+Índice de escalones del modelo paramétrico ESAP.
+
+El costo de `calcular_costo_parametrico` es una función escalonada: todos los
+recursos dependen del número de salones (un bloque cada 25 aspirantes) y, dentro
+de cada bloque, solo varía la impresión, que es lineal en el número de
+aspirantes. Como sitios, dactiloscopistas, coordinadores y aseo se abren cada
+20, 4, 6 y 6 salones, el costo fijo de los bloques se repite con un periodo de
+60 salones más un incremento constante. Este módulo precalcula ese periodo por
+(ciudad, modalidad) para:
+
+- consultar el costo de cualquier N en O(1), y
+- responder "¿cuál es el mayor N que cabe en el presupuesto B?" con una
+  búsqueda binaria sobre los bloques en lugar de un recorrido lineal.
+"""
+import math
+
+import numpy as np
+
+from modelo_parametrico import (
+    ASPIRANTES_POR_SALON, SALONES_POR_ASEO, SALONES_POR_COORDINADOR, SALONES_POR_DACTILOSCOPISTA,
+    SALONES_POR_SITIO, _como_arreglo_aspirantes, _logistica_por_salones, _techo, factor_ciudad_lote,
+)
+from tarifario import resolver_tarifario
+
+PERIODO_SALONES = math.lcm(SALONES_POR_SITIO, SALONES_POR_DACTILOSCOPISTA,
+                           SALONES_POR_COORDINADOR, SALONES_POR_ASEO)
+
+_indices = {}  # (huella del tarifario, ciudad, modalidad) -> índice
+
+
+def construir_indice(ciudad, tipo_prueba, tarifario=None):
+    """
+    Precalcula el índice de escalones para una combinación (ciudad, modalidad).
+
+    El índice guarda, para un periodo de `PERIODO_SALONES` salones, el costo
+    fijo entero (personal + insumos) y los sitios abiertos, junto con el
+    incremento que se suma en cada periodo completo. El transporte se guarda
+    aparte para reproducir exactamente la aritmética del cálculo escalar. Los
+    índices se guardan por contenido del tarifario, así que una recarga con
+    tarifas nuevas construye índices nuevos.
+    """
+    tarifario = resolver_tarifario(tarifario)
+    clave = (tarifario["huella"], ciudad, tipo_prueba)
+    if clave in _indices:
+        return _indices[clave]
+
+    salones = np.arange(PERIODO_SALONES + 1, dtype=np.int64)
+    base = _logistica_por_salones(salones, tarifario["precio"])
+    jefes_extra = salones if tipo_prueba == "Virtual" else 0
+    fijo = base["Personal"] + base["Insumos"] + jefes_extra * tarifario["precio"]['Jefe Salón']
+
+    # Tramos de impresión como segmentos [inicio, fin] de aspirantes
+    tramos = tarifario["tramos_impresion"]
+    inicios = [1] + [limite + 1 for limite, _ in tramos]
+    fines = [limite for limite, _ in tramos] + [None]
+    precios = [precio for _, precio in tramos] + [tarifario["precio_impresion_base"]]
+
+    _indices[clave] = {
+        "ciudad": ciudad,
+        "tipo_prueba": tipo_prueba,
+        "version_tarifario": tarifario["version"],
+        "costo_transporte_sitio": tarifario["costo_transporte_sitio"],
+        "factor_ciudad": float(factor_ciudad_lote(ciudad, tarifario)),
+        "fijo_periodo": fijo[:-1],
+        "sitios_periodo": base["Sitios"][:-1],
+        "incremento_fijo": int(fijo[-1]),
+        "incremento_sitios": int(base["Sitios"][-1]),
+        "tramos": list(zip(inicios, fines, precios)),
+    }
+    return _indices[clave]
+
+
+def _costo_fijo(indice, n_salones):
+    """Costo de todo lo que no es impresión para un número de salones (O(1))."""
+    periodos, resto = np.divmod(n_salones, PERIODO_SALONES)
+    fijo = periodos * indice["incremento_fijo"] + indice["fijo_periodo"][resto]
+    sitios = periodos * indice["incremento_sitios"] + indice["sitios_periodo"][resto]
+    return fijo, indice["costo_transporte_sitio"] * sitios * indice["factor_ciudad"]
+
+
+def _precio_tramo(indice, n):
+    precio = np.full(np.shape(n), indice["tramos"][-1][2], dtype=np.int64)
+    for _, fin, precio_tramo in reversed(indice["tramos"][:-1]):
+        precio[n <= fin] = precio_tramo
+    return precio
+
+
+def costo_total(n_aspirantes, ciudad, tipo_prueba, tarifario=None):
+    """
+    Costo total para uno o varios N usando el índice precalculado.
+
+    Devuelve los mismos valores que `calcular_costo_parametrico(...)['financiero']['Total']`.
+    """
+    indice = construir_indice(ciudad, tipo_prueba, tarifario)
+    n = _como_arreglo_aspirantes(n_aspirantes)
+    fijo, transporte = _costo_fijo(indice, _techo(n, ASPIRANTES_POR_SALON))
+    total = (n * _precio_tramo(indice, n) + fijo) + transporte
+    return total if total.ndim else float(total)
+
+
+def max_aspirantes_presupuesto(presupuesto, ciudad, tipo_prueba, tarifario=None):
+    """
+    Mayor número de aspirantes cuyo costo total no supera `presupuesto`.
+
+    El costo no es monótono en los cambios de tramo de impresión (pasar de 1000
+    a 1001 aspirantes abarata la impresión), pero sí lo es dentro de cada
+    tramo. Por eso se recorren los tramos de mayor a menor y, dentro de cada
+    uno, se hace una búsqueda binaria sobre los bloques de 25 aspirantes; el
+    valor exacto dentro del bloque se despeja de la parte lineal. Acepta un
+    escalar o un arreglo de presupuestos y devuelve 0 donde no alcanza ni
+    para un aspirante.
+    """
+    tarifario = resolver_tarifario(tarifario)
+    indice = construir_indice(ciudad, tipo_prueba, tarifario)
+    b = np.asarray(presupuesto, dtype=np.float64)
+    escalar = b.ndim == 0
+    b = np.atleast_1d(b)
+    resultado = np.zeros(b.shape, dtype=np.int64)
+    pendiente = np.ones(b.shape, dtype=bool)
+
+    for inicio, fin, precio in reversed(indice["tramos"]):
+        if fin is None:
+            # Cota superior: la impresión sola ya cuesta N * precio
+            fin_b = np.maximum(np.floor(b / precio).astype(np.int64), inicio)
+        else:
+            fin_b = np.full(b.shape, fin, dtype=np.int64)
+
+        factible = pendiente & (costo_total(np.full(b.shape, inicio), ciudad, tipo_prueba, tarifario) <= b)
+        if not factible.any():
+            continue
+
+        # Búsqueda binaria del último bloque cuyo primer aspirante (dentro del tramo) cabe
+        lo = np.full(b.shape, _techo(inicio, ASPIRANTES_POR_SALON), dtype=np.int64)
+        hi = _techo(fin_b, ASPIRANTES_POR_SALON)
+        while True:
+            activo = factible & (lo < hi)
+            if not activo.any():
+                break
+            medio = (lo + hi + 1) // 2
+            primero = np.maximum((medio - 1) * ASPIRANTES_POR_SALON + 1, inicio)
+            cabe = costo_total(primero, ciudad, tipo_prueba, tarifario) <= b
+            lo = np.where(activo & cabe, medio, lo)
+            hi = np.where(activo & ~cabe, medio - 1, hi)
+
+        # Dentro del bloque el costo es fijo + N * precio
+        fijo, transporte = _costo_fijo(indice, lo)
+        n = np.floor((b - (fijo + transporte)) / precio).astype(np.int64)
+        n = np.minimum(n, np.minimum(lo * ASPIRANTES_POR_SALON, fin_b))
+        # Corrección por redondeo de punto flotante en el despeje
+        n = np.where(costo_total(np.maximum(n, 1), ciudad, tipo_prueba, tarifario) > b, n - 1, n)
+
+        resultado = np.where(factible, n, resultado)
+        pendiente &= ~factible
+
+    return int(resultado[0]) if escalar else resultado
@@ -0,0 +1,148 @@
+"""
+Intervalos conformales para las cotizaciones del modelo paramétrico.
+
+El modelo de reglas no se ajusta con el histórico, así que todo el histórico
+sirve de conjunto de calibración (split conformal con el "entrenamiento" ya
+hecho por las reglas). El puntaje de cada concurso es el error relativo
+|real - cotizado| / cotizado; para cada nivel de cobertura 1 - α el cuantil
+conformal es el puntaje en la posición ⌈(n + 1)(1 - α)⌉ de los n puntajes
+ordenados, y el intervalo de una cotización nueva es
+cotizado · (1 ± cuantil).
+
+Los cuantiles se estratifican por ciudad y modalidad; los estratos con menos
+de `MIN_CALIBRACION` concursos usan el cuantil global. La tabla se calcula
+una vez por histórico y tarifario y se guarda en la caché del histórico, de
+modo que una cotización interactiva solo hace una búsqueda en un diccionario
+y un lote de millones de escenarios, una indexación de arreglos.
+"""
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from backtest_modelo import huella_backtest, residuos_backtest
+from historico_costos import RUTA_CACHE
+from tarifario import resolver_tarifario
+
+NIVELES = (0.8, 0.9, 0.95)
+NIVEL_DEFECTO = 0.9
+MIN_CALIBRACION = 30
+
+
+def cuantil_conformal(puntajes, nivel):
+    """Cuantil conformal de los puntajes (inf si no hay suficientes para el nivel pedido)."""
+    puntajes = np.sort(np.asarray(puntajes, dtype=np.float64))
+    k = int(np.ceil((len(puntajes) + 1) * nivel))
+    return float(puntajes[k - 1]) if 0 < k <= len(puntajes) else np.inf
+
+
+def calibrar(df, tarifario=None, niveles=NIVELES, min_calibracion=MIN_CALIBRACION):
+    """
+    Tabla de cuantiles conformales por ciudad, modalidad y nivel a partir del histórico `df`.
+
+    Devuelve un diccionario serializable con "niveles", "ciudades",
+    "modalidades", "cuantiles" (ciudad × modalidad × nivel, ya con el global
+    en los estratos pequeños), "global", "concursos" por estrato y la versión
+    del tarifario. Lanza `ValueError` si el histórico no alcanza para el
+    nivel más alto.
+    """
+    tarifario = resolver_tarifario(tarifario)
+    residuos = residuos_backtest(df, tarifario)
+    puntaje = (residuos["Costo_Total"] - residuos["Costo_Modelo"]).abs() / residuos["Costo_Modelo"]
+    niveles = tuple(sorted(float(n) for n in niveles))
+
+    global_ = [cuantil_conformal(puntaje, nivel) for nivel in niveles]
+    if not np.all(np.isfinite(global_)):
+        raise ValueError(f"El histórico ({len(puntaje):,} concursos) no alcanza para un intervalo del "
+                         f"{niveles[-1]:.0%}.")
+
+    ciudades = sorted(residuos["Ciudad"].astype(str).unique())
+    modalidades = sorted(residuos["Modalidad"].astype(str).unique())
+    cuantiles = np.tile(np.asarray(global_), (len(ciudades), len(modalidades), 1))
+    concursos = np.zeros((len(ciudades), len(modalidades)), dtype=np.int64)
+    for (ciudad, modalidad), grupo in puntaje.groupby([residuos["Ciudad"].astype(str),
+                                                      residuos["Modalidad"].astype(str)]):
+        i, j = ciudades.index(ciudad), modalidades.index(modalidad)
+        concursos[i, j] = len(grupo)
+        if len(grupo) >= min_calibracion:
+            propios = np.array([cuantil_conformal(grupo, nivel) for nivel in niveles])
+            cuantiles[i, j] = np.where(np.isfinite(propios), propios, global_)
+
+    return {
+        "niveles": list(niveles), "ciudades": ciudades, "modalidades": modalidades,
+        "cuantiles": cuantiles.tolist(), "global": global_, "concursos": concursos.tolist(),
+        "tarifario": tarifario["version"],
+    }
+
+
+def cargar_o_calibrar(df, tarifario=None, niveles=NIVELES):
+    """Calibración persistida para este histórico, tarifario y niveles, o una nueva. Devuelve (tabla, recalculado)."""
+    tarifario = resolver_tarifario(tarifario)
+    huella = hashlib.sha1(f"{huella_backtest(df, tarifario)}{sorted(niveles)}".encode()).hexdigest()[:16]
+    ruta = os.path.join(RUTA_CACHE, f"conformal-{huella}.json")
+    if os.path.exists(ruta):
+        with open(ruta, encoding="utf-8") as f:
+            return json.load(f), False
+
+    calibracion = calibrar(df, tarifario, niveles)
+    os.makedirs(RUTA_CACHE, exist_ok=True)
+    temporal = ruta + ".tmp"
+    with open(temporal, "w", encoding="utf-8") as f:
+        json.dump(calibracion, f, ensure_ascii=False)
+    os.replace(temporal, ruta)
+    return calibracion, True
+
+
+def _posicion_nivel(calibracion, nivel):
+    try:
+        return calibracion["niveles"].index(float(nivel))
+    except ValueError:
+        raise ValueError(f"Nivel {nivel} no calibrado (disponibles: {calibracion['niveles']})") from None
+
+
+def intervalo(costo, ciudad, modalidad, calibracion, nivel=NIVEL_DEFECTO):
+    """(inferior, superior) para una cotización; ciudades o modalidades sin histórico usan el cuantil global."""
+    k = _posicion_nivel(calibracion, nivel)
+    try:
+        q = calibracion["cuantiles"][calibracion["ciudades"].index(ciudad)][
+            calibracion["modalidades"].index(modalidad)][k]
+    except ValueError:
+        q = calibracion["global"][k]
+    return max(costo * (1 - q), 0.0), costo * (1 + q)
+
+
+def _codigos(valores, categorias, forma):
+    """Posición de cada valor en `categorias` (-1 si no está), sin recorrer cadenas si llega un Categorical."""
+    if isinstance(valores, (pd.Series, pd.Index)):
+        valores = valores.array
+    if isinstance(valores, pd.Categorical):
+        codigos, unicos = valores.codes, valores.categories
+    else:
+        valores = np.asarray(valores, dtype=object)
+        codigos, unicos = pd.factorize(valores.ravel())
+        codigos = codigos.reshape(valores.shape)
+    mapa = np.append(pd.Index(categorias).get_indexer(unicos), -1)
+    return np.broadcast_to(mapa[codigos], forma)
+
+
+def intervalos_lote(costo, ciudad, modalidad, calibracion, nivel=NIVEL_DEFECTO):
+    """Versión vectorizada de `intervalo` para arreglos (o Categorical) de costos, ciudades y modalidades."""
+    k = _posicion_nivel(calibracion, nivel)
+    tabla = np.asarray(calibracion["cuantiles"], dtype=np.float64)[:, :, k]
+    # Una fila y una columna extra con el cuantil global para las categorías desconocidas (código -1)
+    tabla = np.pad(tabla, ((0, 1), (0, 1)), constant_values=calibracion["global"][k])
+    costo = np.asarray(costo, dtype=np.float64)
+    q = tabla[_codigos(ciudad, calibracion["ciudades"], costo.shape),
+              _codigos(modalidad, calibracion["modalidades"], costo.shape)]
+    return np.maximum(costo * (1 - q), 0.0), costo * (1 + q)
+
+
+def agregar_intervalos(df, calibracion, nivel=NIVEL_DEFECTO, col_costo="Total", col_ciudad="Ciudad",
+                       col_tipo="Modalidad"):
+    """Agrega "<col_costo> Inferior" y "<col_costo> Superior" a la salida de `calcular_costo_dataframe`."""
+    ciudad = df[col_ciudad] if col_ciudad in df else "Bogotá"
+    tipo = df[col_tipo] if col_tipo in df else "Escrita"
+    inferior, superior = intervalos_lote(df[col_costo].to_numpy(), ciudad, tipo, calibracion, nivel)
+    return df.assign(**{f"{col_costo} Inferior": inferior, f"{col_costo} Superior": superior})
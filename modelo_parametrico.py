@@ -0,0 +1,418 @@
+"""
+Motor del modelo paramétrico de costos ESAP.
+
+Contiene las reglas de negocio usadas por Calculadora.py, sin dependencias de
+Streamlit, para poder reutilizarlas desde otras herramientas. Los precios se
+leen del tarifario versionado (ver `tarifario.py`).
+"""
+import math
+
+import numpy as np
+import pandas as pd
+
+from tarifario import resolver_tarifario
+
+# ==============================================================================
+# REGLAS DE NEGOCIO
+# ==============================================================================
+ASPIRANTES_POR_SITIO = 500
+ASPIRANTES_POR_SALON = 25
+SALONES_POR_DACTILOSCOPISTA = 4
+SALONES_POR_COORDINADOR = 6
+SALONES_POR_ASEO = 6
+SEGURIDAD_POR_SITIO = 2
+
+CIUDADES = ["Bogotá", "Medellín", "Cali", "Barranquilla", "Bucaramanga", "Quibdó", "San Andrés"]
+MODALIDADES = ["Escrita", "Virtual"]
+
+# Recursos del tarifario agrupados por rubro financiero
+RECURSOS_PERSONAL = ['Delegado', 'Jefe Salón', 'Dactiloscopista', 'Coord. Aulas', 'Aseo', 'Seguridad']
+RECURSOS_INSUMOS = ['Kit Salón', 'Kit Dactilo', 'Kit Aseo']
+
+# Hasta cuántas categorías conviene comparar el texto directamente en lugar de codificarlo (ver `_por_categoria`)
+MAX_COMPARACIONES = 2
+
+COLUMNAS_LOGISTICA = ["Sitios", "Salones", "Staff Total", "Jefes de Salón", "Dactiloscopistas"]
+COLUMNAS_FINANCIERO = ["Impresión", "Personal", "Insumos", "Logística", "Total"]
+COLUMNA_VERSION = "Versión Tarifario"
+
+
+def calcular_costo_parametrico(n_aspirantes, ciudad, tipo_prueba, tarifario=None, n_sitios=None, n_salones=None):
+    """
+    Motor de cálculo basado en reglas de negocio y tarifarios definidos.
+
+    `tarifario` puede ser un tarifario procesado, una versión o None (vigente);
+    la versión usada queda registrada en el resultado. `n_sitios` y
+    `n_salones` reemplazan los de las reglas de negocio cuando se conocen los
+    sitios y salones reales (ver `asignacion_salones.py`).
+    """
+    if type(tarifario) is not dict:  # el tarifario ya procesado no paga la llamada
+        tarifario = resolver_tarifario(tarifario)
+
+    # 1. REGLAS DE NEGOCIO (Logística)
+    # ---------------------------------------------------------
+    if n_sitios is None:
+        n_sitios = math.ceil(n_aspirantes / ASPIRANTES_POR_SITIO)
+
+    if n_salones is None:
+        n_salones = math.ceil(n_aspirantes / ASPIRANTES_POR_SALON)
+
+    # Personal
+    n_delegados_sitio = n_sitios
+    n_jefes_salon = n_salones * (2 if tipo_prueba == "Virtual" else 1)
+    n_dactiloscopistas = math.ceil(n_salones / SALONES_POR_DACTILOSCOPISTA)
+    n_coord_aulas = math.ceil(n_salones / SALONES_POR_COORDINADOR)
+    n_aseo = math.ceil(n_salones / SALONES_POR_ASEO)
+    n_seguridad = n_sitios * SEGURIDAD_POR_SITIO
+
+    total_staff = n_delegados_sitio + n_jefes_salon + n_dactiloscopistas + n_coord_aulas + n_aseo + n_seguridad
+
+    # Materiales (Kits)
+    n_kits_salon = n_salones
+    n_kits_dactilo = n_dactiloscopistas
+    n_kits_aseo = n_aseo
+
+    # 2. TARIFARIO (Financiero)
+    # ---------------------------------------------------------
+    precios = tarifario["precio"]
+
+    # Lógica de rangos para impresión (Economía de escala)
+    precio_impresion = tarifario["precio_impresion_base"]
+    for limite, precio in tarifario["tramos_impresion"]:
+        if n_aspirantes <= limite:
+            precio_impresion = precio
+            break
+
+    # Lógica de transporte (Geográfica simplificada)
+    factor_ciudad = tarifario["factor_por_ciudad"].get(ciudad, tarifario["factor_ciudad_defecto"])
+    costo_transporte_base = tarifario["costo_transporte_sitio"] * n_sitios * factor_ciudad
+
+    # 3. CÁLCULO DE COSTOS
+    # ---------------------------------------------------------
+    costo_impresion = n_aspirantes * precio_impresion
+
+    costo_staff = (n_delegados_sitio * precios['Delegado']) + \
+                  (n_jefes_salon * precios['Jefe Salón']) + \
+                  (n_dactiloscopistas * precios['Dactiloscopista']) + \
+                  (n_coord_aulas * precios['Coord. Aulas']) + \
+                  (n_aseo * precios['Aseo']) + \
+                  (n_seguridad * precios['Seguridad'])
+
+    costo_insumos = (n_kits_salon * precios['Kit Salón']) + \
+                    (n_kits_dactilo * precios['Kit Dactilo']) + \
+                    (n_kits_aseo * precios['Kit Aseo'])
+
+    total = costo_impresion + costo_staff + costo_insumos + costo_transporte_base
+
+    return {
+        "logistica": {
+            "Sitios": n_sitios, "Salones": n_salones, "Staff Total": total_staff,
+            "Jefes de Salón": n_jefes_salon, "Dactiloscopistas": n_dactiloscopistas
+        },
+        "financiero": {
+            "Impresión": costo_impresion, "Personal": costo_staff,
+            "Insumos": costo_insumos, "Logística": costo_transporte_base,
+            "Total": total
+        },
+        "tarifario": tarifario["version"]
+    }
+
+
+# ==============================================================================
+# MOTOR VECTORIZADO (Lotes de escenarios)
+# ==============================================================================
+# Un sitio agrupa siempre un número entero de salones, así que toda la logística
+# (y el costo de personal e insumos) depende solo del número de salones.
+SALONES_POR_SITIO = ASPIRANTES_POR_SITIO // ASPIRANTES_POR_SALON
+assert SALONES_POR_SITIO * ASPIRANTES_POR_SALON == ASPIRANTES_POR_SITIO
+
+
+def _techo(a, b):
+    """División entera con redondeo hacia arriba (equivalente a math.ceil(a / b))."""
+    return (a + (b - 1)) // b
+
+
+def _como_arreglo_aspirantes(n_aspirantes):
+    n = np.asarray(n_aspirantes)
+    if n.dtype.kind == "f":
+        if not np.all(np.isfinite(n)) or np.any(n != np.floor(n)):
+            raise ValueError("El número de aspirantes debe ser entero.")
+    elif n.dtype.kind not in "iu":
+        raise TypeError(f"Tipo no soportado para el número de aspirantes: {n.dtype}")
+    return n.astype(np.int64, copy=False)
+
+
+def _sin_envoltorio(valores):
+    """El arreglo de una columna de pandas: de NumPy si la columna lo es, si no su ExtensionArray."""
+    if isinstance(valores, (pd.Series, pd.Index)):
+        return valores.to_numpy() if isinstance(valores.dtype, np.dtype) else valores.array
+    return valores
+
+
+def _como_mascara(valores, objetivo):
+    """Compara un escalar, arreglo, columna de pandas o Categorical contra `objetivo`."""
+    valores = _sin_envoltorio(valores)
+    if isinstance(valores, pd.Categorical):
+        # Comparar los códigos enteros evita recorrer las cadenas fila a fila.
+        codigo = valores.categories.get_indexer([objetivo])[0]
+        return np.asarray(valores.codes) == codigo
+    if isinstance(valores, pd.api.extensions.ExtensionArray):
+        # Texto de pandas (p. ej. respaldado por Arrow): se compara sin convertirlo a objetos de Python.
+        iguales = valores == objetivo
+        return iguales.to_numpy(dtype=bool, na_value=False) if hasattr(iguales, "to_numpy") else np.asarray(iguales)
+    return np.asarray(valores) == objetivo
+
+
+def _remapear(codigos, unicos, categorias):
+    """Traduce códigos de `pd.factorize` (sobre `unicos`) a posiciones en `categorias`."""
+    mapa = pd.Index(categorias).get_indexer(unicos)
+    mapa[mapa < 0] = len(categorias)
+    return np.append(mapa, len(categorias))[codigos]  # el código -1 (faltante) cae en la última posición
+
+
+def _codigos_texto(valores, categorias, bloque=1 << 14):
+    """
+    `_codigos` para un arreglo de texto de NumPy ('<U'), sin pasar por objetos de Python.
+
+    La primera palabra de máquina de cada fila (sus primeros caracteres) se
+    factoriza como entero y da una categoría candidata; luego la fila completa
+    se confirma contra esa categoría, por bloques que caben en caché. El
+    resultado es exacto, no un hash.
+    """
+    plano = valores.reshape(-1)
+    otra = len(categorias)
+    ancho = plano.dtype.itemsize // 4
+    palabra = np.uint64 if plano.dtype.itemsize % 8 == 0 else np.uint32
+    # Una categoría más larga que el ancho del arreglo no puede aparecer en él (y NumPy la truncaría).
+    candidatas = [c if len(c) <= ancho else "" for c in categorias] + [""]
+    conocidas = np.array(candidatas, dtype=plano.dtype)
+    primeras = conocidas.view(palabra).reshape(len(conocidas), -1)[:, 0]
+    validas = np.array([bool(c) for c in candidatas[:-1]])
+    if len(set(primeras[:-1][validas].tolist())) < validas.sum():
+        # Dos categorías comparten los primeros caracteres: se factoriza el texto completo.
+        codigos, unicos = pd.factorize(plano.astype(object))
+        return _remapear(codigos, unicos, categorias)
+
+    codigos, unicos = pd.factorize(plano.view(palabra).reshape(plano.size, -1)[:, 0])
+    mapa = pd.Index(primeras[:-1][validas]).get_indexer(unicos)
+    mapa = np.where(mapa < 0, otra, np.flatnonzero(validas)[mapa])
+    candidato = mapa[codigos]
+    for inicio in range(0, plano.size, bloque):
+        trozo = candidato[inicio:inicio + bloque]
+        trozo[conocidas[trozo] != plano[inicio:inicio + bloque]] = otra
+    return candidato
+
+
+def _codigos(valores, categorias):
+    """
+    Posición de cada valor en `categorias` (`len(categorias)` si no está), con la forma de `valores`.
+
+    Las etiquetas por fila (ciudades) se codifican una sola vez y luego
+    cualquier valor por categoría se obtiene indexando una tabla pequeña. Un
+    `pd.Categorical` reutiliza sus códigos, las columnas de pandas y los
+    arreglos de objetos pasan por `pd.factorize`, y los arreglos de texto de
+    NumPy por `_codigos_texto`.
+    """
+    valores = _sin_envoltorio(valores)
+    if isinstance(valores, pd.Categorical):
+        return _remapear(np.asarray(valores.codes), valores.categories, categorias)
+    if isinstance(valores, pd.api.extensions.ExtensionArray):
+        return _remapear(*pd.factorize(valores), categorias)
+    valores = np.asarray(valores)
+    if valores.ndim == 0:
+        valor = valores.item()
+        return np.asarray(categorias.index(valor) if valor in categorias else len(categorias))
+    if valores.dtype.kind == "U" and valores.size:
+        return _codigos_texto(valores, tuple(categorias)).reshape(valores.shape)
+    codigos, unicos = pd.factorize(valores.reshape(-1))
+    return _remapear(codigos, unicos, categorias).reshape(valores.shape)
+
+
+def _logistica_por_salones(n_salones, precios):
+    """Recursos y costos (modalidad Escrita, sin impresión ni transporte) por número de salones."""
+    n_sitios = _techo(n_salones, SALONES_POR_SITIO)
+    n_dactiloscopistas = _techo(n_salones, SALONES_POR_DACTILOSCOPISTA)
+    n_coord_aulas = _techo(n_salones, SALONES_POR_COORDINADOR)
+    n_aseo = _techo(n_salones, SALONES_POR_ASEO)
+    n_seguridad = n_sitios * SEGURIDAD_POR_SITIO
+    return {
+        "Sitios": n_sitios,
+        "Staff Total": n_sitios + n_salones + n_dactiloscopistas + n_coord_aulas + n_aseo + n_seguridad,
+        "Dactiloscopistas": n_dactiloscopistas,
+        "Personal": (n_sitios * precios['Delegado']
+                     + n_salones * precios['Jefe Salón']
+                     + n_dactiloscopistas * precios['Dactiloscopista']
+                     + n_coord_aulas * precios['Coord. Aulas']
+                     + n_aseo * precios['Aseo']
+                     + n_seguridad * precios['Seguridad']),
+        "Insumos": (n_salones * precios['Kit Salón']
+                    + n_dactiloscopistas * precios['Kit Dactilo']
+                    + n_aseo * precios['Kit Aseo']),
+    }
+
+
+def cantidades_por_recurso(n_aspirantes, tipo_prueba="Escrita"):
+    """
+    Cantidad de cada recurso del tarifario por escenario.
+
+    Aplica las mismas reglas de negocio que `calcular_costo_parametrico`, pero
+    deja los precios fuera para que puedan variar (simulación, sensibilidad).
+    """
+    n = _como_arreglo_aspirantes(n_aspirantes)
+    n_sitios = _techo(n, ASPIRANTES_POR_SITIO)
+    n_salones = _techo(n, ASPIRANTES_POR_SALON)
+    n_dactiloscopistas = _techo(n_salones, SALONES_POR_DACTILOSCOPISTA)
+    n_aseo = _techo(n_salones, SALONES_POR_ASEO)
+    return {
+        'Delegado': n_sitios,
+        'Jefe Salón': n_salones * np.where(_como_mascara(tipo_prueba, "Virtual"), 2, 1),
+        'Dactiloscopista': n_dactiloscopistas,
+        'Coord. Aulas': _techo(n_salones, SALONES_POR_COORDINADOR),
+        'Aseo': n_aseo,
+        'Seguridad': n_sitios * SEGURIDAD_POR_SITIO,
+        'Kit Salón': n_salones,
+        'Kit Dactilo': n_dactiloscopistas,
+        'Kit Aseo': n_aseo,
+    }
+
+
+def precio_impresion_lote(n, tarifario=None):
+    """Precio unitario de impresión para un arreglo de aspirantes."""
+    tarifario = resolver_tarifario(tarifario)
+    condiciones = [n <= limite for limite, _ in tarifario["tramos_impresion"]]
+    precios = [precio for _, precio in tarifario["tramos_impresion"]]
+    return np.select(condiciones, precios, tarifario["precio_impresion_base"])
+
+
+def _por_categoria(valores, categorias, tabla):
+    """`tabla[i]` donde el valor es `categorias[i]` y `tabla[-1]` donde no está en `categorias`."""
+    valores = _sin_envoltorio(valores)
+    if np.ndim(valores) and not isinstance(valores, pd.Categorical) and len(categorias) <= MAX_COMPARACIONES:
+        # Con pocas categorías (el tarifario suele listar solo las ciudades con factor propio)
+        # unas cuantas comparaciones directas cuestan menos que codificar el arreglo.
+        resultado = np.full(np.shape(valores), tabla[-1])
+        for posicion, categoria in enumerate(categorias):
+            resultado[_como_mascara(valores, categoria)] = tabla[posicion]
+        return resultado
+    return tabla[_codigos(valores, categorias)]
+
+
+def factor_ciudad_lote(ciudad, tarifario=None):
+    """Factor geográfico de transporte para un arreglo (o escalar) de ciudades."""
+    tarifario = resolver_tarifario(tarifario)
+    return _por_categoria(ciudad, tarifario["ciudades"],
+                          np.append(tarifario["factor_ciudad"], tarifario["factor_ciudad_defecto"]))
+
+
+def _tabla_por_salones(n_salones, virtual, tarifario, factor_ciudad):
+    """
+    Todo lo que depende solo del número de salones, la modalidad y la ciudad.
+
+    Un sitio agrupa siempre un número entero de salones, así que la logística,
+    el personal, los insumos y el transporte quedan determinados por
+    (salones, modalidad, factor de ciudad). "Resto" es Personal + Insumos en
+    punto flotante, listo para sumarle la impresión y el transporte.
+    """
+    precios = tarifario["precio"]
+    base = _logistica_por_salones(n_salones, precios)
+    # Modalidad Virtual: dos Jefes de Salón por salón en lugar de uno
+    jefes_extra = n_salones * virtual
+    personal = base["Personal"] + jefes_extra * precios['Jefe Salón']
+    return {
+        "Sitios": base["Sitios"],
+        "Staff Total": base["Staff Total"] + jefes_extra,
+        "Jefes de Salón": n_salones + jefes_extra,
+        "Dactiloscopistas": base["Dactiloscopistas"],
+        "Personal": personal,
+        "Insumos": base["Insumos"],
+        "Logística": tarifario["costo_transporte_sitio"] * base["Sitios"] * factor_ciudad,
+        "Resto": (personal + base["Insumos"]).astype(np.float64),
+    }
+
+
+def calcular_costo_lote(n_aspirantes, ciudad="Bogotá", tipo_prueba="Escrita", tarifario=None):
+    """
+    Versión vectorizada de `calcular_costo_parametrico`.
+
+    Recibe arreglos (o escalares que se difunden) de aspirantes, ciudades y
+    modalidades y devuelve la misma estructura que el cálculo escalar
+    (`{"logistica": {...}, "financiero": {...}}`), con un arreglo de NumPy por
+    cada rubro en lugar de un número. Los valores son idénticos elemento a
+    elemento a los de `calcular_costo_parametrico`.
+
+    Ciudad y modalidad pueden llegar como texto, columnas de pandas o
+    `pd.Categorical`; las ciudades se codifican una sola vez (ver `_codigos`).
+    En lotes grandes el costo lo domina la memoria nueva de cada arreglo, así
+    que el cálculo reparte tablas pequeñas con un índice y opera en el lugar.
+    """
+    tarifario = resolver_tarifario(tarifario)
+    n = _como_arreglo_aspirantes(n_aspirantes)
+    factor_ciudad = factor_ciudad_lote(ciudad, tarifario)
+    virtual = _como_mascara(tipo_prueba, "Virtual")
+    forma = np.broadcast_shapes(n.shape, factor_ciudad.shape, virtual.shape)
+    n = np.broadcast_to(n, forma)
+    n_salones = n + (ASPIRANTES_POR_SALON - 1)
+    n_salones //= ASPIRANTES_POR_SALON
+
+    # 1. Logística: se tabula una sola vez por (salones, modalidad) y se reparte
+    # con un índice cuando el lote es más grande que ese rango.
+    max_salones = int(n_salones.max(initial=0))
+    if n_salones.size > max_salones:
+        salones = np.arange(max_salones + 1, dtype=np.int64)[:, None]
+        modalidades = np.array([False, True]) if virtual.ndim else virtual
+        # Con una sola ciudad el factor entra en la tabla; si no, se aplica después de repartir.
+        tabla = _tabla_por_salones(salones, modalidades, tarifario, 1.0 if factor_ciudad.ndim else factor_ciudad)
+        forma_tabla = np.broadcast_shapes(salones.shape, modalidades.shape)
+        if virtual.ndim:
+            llave = n_salones * 2
+            llave += virtual
+        else:
+            llave = n_salones
+        base = {clave: np.take(np.broadcast_to(valores, forma_tabla).ravel(), llave)
+                for clave, valores in tabla.items()}
+        if factor_ciudad.ndim:
+            base["Logística"] *= factor_ciudad
+    else:
+        base = _tabla_por_salones(n_salones, virtual, tarifario, factor_ciudad)
+
+    # 2. Financiero: el precio de impresión por número de aspirantes también se tabula
+    max_aspirantes = ASPIRANTES_POR_SALON * max_salones
+    if n.size > max_aspirantes:
+        costo_impresion = np.take(precio_impresion_lote(np.arange(max_aspirantes + 1), tarifario), n)
+        costo_impresion *= n
+    else:
+        costo_impresion = n * precio_impresion_lote(n, tarifario)
+    total = base.pop("Resto")
+    total += costo_impresion
+    total += base["Logística"]
+
+    return {
+        "logistica": {
+            "Sitios": base["Sitios"], "Salones": n_salones, "Staff Total": base["Staff Total"],
+            "Jefes de Salón": base["Jefes de Salón"], "Dactiloscopistas": base["Dactiloscopistas"]
+        },
+        "financiero": {
+            "Impresión": costo_impresion, "Personal": base["Personal"],
+            "Insumos": base["Insumos"], "Logística": base["Logística"],
+            "Total": total
+        },
+        "tarifario": tarifario["version"]
+    }
+
+
+def calcular_costo_dataframe(df, col_aspirantes="Aspirantes", col_ciudad="Ciudad", col_tipo="Modalidad",
+                             tarifario=None):
+    """
+    Aplica `calcular_costo_lote` a un DataFrame de escenarios.
+
+    Las columnas de ciudad y modalidad son opcionales (por defecto Bogotá /
+    Escrita). Devuelve el DataFrame original con las columnas de
+    `COLUMNAS_LOGISTICA`, `COLUMNAS_FINANCIERO` y la versión del tarifario.
+    """
+    # Las columnas de texto van como Series: convertirlas a objetos de Python cuesta más que cotizar.
+    ciudad = df[col_ciudad] if col_ciudad in df else "Bogotá"
+    tipo = df[col_tipo] if col_tipo in df else "Escrita"
+    resultado = calcular_costo_lote(df[col_aspirantes].to_numpy(), ciudad, tipo, tarifario)
+    desglose = pd.DataFrame({**resultado["logistica"], **resultado["financiero"]}, index=df.index)
+    desglose[COLUMNA_VERSION] = resultado["tarifario"]
+    return pd.concat([df, desglose], axis=1)
@@ -0,0 +1,111 @@
+"""
+Cotización conjunta de un portafolio de concursos (economías de sitio compartido).
+
+`calcular_costo_parametrico` cotiza cada concurso por separado. Cuando varios
+concursos se aplican el mismo día en la misma ciudad pueden compartir sitios,
+y con ellos lo que depende del sitio:
+
+- compartido por (fecha, ciudad): sitios (`SALONES_POR_SITIO` salones por
+  sitio), delegados, seguridad, transporte y aseo (con su kit), calculados
+  sobre la suma de salones del grupo;
+- propio de cada concurso: salones, jefes de salón, dactiloscopistas,
+  coordinadores de aulas, kits de salón y de dactiloscopia, e impresión (con
+  el tramo de su propio volumen).
+
+Un grupo con un solo concurso cuesta exactamente lo mismo que la cotización
+individual. Todo se calcula con `groupby().ngroup()` y `np.bincount`, sin
+recorrer los grupos en Python, así que miles de concursos se cotizan en
+milisegundos.
+"""
+import numpy as np
+import pandas as pd
+
+from modelo_parametrico import (
+    ASPIRANTES_POR_SALON, SALONES_POR_ASEO, SALONES_POR_COORDINADOR, SALONES_POR_DACTILOSCOPISTA,
+    SALONES_POR_SITIO, SEGURIDAD_POR_SITIO, _como_arreglo_aspirantes, _como_mascara, _techo,
+    calcular_costo_dataframe, factor_ciudad_lote, precio_impresion_lote,
+)
+from tarifario import resolver_tarifario
+
+
+def _codigos_grupo(df, col_fecha, col_ciudad):
+    """Código de grupo (fecha, ciudad); los concursos sin fecha no comparten sitio con nadie."""
+    codigos = df.groupby([col_fecha, col_ciudad], sort=False, dropna=True, observed=True).ngroup()
+    codigos = np.array(codigos.fillna(-1), dtype=np.int64)
+    sueltos = codigos < 0
+    codigos[sueltos] = codigos.max(initial=-1) + 1 + np.arange(sueltos.sum())
+    return codigos
+
+
+def calcular_portafolio(df, col_fecha="Fecha", col_aspirantes="Aspirantes", col_ciudad="Ciudad",
+                        col_tipo="Modalidad", tarifario=None):
+    """
+    Costo conjunto de un lote de concursos agrupados por fecha y ciudad.
+
+    Devuelve un diccionario con:
+    - "concursos": `df` con el desglose individual (`calcular_costo_dataframe`)
+      y las columnas Grupo, Total Conjunto (lo propio más la parte de lo
+      compartido, prorrateada por salones) y Ahorro;
+    - "grupos": una fila por (fecha, ciudad) con concursos, aspirantes,
+      salones, sitios por separado y en conjunto, costos y ahorro;
+    - "costo_separado", "costo_conjunto", "ahorro" y "tarifario".
+    """
+    tarifario = resolver_tarifario(tarifario)
+    precios = tarifario["precio"]
+    individual = calcular_costo_dataframe(df, col_aspirantes, col_ciudad, col_tipo, tarifario)
+
+    n = _como_arreglo_aspirantes(df[col_aspirantes].to_numpy())
+    virtual = _como_mascara(df[col_tipo].to_numpy(), "Virtual") if col_tipo in df else np.zeros(len(df), bool)
+    grupo = _codigos_grupo(df, col_fecha, col_ciudad)
+    n_grupos = int(grupo.max(initial=-1)) + 1
+
+    # Costo propio de cada concurso
+    salones = _techo(n, ASPIRANTES_POR_SALON)
+    dactiloscopistas = _techo(salones, SALONES_POR_DACTILOSCOPISTA)
+    propio = (n * precio_impresion_lote(n, tarifario)
+              + salones * np.where(virtual, 2, 1) * precios['Jefe Salón']
+              + dactiloscopistas * (precios['Dactiloscopista'] + precios['Kit Dactilo'])
+              + _techo(salones, SALONES_POR_COORDINADOR) * precios['Coord. Aulas']
+              + salones * precios['Kit Salón'])
+
+    # Costo compartido por grupo, sobre la suma de salones
+    salones_grupo = np.bincount(grupo, weights=salones, minlength=n_grupos).astype(np.int64)
+    sitios_grupo = _techo(salones_grupo, SALONES_POR_SITIO)
+    primero = np.unique(grupo, return_index=True)[1]
+    factor_grupo = factor_ciudad_lote(df[col_ciudad].to_numpy()[primero], tarifario)
+    compartido = (sitios_grupo * (precios['Delegado'] + SEGURIDAD_POR_SITIO * precios['Seguridad']
+                                  + tarifario["costo_transporte_sitio"] * factor_grupo)
+                  + _techo(salones_grupo, SALONES_POR_ASEO) * (precios['Aseo'] + precios['Kit Aseo']))
+
+    # Prorrateo de lo compartido por salones (los concursos con 0 aspirantes no pagan nada)
+    participacion = np.divide(salones, salones_grupo[grupo], out=np.zeros(len(df)),
+                              where=salones_grupo[grupo] > 0)
+    conjunto = propio + compartido[grupo] * participacion
+
+    concursos = individual.assign(Grupo=grupo, **{"Total Conjunto": conjunto})
+    concursos["Ahorro"] = concursos["Total"] - concursos["Total Conjunto"]
+
+    def suma(valores):
+        return np.bincount(grupo, weights=valores, minlength=n_grupos)
+
+    grupos = pd.DataFrame({
+        col_fecha: df[col_fecha].to_numpy()[primero],
+        col_ciudad: df[col_ciudad].to_numpy()[primero],
+        "Concursos": np.bincount(grupo, minlength=n_grupos),
+        "Aspirantes": suma(n).astype(np.int64),
+        "Salones": salones_grupo,
+        "Sitios Separados": suma(individual["Sitios"].to_numpy()).astype(np.int64),
+        "Sitios Conjuntos": sitios_grupo,
+        "Costo Separado": suma(individual["Total"].to_numpy()),
+        "Costo Conjunto": suma(conjunto),
+    })
+    grupos["Ahorro"] = grupos["Costo Separado"] - grupos["Costo Conjunto"]
+
+    return {
+        "concursos": concursos,
+        "grupos": grupos,
+        "costo_separado": float(grupos["Costo Separado"].sum()),
+        "costo_conjunto": float(grupos["Costo Conjunto"].sum()),
+        "ahorro": float(grupos["Ahorro"].sum()),
+        "tarifario": tarifario["version"],
+    }
@@ -0,0 +1,146 @@
+"""
+Proyección de tarifas a varios años con series de índices (IPC, salario mínimo, ...).
+
+Cada componente del costo se indexa con una serie: el personal con el salario
+mínimo, los kits, la impresión y el transporte con el IPC (configurable con
+`SERIE_POR_COMPONENTE`). El precio del año t es el precio del tarifario base
+por el producto acumulado de (1 + variación) de su serie hasta t, redondeado
+al peso.
+
+Los tramos de impresión y las reglas de logística no cambian con los años,
+así que las cantidades de cada concurso (personas, kits, aspirantes por tramo
+de impresión y sitios × factor de transporte) se calculan una sola vez. El
+costo de todos los concursos en todos los años es entonces un producto de
+matrices: cantidades (concursos × componentes) @ precios (componentes × años).
+"""
+import hashlib
+import json
+
+import numpy as np
+import pandas as pd
+
+from modelo_parametrico import (
+    RECURSOS_INSUMOS, RECURSOS_PERSONAL, _como_arreglo_aspirantes, cantidades_por_recurso, factor_ciudad_lote,
+)
+from tarifario import procesar_tarifario, resolver_tarifario
+
+# Variación anual por defecto de cada serie (supuestos editables desde la interfaz)
+TASAS_DEFECTO = {"IPC": 0.045, "Salario Mínimo": 0.06}
+
+SERIE_POR_COMPONENTE = {
+    **{recurso: "Salario Mínimo" for recurso in RECURSOS_PERSONAL},
+    **{recurso: "IPC" for recurso in RECURSOS_INSUMOS},
+    "Impresión": "IPC",
+    "Transporte": "IPC",
+}
+
+
+def indices_constantes(anio_inicial, anios, tasas=None):
+    """Tabla de variaciones anuales (años × series) con la misma tasa cada año."""
+    tasas = TASAS_DEFECTO if tasas is None else tasas
+    return pd.DataFrame({serie: float(tasa) for serie, tasa in tasas.items()},
+                        index=pd.Index(range(anio_inicial, anio_inicial + anios), name="Año"))
+
+
+def anio_base(tarifario):
+    """Año de vigencia del tarifario (sus precios son los del año base de la proyección)."""
+    return int(str(tarifario["vigente_desde"])[:4] or 0)
+
+
+def _componentes(tarifario):
+    """(nombre, rubro, serie por defecto, precio base) de cada columna de la matriz de cantidades."""
+    componentes = [(r, "Personal", r, p) for r, p in tarifario["precio"].items() if r in RECURSOS_PERSONAL]
+    componentes += [(r, "Insumos", r, p) for r, p in tarifario["precio"].items() if r in RECURSOS_INSUMOS]
+    limites = tarifario["limites_impresion"].tolist()
+    etiquetas = [f"Impresión ≤ {limite:,}" for limite in limites] + [f"Impresión > {limites[-1]:,}" if limites
+                                                                      else "Impresión"]
+    componentes += [(e, "Impresión", "Impresión", int(p))
+                    for e, p in zip(etiquetas, tarifario["precios_impresion"].tolist())]
+    componentes.append(("Transporte", "Logística", "Transporte", tarifario["costo_transporte_sitio"]))
+    return componentes
+
+
+def proyectar_precios(tarifario, indices, serie_por_componente=None):
+    """
+    Precios de cada componente en el año base y en cada año de `indices`.
+
+    `indices` es un DataFrame (años × series) con la variación anual de cada
+    serie (0.05 = 5 %). Devuelve un DataFrame años × componentes.
+    """
+    tarifario = resolver_tarifario(tarifario)
+    serie_por_componente = {**SERIE_POR_COMPONENTE, **(serie_por_componente or {})}
+    indices = indices.sort_index()
+    acumulado = (1 + indices.astype(np.float64)).cumprod()
+    acumulado = pd.concat([pd.DataFrame(1.0, index=[anio_base(tarifario)], columns=indices.columns), acumulado])
+
+    precios = {}
+    for nombre, _, clave, precio in _componentes(tarifario):
+        serie = serie_por_componente.get(clave)
+        if serie not in acumulado:
+            raise KeyError(f"No hay serie de índices '{serie}' para el componente {nombre}")
+        precios[nombre] = np.round(precio * acumulado[serie].to_numpy())
+    return pd.DataFrame(precios, index=pd.Index(acumulado.index, name="Año"))
+
+
+def matriz_cantidades(n_aspirantes, ciudad="Bogotá", tipo_prueba="Escrita", tarifario=None):
+    """Cantidades (concursos × componentes) en el orden de `proyectar_precios`."""
+    tarifario = resolver_tarifario(tarifario)
+    n = _como_arreglo_aspirantes(n_aspirantes)
+    cantidades = cantidades_por_recurso(n, tipo_prueba)
+    tramo = np.searchsorted(tarifario["limites_impresion"], n, side="left")
+    columnas = []
+    n_tramo = 0
+    for nombre, rubro, _, _ in _componentes(tarifario):
+        if rubro == "Impresión":
+            columnas.append(np.where(tramo == n_tramo, n, 0))
+            n_tramo += 1
+        elif rubro == "Logística":
+            columnas.append(cantidades['Delegado'] * factor_ciudad_lote(ciudad, tarifario))
+        else:
+            columnas.append(np.broadcast_to(cantidades[nombre], n.shape))
+    return np.stack(np.broadcast_arrays(*columnas), axis=-1).astype(np.float64)
+
+
+def reprecificar_concursos(df, indices, col_aspirantes="Aspirantes", col_ciudad="Ciudad", col_tipo="Modalidad",
+                           tarifario=None, serie_por_componente=None):
+    """
+    Costo de cada concurso de `df` bajo las tarifas de cada año proyectado.
+
+    Devuelve un diccionario con "costos" (DataFrame concursos × años con el
+    costo total, mismo índice que `df`), "por_rubro" (años × rubros, suma de
+    todos los concursos), "precios" (de `proyectar_precios`) y la versión del
+    tarifario base.
+    """
+    tarifario = resolver_tarifario(tarifario)
+    precios = proyectar_precios(tarifario, indices, serie_por_componente)
+    ciudad = df[col_ciudad].to_numpy() if col_ciudad in df else "Bogotá"
+    tipo = df[col_tipo].to_numpy() if col_tipo in df else "Escrita"
+    cantidades = matriz_cantidades(df[col_aspirantes].to_numpy(), ciudad, tipo, tarifario)
+
+    costos = pd.DataFrame(cantidades @ precios.to_numpy().T, index=df.index, columns=precios.index)
+    rubros = [rubro for _, rubro, _, _ in _componentes(tarifario)]
+    totales = cantidades.sum(axis=0) * precios.to_numpy()
+    por_rubro = pd.DataFrame(totales, index=precios.index, columns=rubros).T.groupby(level=0, sort=False).sum().T
+    por_rubro["Total"] = por_rubro.sum(axis=1)
+    return {"costos": costos, "por_rubro": por_rubro, "precios": precios, "tarifario": tarifario["version"]}
+
+
+def tarifario_proyectado(tarifario, anio, indices, serie_por_componente=None):
+    """Tarifario procesado con los precios proyectados de `anio` (para cotizar con el modelo normal)."""
+    tarifario = resolver_tarifario(tarifario)
+    fila = proyectar_precios(tarifario, indices, serie_por_componente).loc[anio]
+    limites = tarifario["limites_impresion"].tolist()
+    precios_impresion = [int(fila[nombre]) for nombre, rubro, _, _ in _componentes(tarifario) if rubro == "Impresión"]
+    datos = {
+        "version": f"{tarifario['version']}-proy{anio}",
+        "vigente_desde": f"{anio}-01-01",
+        "precios": {r: int(fila[r]) if r in fila else tarifario["precio"][r] for r in tarifario["recursos"]},
+        "impresion": {"tramos": [{"hasta": h, "precio": p} for h, p in zip(limites, precios_impresion)],
+                      "precio_base": precios_impresion[-1]},
+        "transporte": {"costo_sitio": int(fila["Transporte"]),
+                       "factor_defecto": tarifario["factor_ciudad_defecto"],
+                       "factor_ciudad": tarifario["factor_por_ciudad"]},
+    }
+    # Huella propia: las cachés por huella (índice de escalones, ...) no deben devolver precios del año base
+    contenido = json.dumps(datos, sort_keys=True, ensure_ascii=False).encode()
+    return procesar_tarifario(datos, huella=hashlib.sha1(contenido).hexdigest()[:12])
@@ -0,0 +1,191 @@
+"""
+Prueba de carga del servicio de cotizaciones (`servicio_cotizaciones.py`).
+
+Arranca el servicio en un proceso aparte (o usa uno ya levantado con --url),
+lanza varios procesos cliente con conexiones HTTP persistentes que envían
+cotizaciones aleatorias durante un tiempo fijo y reporta cotizaciones por
+segundo, solicitudes por segundo y la latencia por solicitud. Clientes y
+servicio comparten la máquina, así que el resultado incluye el costo del
+cliente; con un solo núcleo todo corre en él.
+
+La medición que decide es la de una cotización por solicitud (--lote 1): sale
+con código 1 si queda por debajo de --minimo. Luego se mide, solo como
+referencia, el rendimiento con lotes de --lote-comparacion cotizaciones por
+solicitud (0 para omitirlo).
+
+Uso:
+    python prueba_carga.py --duracion 10 --clientes 4 --minimo 5000
+    python prueba_carga.py --url http://127.0.0.1:8765 --lote-comparacion 0
+"""
+import argparse
+import http.client
+import json
+import multiprocessing
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import urlsplit
+
+import numpy as np
+
+from modelo_parametrico import CIUDADES, MODALIDADES
+
+MINIMO_COTIZACIONES_SEG = 5_000
+LOTE_COMPARACION = 50
+# Escenarios aleatorios generados por cliente antes de medir; se repiten solo si la prueba los agota
+ESCENARIOS_POR_CLIENTE = 60_000
+
+
+def _puerto_libre():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _esperar_servicio(host, puerto, espera=15.0):
+    limite = time.monotonic() + espera
+    while time.monotonic() < limite:
+        try:
+            conexion = http.client.HTTPConnection(host, puerto, timeout=1)
+            conexion.request("GET", "/salud")
+            if conexion.getresponse().status == 200:
+                conexion.close()
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"El servicio no respondió en {host}:{puerto}")
+
+
+def _solicitudes(rng, n, lote, max_aspirantes, host):
+    """`n` solicitudes POST /cotizar ya serializadas, con escenarios aleatorios."""
+    solicitudes = []
+    for _ in range(n):
+        escenarios = [{"aspirantes": rng.randint(1, max_aspirantes), "ciudad": rng.choice(CIUDADES),
+                       "modalidad": rng.choice(MODALIDADES)} for _ in range(lote)]
+        cuerpo = json.dumps(escenarios[0] if lote == 1 else {"cotizaciones": escenarios}).encode()
+        solicitudes.append(b"POST /cotizar HTTP/1.1\r\nHost: %s\r\nContent-Type: application/json\r\n"
+                           b"Content-Length: %d\r\n\r\n%s" % (host.encode(), len(cuerpo), cuerpo))
+    return solicitudes
+
+
+def _leer_respuesta(conexion, buffer):
+    """Lee una respuesta HTTP completa; devuelve (estado, cuerpo, bytes sobrantes)."""
+    while True:
+        fin = buffer.find(b"\r\n\r\n")
+        if fin >= 0:
+            cabeceras = buffer[:fin].split(b"\r\n")
+            largo = next(int(linea.split(b":", 1)[1]) for linea in cabeceras[1:]
+                         if linea[:15].lower() == b"content-length:")
+            if len(buffer) >= fin + 4 + largo:
+                return int(cabeceras[0].split(b" ", 2)[1]), buffer[fin + 4:fin + 4 + largo], buffer[fin + 4 + largo:]
+        datos = conexion.recv(1 << 16)
+        if not datos:
+            raise RuntimeError("El servicio cerró la conexión.")
+        buffer += datos
+
+
+def cliente(host, puerto, duracion, lote, max_aspirantes, semilla, barrera):
+    """
+    Envía solicitudes durante `duracion` segundos por una conexión persistente.
+
+    Devuelve (cotizaciones, latencias, segundos medidos). Usa un socket directo
+    y solicitudes generadas antes de medir, en lugar de http.client: en una sola
+    máquina el cliente compite por CPU con el servicio, y http.client por sí
+    solo no pasa de unas 5 mil solicitudes por segundo por núcleo. Todos los
+    clientes empiezan a medir a la vez, al cruzar `barrera`.
+    """
+    solicitudes = _solicitudes(random.Random(semilla), max(ESCENARIOS_POR_CLIENTE // lote, 1), lote,
+                               max_aspirantes, host)
+    conexion = socket.create_connection((host, puerto), timeout=30)
+    conexion.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    cotizaciones, latencias, buffer = 0, [], b""
+    barrera.wait()
+    comienzo = time.perf_counter()
+    fin = comienzo + duracion
+    while time.perf_counter() < fin:
+        inicio = time.perf_counter()
+        conexion.sendall(solicitudes[len(latencias) % len(solicitudes)])
+        estado, datos, buffer = _leer_respuesta(conexion, buffer)
+        latencias.append(time.perf_counter() - inicio)
+        if estado != 200:
+            raise RuntimeError(f"Respuesta {estado}: {datos[:200]!r}")
+        cotizaciones += lote
+    transcurrido = time.perf_counter() - comienzo
+    conexion.close()
+    return cotizaciones, latencias, transcurrido
+
+
+def prueba_carga(host, puerto, duracion=10.0, clientes=4, lote=50, max_aspirantes=100_000):
+    """Ejecuta la carga y devuelve un diccionario con el rendimiento medido."""
+    with multiprocessing.Manager() as gestor, ProcessPoolExecutor(max_workers=clientes) as pool:
+        barrera = gestor.Barrier(clientes)
+        futuros = [pool.submit(cliente, host, puerto, duracion, lote, max_aspirantes, semilla, barrera)
+                   for semilla in range(clientes)]
+        resultados = [f.result() for f in futuros]
+    transcurrido = max(r[2] for r in resultados)
+
+    cotizaciones = sum(r[0] for r in resultados)
+    latencias = np.concatenate([r[1] for r in resultados]) * 1e3
+    return {
+        "clientes": clientes, "lote": lote, "segundos": round(transcurrido, 2),
+        "cotizaciones": cotizaciones, "solicitudes": len(latencias),
+        "cotizaciones_seg": round(cotizaciones / transcurrido, 1),
+        "solicitudes_seg": round(len(latencias) / transcurrido, 1),
+        "latencia_p50_ms": round(float(np.percentile(latencias, 50)), 3),
+        "latencia_p99_ms": round(float(np.percentile(latencias, 99)), 3),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Prueba de carga del servicio de cotizaciones ESAP.")
+    parser.add_argument("--url", default=None, help="Servicio ya levantado (por defecto se arranca uno local)")
+    parser.add_argument("--duracion", type=float, default=10.0, help="Segundos de carga")
+    parser.add_argument("--clientes", type=int, default=4, help="Procesos cliente (una conexión cada uno)")
+    parser.add_argument("--lote", type=int, default=1,
+                        help="Cotizaciones por solicitud en la medición que decide (1 = una por solicitud)")
+    parser.add_argument("--lote-comparacion", type=int, default=LOTE_COMPARACION,
+                        help="Cotizaciones por solicitud de la medición de referencia con lotes (0 = omitir)")
+    parser.add_argument("--max-aspirantes", type=int, default=100_000)
+    parser.add_argument("--procesos", type=int, default=None,
+                        help="Procesos del servicio local (por defecto, los del servicio: uno por núcleo)")
+    parser.add_argument("--minimo", type=float, default=MINIMO_COTIZACIONES_SEG,
+                        help="Cotizaciones por segundo exigidas a la medición con --lote")
+    args = parser.parse_args(argv)
+
+    servicio = None
+    if args.url:
+        url = urlsplit(args.url)
+        host, puerto = url.hostname, url.port or 80
+    else:
+        host, puerto = "127.0.0.1", _puerto_libre()
+        servicio = subprocess.Popen(
+            [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "servicio_cotizaciones.py"),
+             "--host", host, "--puerto", str(puerto)]
+            + (["--procesos", str(args.procesos)] if args.procesos else []),
+            stdout=subprocess.DEVNULL)
+    try:
+        _esperar_servicio(host, puerto)
+        resultado = prueba_carga(host, puerto, args.duracion, args.clientes, args.lote, args.max_aspirantes)
+        if args.lote_comparacion and args.lote_comparacion != args.lote:
+            resultado["comparacion_lotes"] = prueba_carga(host, puerto, args.duracion, args.clientes,
+                                                          args.lote_comparacion, args.max_aspirantes)
+        conexion = http.client.HTTPConnection(host, puerto, timeout=5)
+        conexion.request("GET", "/salud")
+        resultado["cache"] = json.loads(conexion.getresponse().read())["cache"]
+    finally:
+        if servicio is not None:
+            servicio.terminate()
+            servicio.wait()
+
+    resultado["minimo"] = args.minimo
+    resultado["aprobado"] = resultado["cotizaciones_seg"] >= args.minimo
+    print(json.dumps(resultado, indent=2, ensure_ascii=False))
+    return 0 if resultado["aprobado"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+"""
+Red de transporte entre centros de despacho y ciudades de aplicación.
+
+La red es un archivo JSON con los nodos (ciudades), los centros desde los que
+se despacha el material y las aristas terrestres o aéreas con su costo por
+sitio en COP:
+
+    {"centros": ["Bogotá", "Medellín"],
+     "aristas": [{"origen": "Bogotá", "destino": "Cali", "costo": 42000, "modo": "terrestre"}, ...]}
+
+Los costos de la ruta más barata entre todos los pares de nodos se calculan
+una sola vez (Floyd–Warshall vectorizado, O(V³)) y se guardan en la carpeta
+de caché con la huella del archivo en el nombre, así que las cargas
+siguientes solo leen la matriz. El costo de despacho de una ciudad es la ruta
+más barata desde cualquier centro; el tarifario lo convierte en el factor de
+transporte de la ciudad, con lo que el modelo sigue resolviendo el
+transporte con una búsqueda O(1) por ciudad y los lotes siguen vectorizados.
+"""
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+_CARPETA = os.path.dirname(os.path.abspath(__file__))
+RUTA_CACHE_RED = os.environ.get("ESAP_CACHE_RED", os.path.join(_CARPETA, ".cache_red"))
+
+
+def leer_red(datos):
+    """Valida el JSON de una red y devuelve (nodos, centros, origen, destino, costo, dirigida)."""
+    try:
+        aristas = datos["aristas"]
+        centros = [str(c) for c in datos["centros"]]
+        origen = [str(a["origen"]) for a in aristas]
+        destino = [str(a["destino"]) for a in aristas]
+        costo = np.array([a["costo"] for a in aristas], dtype=np.float64)
+    except (KeyError, TypeError) as e:
+        raise ValueError(f"Red de transporte inválida: falta o sobra el campo {e}") from e
+    if np.any(costo < 0) or not np.all(np.isfinite(costo)):
+        raise ValueError("Los costos de las aristas deben ser finitos y no negativos.")
+
+    nodos = list(dict.fromkeys([*centros, *origen, *destino, *datos.get("nodos", [])]))
+    if not centros:
+        raise ValueError("La red de transporte necesita al menos un centro de despacho.")
+    return nodos, centros, origen, destino, costo, bool(datos.get("dirigida", False))
+
+
+def distancias_minimas(n_nodos, origen, destino, costo, dirigida=False):
+    """Matriz n × n con el costo de la ruta más barata entre cada par (inf si no hay ruta)."""
+    distancias = np.full((n_nodos, n_nodos), np.inf)
+    np.fill_diagonal(distancias, 0.0)
+    origen, destino = np.asarray(origen, dtype=np.int64), np.asarray(destino, dtype=np.int64)
+    np.minimum.at(distancias, (origen, destino), costo)
+    if not dirigida:
+        np.minimum.at(distancias, (destino, origen), costo)
+    for k in range(n_nodos):
+        np.minimum(distancias, distancias[:, k, None] + distancias[None, k, :], out=distancias)
+    return distancias
+
+
+def cargar_red(ruta):
+    """
+    Red de `ruta` con sus distancias mínimas, leídas de la caché si el archivo no cambió.
+
+    Devuelve un diccionario con "nodos", "centros", "distancias" (nodos ×
+    nodos), "despacho" (costo desde el centro más barato, por nodo), "centro"
+    (índice en "centros" del que despacha cada nodo) y "huella".
+    """
+    with open(ruta, "rb") as f:
+        contenido = f.read()
+    huella = hashlib.sha1(contenido).hexdigest()[:12]
+    nodos, centros, origen, destino, costo, dirigida = leer_red(json.loads(contenido))
+
+    cache = os.path.join(RUTA_CACHE_RED, f"red-{huella}.npz")
+    if os.path.exists(cache):
+        with np.load(cache) as guardado:
+            distancias = guardado["distancias"]
+    else:
+        indice = {nodo: i for i, nodo in enumerate(nodos)}
+        distancias = distancias_minimas(len(nodos), [indice[o] for o in origen], [indice[d] for d in destino],
+                                        costo, dirigida)
+        os.makedirs(RUTA_CACHE_RED, exist_ok=True)
+        temporal = cache + ".tmp"
+        with open(temporal, "wb") as f:
+            np.savez(f, distancias=distancias)
+        os.replace(temporal, cache)
+
+    desde_centros = distancias[[nodos.index(c) for c in centros]]
+    return {
+        "nodos": nodos, "centros": centros, "distancias": distancias,
+        "despacho": desde_centros.min(axis=0), "centro": desde_centros.argmin(axis=0), "huella": huella,
+    }
+
+
+def factores_red(red, costo_sitio):
+    """Factor de transporte de cada ciudad alcanzable: (costo por sitio + despacho) / costo por sitio."""
+    alcanzable = np.isfinite(red["despacho"])
+    factores = (costo_sitio + red["despacho"][alcanzable]) / costo_sitio
+    return dict(zip(np.asarray(red["nodos"])[alcanzable].tolist(), factores.tolist()))
+
+
+def tabla_despacho(red, costo_sitio):
+    """DataFrame con el centro que despacha cada ciudad, el costo de la ruta y el factor resultante."""
+    tabla = pd.DataFrame({
+        "Ciudad": red["nodos"],
+        "Centro": np.asarray(red["centros"])[red["centro"]],
+        "Costo Despacho": red["despacho"],
+    })
+    tabla["Factor Transporte"] = (costo_sitio + tabla["Costo Despacho"]) / costo_sitio
+    tabla.loc[~np.isfinite(tabla["Costo Despacho"]), "Centro"] = None
+    return tabla.sort_values(["Costo Despacho", "Ciudad"], ignore_index=True)
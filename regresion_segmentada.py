@@ -0,0 +1,175 @@
+"""
+Regresión lineal segmentada (por tramos) para el histórico de costos ESAP.
+
+El costo es escalonado: cambia de nivel al abrir sitios y de pendiente al
+cambiar de tramo de impresión. En lugar de una sola recta OLS, este módulo
+aprende los puntos de corte desde los datos:
+
+1. Los cortes candidatos se restringen a una rejilla de cuantiles de N
+   (a lo sumo `max_candidatos` posiciones). Los cortes conocidos de
+   antemano (los tramos de impresión del tarifario) se agregan a la rejilla
+   y toda segmentación los incluye: en ellos el escalón de un sitio nuevo y
+   la baja del precio de impresión casi se cancelan, así que el quiebre es
+   demasiado leve para que el ajuste lo encuentre por sí solo.
+2. Con sumas acumuladas, el error cuadrático de la recta óptima de cualquier
+   segmento se obtiene en O(1), así que la matriz de costos de todos los
+   segmentos candidatos es una operación vectorizada.
+3. Programación dinámica sobre esa matriz da la segmentación óptima con
+   k = 1..`max_segmentos` tramos en O(k · m²); k se elige por BIC.
+4. Cada corte aprendido se refina a la resolución de los datos entre sus
+   candidatos vecinos, con los demás cortes fijos.
+
+Los tramos no tienen que empalmar: un escalón es un salto, no un quiebre.
+"""
+import numpy as np
+
+
+def _sumas_acumuladas(x, y):
+    """Sumas acumuladas de 1, x, y, x², xy, y² (con un cero inicial)."""
+    columnas = np.stack([np.ones_like(x), x, y, x * x, x * y, y * y])
+    return np.concatenate([np.zeros((6, 1)), np.cumsum(columnas, axis=1)], axis=1)
+
+
+def _sse_segmentos(acumuladas, inicio, fin):
+    """
+    Error cuadrático de la recta de mínimos cuadrados sobre los puntos [inicio, fin).
+
+    `inicio` y `fin` pueden ser arreglos (se difunden entre sí).
+    """
+    inicio, fin = np.broadcast_arrays(inicio, fin)
+    n, sx, sy, sxx, sxy, syy = acumuladas[:, fin] - acumuladas[:, inicio]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        vxx = sxx - sx * sx / n
+        vxy = sxy - sx * sy / n
+        vyy = syy - sy * sy / n
+        sse = vyy - np.where(vxx > 0, vxy * vxy / vxx, 0.0)
+    return np.maximum(sse, 0.0)
+
+
+def _recta(x, y):
+    if len(x) < 2 or np.ptp(x) == 0:
+        return float(np.mean(y)), 0.0
+    pendiente, intercepto = np.polyfit(x, y, 1)
+    return float(intercepto), float(pendiente)
+
+
+def _indices_conocidos(x, cortes_conocidos, min_puntos):
+    """Índice donde empieza cada corte conocido dentro de los datos, con al menos `min_puntos` por tramo."""
+    n = len(x)
+    indices = []
+    for i in np.unique(np.searchsorted(x, np.asarray(cortes_conocidos, dtype=np.float64), side="left")):
+        if i - (indices[-1] if indices else 0) >= min_puntos and n - i >= min_puntos:
+            indices.append(int(i))
+    return np.array(indices, dtype=np.int64)
+
+
+def ajustar_segmentada(x, y, max_segmentos=None, min_puntos=5, max_candidatos=400, cortes_conocidos=()):
+    """
+    Ajusta una regresión lineal por tramos con cortes aprendidos.
+
+    `cortes_conocidos` son valores de x donde se sabe que empieza un tramo
+    (p. ej. los límites de impresión del tarifario + 1); los que caen dentro
+    de los datos se incluyen siempre. `max_segmentos` (por defecto 12 más uno
+    por corte conocido) acota los tramos que se consideran al elegir por BIC.
+
+    Devuelve un diccionario con "cortes" (valores de x donde empieza cada tramo
+    después del primero), "segmentos" (lista de dicts con desde, hasta,
+    intercepto y pendiente), "n_segmentos", "sse", "r2" y "bic".
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    orden = np.argsort(x, kind="stable")
+    x, y = x[orden], y[orden]
+    n = len(x)
+    conocidos = _indices_conocidos(x, cortes_conocidos, min_puntos)
+    if max_segmentos is None:
+        max_segmentos = 12 + len(conocidos)
+    max_segmentos = max(1, min(max_segmentos, n // min_puntos))
+
+    # Fronteras candidatas: índices donde empieza un valor de x distinto, submuestreados por cuantiles
+    inicios_valor = np.flatnonzero(np.r_[True, np.diff(x) > 0])
+    candidatas = inicios_valor[1:]
+    if len(candidatas) > max_candidatos:
+        candidatas = candidatas[np.linspace(0, len(candidatas) - 1, max_candidatos).astype(int)]
+    fronteras = np.unique(np.r_[0, candidatas, conocidos, n])
+    m = len(fronteras)
+
+    # Se trabaja con x, y estandarizados para que las sumas acumuladas no pierdan precisión
+    xs = (x - x.mean()) / (x.std() or 1.0)
+    ys = (y - y.mean()) / (y.std() or 1.0)
+    acumuladas = _sumas_acumuladas(xs, ys)
+    costo = _sse_segmentos(acumuladas, fronteras[:, None], fronteras[None, :])
+    tamanos = fronteras[None, :] - fronteras[:, None]
+    costo[tamanos < min_puntos] = np.inf
+    # Ningún tramo puede cruzar un corte conocido
+    antes = np.searchsorted(conocidos, fronteras, side="left")
+    hasta = np.searchsorted(conocidos, fronteras, side="right")
+    costo[antes[None, :] - hasta[:, None] > 0] = np.inf
+
+    # DP: mejor[k, b] = menor SSE cubriendo los puntos [0, fronteras[b]) con k+1 tramos
+    mejor = np.full((max_segmentos, m), np.inf)
+    previo = np.zeros((max_segmentos, m), dtype=np.int64)
+    mejor[0] = costo[0]
+    for k in range(1, max_segmentos):
+        total = mejor[k - 1][:, None] + costo
+        previo[k] = np.argmin(total, axis=0)
+        mejor[k] = total[previo[k], np.arange(m)]
+
+    # Selección del número de tramos por BIC (3 parámetros por tramo: nivel, pendiente y corte)
+    sse_k = np.maximum(mejor[:, -1], 1e-12 * n)
+    k_tramos = np.arange(1, max_segmentos + 1)
+    bic = np.where(np.isfinite(mejor[:, -1]), n * np.log(sse_k / n) + (3 * k_tramos - 1) * np.log(n), np.inf)
+    k = int(np.argmin(bic))
+
+    cortes = []
+    b = m - 1
+    for nivel in range(k, 0, -1):
+        b = previo[nivel, b]
+        cortes.append(int(fronteras[b]))
+    cortes = cortes[::-1]
+
+    cortes = _refinar_cortes(acumuladas, x, cortes, inicios_valor, min_puntos, fijos=set(conocidos.tolist()))
+    limites = [0] + cortes + [n]
+    segmentos = []
+    for a, b in zip(limites[:-1], limites[1:]):
+        intercepto, pendiente = _recta(x[a:b], y[a:b])
+        segmentos.append({"desde": float(x[a]), "hasta": float(x[b - 1]),
+                          "intercepto": intercepto, "pendiente": pendiente})
+
+    sse = float(np.sum((y - predecir_segmentada({"cortes": [float(x[c]) for c in cortes],
+                                                 "segmentos": segmentos}, x)) ** 2))
+    sst = float(np.sum((y - y.mean()) ** 2))
+    return {
+        "cortes": [float(x[c]) for c in cortes],
+        "segmentos": segmentos,
+        "n_segmentos": len(segmentos),
+        "sse": sse,
+        "r2": 1 - sse / sst if sst > 0 else 1.0,
+        "bic": float(n * np.log(max(sse, 1e-300) / n) + (3 * len(segmentos) - 1) * np.log(n)),
+    }
+
+
+def _refinar_cortes(acumuladas, x, cortes, inicios_valor, min_puntos, fijos=()):
+    """Mueve cada corte no fijo al mejor índice entre sus cortes vecinos (solo inicios de valores distintos)."""
+    n = len(x)
+    cortes = list(cortes)
+    for i in range(len(cortes)):
+        if cortes[i] in fijos:
+            continue
+        izquierda = cortes[i - 1] if i > 0 else 0
+        derecha = cortes[i + 1] if i + 1 < len(cortes) else n
+        opciones = inicios_valor[(inicios_valor >= izquierda + min_puntos) & (inicios_valor <= derecha - min_puntos)]
+        if len(opciones) == 0:
+            continue
+        sse = _sse_segmentos(acumuladas, izquierda, opciones) + _sse_segmentos(acumuladas, opciones, derecha)
+        cortes[i] = int(opciones[np.argmin(sse)])
+    return cortes
+
+
+def predecir_segmentada(modelo, x):
+    """Evalúa la curva ajustada en `x` (escalar o arreglo)."""
+    x = np.asarray(x, dtype=np.float64)
+    tramo = np.searchsorted(np.asarray(modelo["cortes"]), x, side="right")
+    intercepto = np.array([s["intercepto"] for s in modelo["segmentos"]])[tramo]
+    pendiente = np.array([s["pendiente"] for s in modelo["segmentos"]])[tramo]
+    return intercepto + pendiente * x
@@ -0,0 +1,162 @@
+"""
+Compilador de rúbricas compartido por las aplicaciones de calificación.
+
+Cada aplicación define su rúbrica con un esquema propio de diccionarios
+anidados. `compilar_rubrica` los convierte una sola vez en un índice plano de
+criterios con arreglos de NumPy (sección de cada criterio, peso, escala), y
+`calificar` puntúa cualquier número de evaluaciones a la vez:
+
+- Esquemas de suma ponderada (RUBRIC_DATA por componentes, rubric_data con
+  ponderaciones, RUBRIC_DATA plano de UCompensar, rubrica_data_r3 por
+  puntos): los puntajes sin calificar cuentan como 0 y la nota es un único
+  producto punto puntajes @ pesos.
+- Esquemas de promedio por sección (rubrica_data por niveles y las
+  secciones de criterios_seccionN con `pesos`): cada sección promedia solo
+  los criterios calificados (NaN = sin calificar o N/A), con dos productos
+  matriciales contra la matriz de pertenencia criterio × sección; el esquema
+  por niveles además renormaliza por el peso de las secciones activas.
+
+Los resultados son los mismos que los de los cálculos originales de cada
+aplicación (`calculate_results`, `calcular_resultados_nr2`,
+`calcular_resultados_r3`, `calcular_promedio_seccion`, ...).
+"""
+import numpy as np
+
+# Escala de los sliders en los esquemas que no la declaran con niveles numéricos
+ESCALA_SLIDER = 5.0
+
+
+def _esquema(rubrica, pesos):
+    primera = next(iter(rubrica.values()))
+    if pesos is not None:
+        return "secciones"
+    if "criteria" in primera:
+        return "componentes"
+    if "ponderacion_total" in primera:
+        return "ponderaciones"
+    if "puntos_componente" in primera:
+        return "puntos"
+    if "peso" in primera and "criterios" in primera:
+        return "niveles"
+    if "weight" in primera and "levels" in primera:
+        return "plano"
+    raise ValueError(f"Esquema de rúbrica desconocido (claves: {sorted(primera)})")
+
+
+def _criterios(rubrica, esquema, pesos):
+    """Filas (sección, criterio, peso del criterio, escala) y (sección, peso de sección) según el esquema."""
+    filas, secciones = [], []
+    for seccion, datos in rubrica.items():
+        if esquema == "componentes":
+            secciones.append((seccion, datos["weight"]))
+            filas += [(seccion, c["id"], c["weight"] / ESCALA_SLIDER, ESCALA_SLIDER) for c in datos["criteria"]]
+        elif esquema == "ponderaciones":
+            secciones.append((seccion, datos["ponderacion_total"]))
+            filas += [(seccion, nombre, c["ponderacion"], ESCALA_SLIDER) for nombre, c in datos["criterios"].items()]
+        elif esquema == "puntos":
+            secciones.append((seccion, datos["puntos_componente"]))
+            peso = datos["puntos_componente"] / datos["max_raw_score"] if datos["max_raw_score"] > 0 else 0.0
+            filas += [(seccion, nombre, peso, max(c["niveles"])) for nombre, c in datos["criterios"].items()]
+        elif esquema == "niveles":
+            secciones.append((seccion, datos["peso"]))
+            filas += [(seccion, nombre, np.nan, max(c["niveles"])) for nombre, c in datos["criterios"].items()]
+        elif esquema == "plano":
+            # Una sola sección por criterio: el peso (fracción) se lleva a puntos sobre 100
+            secciones.append((seccion, datos["weight"]))
+            filas.append((seccion, seccion, datos["weight"] * 100 / max(datos["levels"]), max(datos["levels"])))
+        else:
+            secciones.append((seccion, pesos[seccion]))
+            filas += [(seccion, nombre, np.nan, 100.0) for nombre in datos]
+    return filas, secciones
+
+
+def compilar_rubrica(rubrica, pesos=None):
+    """
+    Compila una rúbrica de cualquiera de los esquemas de las aplicaciones.
+
+    `pesos` solo se usa con el esquema de secciones de criterios sueltos
+    (Rubrica_Non_Par.py): `rubrica` es {sección: criterios_seccionN} y
+    `pesos` el peso de cada sección. Devuelve un diccionario con "secciones",
+    "criterios" (pares (sección, criterio) en orden), "pertenencia"
+    (criterios × secciones), "peso", "escala", "peso_seccion", "promediar",
+    "renormalizar" y "factor" (de la suma ponderada a la nota final).
+    """
+    esquema = _esquema(rubrica, pesos)
+    filas, secciones = _criterios(rubrica, esquema, pesos)
+    nombres_seccion = [s for s, _ in secciones]
+    seccion_de = np.array([nombres_seccion.index(f[0]) for f in filas], dtype=np.int64)
+    pertenencia = np.zeros((len(filas), len(secciones)))
+    pertenencia[np.arange(len(filas)), seccion_de] = 1.0
+    escala = np.array([f[3] for f in filas], dtype=np.float64)
+    return {
+        "esquema": esquema,
+        "secciones": nombres_seccion,
+        "criterios": [(f[0], f[1]) for f in filas],
+        "seccion_de": seccion_de,
+        "pertenencia": pertenencia,
+        "peso": np.array([f[2] for f in filas], dtype=np.float64),
+        "escala": escala,
+        "escala_seccion": np.bincount(seccion_de, weights=escala, minlength=len(secciones))
+                          / np.maximum(pertenencia.sum(axis=0), 1),
+        "peso_seccion": np.array([p for _, p in secciones], dtype=np.float64),
+        "promediar": esquema in ("niveles", "secciones"),
+        "renormalizar": esquema == "niveles",
+        # Componentes: la suma está sobre 100 y la nota sobre 5; promedios: el rendimiento 0-1 se lleva a 100
+        "factor": {"componentes": ESCALA_SLIDER / 100, "niveles": 100.0, "secciones": 100.0}.get(esquema, 1.0),
+    }
+
+
+def vector_puntajes(compilada, puntajes):
+    """
+    Vector de puntajes en el orden de la rúbrica compilada (NaN = sin calificar).
+
+    `puntajes` puede estar indexado por criterio ({"A1": 4.2}) o por sección
+    y criterio ({"Sección": {"Criterio": 3}}); None cuenta como sin calificar.
+    """
+    valores = []
+    for seccion, criterio in compilada["criterios"]:
+        anidado = puntajes.get(seccion)
+        valor = anidado.get(criterio) if isinstance(anidado, dict) else puntajes.get(criterio)
+        valores.append(np.nan if valor is None else valor)
+    return np.array(valores, dtype=np.float64)
+
+
+def calificar(compilada, puntajes, secciones_activas=None):
+    """
+    Califica una evaluación (vector de criterios) o un lote (evaluaciones × criterios).
+
+    `secciones_activas` (booleano por sección, o evaluaciones × secciones)
+    excluye secciones opcionales en los esquemas de promedio. Devuelve un
+    diccionario con "final" (nota en la escala de la aplicación), "total"
+    (la suma ponderada antes de `factor`), "secciones" (aporte de cada
+    sección al total) y "sumas" (puntos sin ponderar por sección); los
+    esquemas de suma agregan "aportes" por criterio y los de promedio,
+    "promedios" y "calificados" por sección. Con un vector de entrada los
+    resultados son escalares / vectores en lugar de lotes.
+    """
+    matriz = np.atleast_2d(np.asarray(puntajes, dtype=np.float64))
+    calificado = ~np.isnan(matriz)
+    llenos = np.where(calificado, matriz, 0.0)
+    suma = llenos @ compilada["pertenencia"]
+
+    if not compilada["promediar"]:
+        aportes = llenos * compilada["peso"]
+        total = llenos @ compilada["peso"]
+        resultado = {"aportes": aportes, "secciones": aportes @ compilada["pertenencia"], "sumas": suma}
+    else:
+        activas = np.ones(len(compilada["secciones"]), dtype=bool) if secciones_activas is None \
+            else np.asarray(secciones_activas, dtype=bool)
+        n_calificados = calificado @ compilada["pertenencia"]
+        promedios = np.divide(suma, n_calificados, out=np.zeros_like(suma), where=n_calificados > 0)
+        secciones = promedios / compilada["escala_seccion"] * compilada["peso_seccion"] * activas
+        total = secciones.sum(axis=1)
+        if compilada["renormalizar"]:
+            peso_activo = np.broadcast_to(compilada["peso_seccion"] * activas, secciones.shape).sum(axis=1)
+            total = np.divide(total, peso_activo, out=np.zeros_like(total), where=peso_activo > 0)
+        resultado = {"promedios": promedios, "secciones": secciones, "sumas": suma, "calificados": n_calificados}
+
+    resultado["total"] = total
+    resultado["final"] = total * compilada["factor"]
+    if np.ndim(puntajes) == 1:
+        resultado = {clave: valor[0] for clave, valor in resultado.items()}
+    return resultado
@@ -0,0 +1,116 @@
+"""
+Análisis de sensibilidad de tarifas del modelo paramétrico ESAP.
+
+El costo total es lineal en cada tarifa: Total = Σ cantidad_i · tarifa_i, donde
+los "insumos" son los recursos del tarifario, cada tramo de impresión y la
+tarifa base de transporte. Por eso perturbar una tarifa en ±δ cambia el total
+exactamente en ±δ · contribución_i, y la elasticidad del total respecto a esa
+tarifa es contribución_i / Total.
+
+Este módulo calcula todas las contribuciones sobre la grilla completa
+aspirantes × ciudad × modalidad en un solo paso vectorizado y de ahí obtiene
+el tornado (impacto medio de ±δ) y las curvas de elasticidad por N.
+"""
+import numpy as np
+import pandas as pd
+
+from modelo_parametrico import (
+    ASPIRANTES_POR_SITIO, CIUDADES, MODALIDADES, _como_arreglo_aspirantes, _techo,
+    cantidades_por_recurso, factor_ciudad_lote,
+)
+from tarifario import resolver_tarifario
+
+INSUMO_TRANSPORTE = "Transporte base"
+
+
+def _nombres_tramos(tarifario):
+    nombres, inicio = [], 1
+    for limite, _ in tarifario["tramos_impresion"]:
+        nombres.append(f"Impresión {inicio}-{limite}")
+        inicio = limite + 1
+    nombres.append(f"Impresión >{inicio - 1}")
+    return nombres
+
+
+def contribuciones_grilla(n_aspirantes=None, ciudades=None, modalidades=None, tarifario=None):
+    """
+    Contribución de cada insumo al costo total sobre la grilla completa.
+
+    Devuelve un diccionario con los ejes ("aspirantes", "ciudades",
+    "modalidades", "insumos"), el arreglo "contribucion" de forma
+    (ciudad, modalidad, aspirantes, insumo), el "total" de forma
+    (ciudad, modalidad, aspirantes) y la versión del tarifario.
+    """
+    tarifario = resolver_tarifario(tarifario)
+    n = _como_arreglo_aspirantes(np.arange(1, 20_001) if n_aspirantes is None else n_aspirantes)
+    ciudades = list(CIUDADES if ciudades is None else ciudades)
+    modalidades = list(MODALIDADES if modalidades is None else modalidades)
+
+    recursos = list(tarifario["recursos"])
+    tramos = _nombres_tramos(tarifario)
+    insumos = recursos + tramos + [INSUMO_TRANSPORTE]
+
+    # Cantidades por modalidad (las ciudades solo cambian el factor de transporte)
+    por_modalidad = []
+    for modalidad in modalidades:
+        cantidades = cantidades_por_recurso(n, modalidad)
+        por_modalidad.append(np.stack([cantidades[r] * tarifario["precio"][r] for r in recursos], axis=-1))
+    recursos_mn = np.stack(por_modalidad)                                   # (m, N, recursos)
+
+    tramo = np.searchsorted(tarifario["limites_impresion"], n, side="left")
+    impresion = np.zeros((len(n), len(tramos)))
+    impresion[np.arange(len(n)), tramo] = n * tarifario["precios_impresion"][tramo]
+
+    sitios = _techo(n, ASPIRANTES_POR_SITIO)
+    factores = factor_ciudad_lote(np.array(ciudades), tarifario)
+    transporte = tarifario["costo_transporte_sitio"] * sitios[None, :] * factores[:, None]    # (c, N)
+
+    forma = (len(ciudades), len(modalidades), len(n))
+    contribucion = np.empty(forma + (len(insumos),))
+    contribucion[..., :len(recursos)] = recursos_mn[None]
+    contribucion[..., len(recursos):-1] = impresion[None, None]
+    contribucion[..., -1] = transporte[:, None, :]
+
+    return {
+        "aspirantes": n, "ciudades": ciudades, "modalidades": modalidades, "insumos": insumos,
+        "contribucion": contribucion, "total": contribucion.sum(axis=-1),
+        "tarifario": tarifario["version"],
+    }
+
+
+def tornado(grilla, variacion=0.10):
+    """
+    Impacto de variar cada insumo en ±`variacion` sobre el costo total.
+
+    Resume toda la grilla: el impacto medio (y máximo) en % del total y la
+    elasticidad media. Ordenado de mayor a menor impacto, listo para graficar.
+    """
+    elasticidad = grilla["contribucion"] / grilla["total"][..., None]
+    ejes = tuple(range(elasticidad.ndim - 1))
+    media = elasticidad.mean(axis=ejes)
+    df = pd.DataFrame({
+        "Insumo": grilla["insumos"],
+        "Impacto -%": -100 * variacion * media,
+        "Impacto +%": 100 * variacion * media,
+        "Impacto máx +%": 100 * variacion * elasticidad.max(axis=ejes),
+        "Elasticidad media": media,
+        "Costo medio aportado": grilla["contribucion"].mean(axis=ejes),
+    })
+    return df.sort_values("Impacto +%", ascending=False, ignore_index=True)
+
+
+def curvas_elasticidad(grilla, ciudad, modalidad, max_puntos=500):
+    """
+    Elasticidad de cada insumo en función de N para una ciudad y modalidad.
+
+    Formato largo (Aspirantes, Insumo, Elasticidad), muestreado a lo sumo en
+    `max_puntos` valores de N para graficar.
+    """
+    i = grilla["ciudades"].index(ciudad)
+    j = grilla["modalidades"].index(modalidad)
+    paso = max(1, len(grilla["aspirantes"]) // max_puntos)
+    n = grilla["aspirantes"][::paso]
+    elasticidad = grilla["contribucion"][i, j, ::paso] / grilla["total"][i, j, ::paso, None]
+    df = pd.DataFrame(elasticidad, columns=grilla["insumos"])
+    df.insert(0, "Aspirantes", n)
+    return df.melt(id_vars="Aspirantes", var_name="Insumo", value_name="Elasticidad")
@@ -0,0 +1,394 @@
+"""
+Servicio HTTP local de cotizaciones ESAP (JSON).
+
+Expone el motor de `modelo_parametrico` a otras herramientas sin ejecutar
+Calculadora.py (que configura la página de Streamlit al importarse). Usa solo
+la biblioteca estándar: un servidor HTTP/1.1 con conexiones persistentes sobre
+asyncio. El motor es Python puro y el GIL impide repartirlo entre hilos, así
+que el servicio escala con procesos: `--procesos` (por defecto uno por núcleo)
+abre el mismo puerto con SO_REUSEPORT y el kernel reparte las conexiones. Cada
+proceso tiene su propio caché; /salud reporta el del proceso que responde.
+
+Endpoints:
+    GET  /salud                                        estado, tarifario vigente y estadísticas del caché
+    GET  /cotizar?aspirantes=1200&ciudad=Cali&modalidad=Virtual
+    POST /cotizar   {"aspirantes": 1200, "ciudad": "Cali", "modalidad": "Virtual"}
+    POST /cotizar   {"cotizaciones": [{...}, {...}]}   lote; responde {"cotizaciones": [...]}
+
+Caché LRU: dentro de un bloque de 25 aspirantes (mismo número de salones) y
+un mismo tramo de impresión, todo el costo es fijo salvo la impresión, que es
+N × precio del tramo. Por eso la llave normalizada es (salones, tramo, ciudad,
+modalidad, huella del tarifario) y la respuesta para cualquier N del bloque
+se arma con el registro en caché y una multiplicación, con el mismo
+resultado que `calcular_costo_parametrico`. La huella (y no el nombre de la
+versión) cambia si el archivo se edita en disco o si un tarifario proyectado
+usa otras series de índices.
+
+Uso:
+    python servicio_cotizaciones.py --puerto 8765 --procesos 4
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import re
+import signal
+import socket
+import sys
+import threading
+import time
+from bisect import bisect_left
+from collections import OrderedDict
+from email.utils import formatdate
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+from modelo_parametrico import ASPIRANTES_POR_SALON, MODALIDADES, calcular_costo_parametrico
+from tarifario import obtener_tarifario
+
+PUERTO = 8765
+PROCESOS = os.cpu_count() or 1
+INACTIVIDAD = 15.0  # segundos
+MAX_CABECERAS = 16 * 1024
+MAX_CUERPO = 4 * 1024 * 1024
+TAMANO_CACHE = 65_536
+MAX_LOTE = 10_000
+
+_cache = OrderedDict()  # llave normalizada -> (logística, personal, insumos, transporte, precio de impresión)
+_estadisticas = {"aciertos": 0, "fallos": 0}
+_bloqueo = threading.Lock()
+
+
+def llave_cotizacion(n_aspirantes, ciudad, tipo_prueba, tarifario):
+    """Llave normalizada del caché: (salones, tramo de impresión, ciudad, modalidad, huella del tarifario)."""
+    salones = -(-n_aspirantes // ASPIRANTES_POR_SALON)
+    tramo = bisect_left([limite for limite, _ in tarifario["tramos_impresion"]], n_aspirantes)
+    return salones, tramo, ciudad, tipo_prueba, tarifario["huella"]
+
+
+def cotizar(n_aspirantes, ciudad="Bogotá", tipo_prueba="Escrita", tarifario=None):
+    """Misma respuesta que `calcular_costo_parametrico`, servida desde el caché LRU cuando es posible."""
+    if not isinstance(tarifario, dict):
+        tarifario = obtener_tarifario(tarifario)
+    llave = llave_cotizacion(n_aspirantes, ciudad, tipo_prueba, tarifario)
+    with _bloqueo:
+        registro = _cache.get(llave)
+        if registro is not None:
+            _cache.move_to_end(llave)
+            _estadisticas["aciertos"] += 1
+
+    if registro is None:
+        resultado = calcular_costo_parametrico(n_aspirantes, ciudad, tipo_prueba, tarifario)
+        financiero = resultado["financiero"]
+        tramos = tarifario["tramos_impresion"]
+        precio_impresion = tramos[llave[1]][1] if llave[1] < len(tramos) else tarifario["precio_impresion_base"]
+        registro = (resultado["logistica"], financiero["Personal"], financiero["Insumos"], financiero["Logística"],
+                    precio_impresion)
+        with _bloqueo:
+            _estadisticas["fallos"] += 1
+            _cache[llave] = registro
+            if len(_cache) > TAMANO_CACHE:
+                _cache.popitem(last=False)
+
+    logistica, personal, insumos, transporte, precio_impresion = registro
+    impresion = n_aspirantes * precio_impresion
+    return {
+        "logistica": dict(logistica),
+        "financiero": {"Impresión": impresion, "Personal": personal, "Insumos": insumos,
+                       "Logística": transporte, "Total": impresion + personal + insumos + transporte},
+        "tarifario": tarifario["version"],
+    }
+
+
+def estado_cache():
+    with _bloqueo:
+        return {"entradas": len(_cache), "capacidad": TAMANO_CACHE, **_estadisticas}
+
+
+def _aspirantes(valor):
+    """Número de aspirantes de una solicitud: entero (o texto/float sin decimales) mayor que cero."""
+    if isinstance(valor, bool):
+        raise ValueError(f"'aspirantes' debe ser un entero, no un booleano: {valor!r}")
+    if isinstance(valor, float) and valor.is_integer():
+        valor = int(valor)
+    elif isinstance(valor, str) and re.fullmatch(r"\s*-?\d+\s*", valor):
+        valor = int(valor)
+    if not isinstance(valor, int):
+        raise ValueError(f"'aspirantes' debe ser un entero: {valor!r}")
+    if valor < 1:
+        raise ValueError("'aspirantes' debe ser mayor que cero.")
+    return valor
+
+
+def _leer_solicitud(datos, tarifario):
+    """Valida una solicitud {"aspirantes", "ciudad", "modalidad"} y la cotiza."""
+    if not isinstance(datos, dict):
+        raise ValueError(f"Cada solicitud debe ser un objeto JSON: {datos!r}")
+    if "aspirantes" not in datos:
+        raise ValueError("Falta el campo 'aspirantes'.")
+    n = _aspirantes(datos["aspirantes"])
+    ciudad = datos.get("ciudad", "Bogotá")
+    if not isinstance(ciudad, str):
+        raise ValueError(f"'ciudad' debe ser un texto: {ciudad!r}")
+    tipo = datos.get("modalidad", "Escrita")
+    if not isinstance(tipo, str) or tipo not in MODALIDADES:
+        raise ValueError(f"Modalidad desconocida: {tipo!r} (use {' o '.join(MODALIDADES)})")
+    return cotizar(n, ciudad, tipo, tarifario)
+
+
+def atender(cuerpo):
+    """
+    Cotiza un cuerpo JSON ya decodificado (una solicitud o un lote en "cotizaciones").
+
+    Cualquier cuerpo inválido termina en ValueError con un mensaje para el cliente.
+    """
+    if not isinstance(cuerpo, dict):
+        raise ValueError("El cuerpo debe ser un objeto JSON.")
+    version = cuerpo.get("tarifario")
+    if version is not None and not isinstance(version, str):
+        raise ValueError(f"'tarifario' debe ser el nombre de una versión: {version!r}")
+    try:
+        tarifario = obtener_tarifario(version)
+    except KeyError as e:
+        raise ValueError(e.args[0]) from None
+    if "cotizaciones" in cuerpo:
+        lote = cuerpo["cotizaciones"]
+        if not isinstance(lote, list) or len(lote) > MAX_LOTE:
+            raise ValueError(f"'cotizaciones' debe ser una lista de hasta {MAX_LOTE:,} solicitudes.")
+        respuestas = []
+        for i, solicitud in enumerate(lote):
+            try:
+                respuestas.append(_leer_solicitud(solicitud, tarifario))
+            except ValueError as e:
+                raise ValueError(f"cotizaciones[{i}]: {e}") from None
+        return {"cotizaciones": respuestas}
+    return _leer_solicitud(cuerpo, tarifario)
+
+
+def resolver(metodo, destino, cuerpo=b""):
+    """Enruta una solicitud HTTP ya leída; devuelve (código de estado, contenido JSON)."""
+    url = urlsplit(destino)
+    if url.path == "/salud":
+        if metodo != "GET":
+            return 405, {"error": f"Método no permitido en {url.path}: {metodo}"}
+        return 200, {"estado": "ok", "tarifario": obtener_tarifario()["version"], "proceso": os.getpid(),
+                     "cache": estado_cache()}
+    if url.path != "/cotizar":
+        return 404, {"error": f"Ruta desconocida: {url.path}"}
+    if metodo == "GET":
+        solicitud = {clave: valores[-1] for clave, valores in parse_qs(url.query).items()}
+    elif metodo == "POST":
+        try:
+            solicitud = json.loads(cuerpo or b"{}")
+        except ValueError as e:  # JSONDecodeError o bytes que no son UTF-8
+            return 400, {"error": f"JSON inválido: {e}"}
+    else:
+        return 405, {"error": f"Método no permitido en {url.path}: {metodo}"}
+    try:
+        return 200, atender(solicitud)
+    except (ValueError, TypeError) as e:
+        return 400, {"error": str(e)}
+
+
+def _fecha_http(_cache=[0, ""]):
+    """Cabecera Date (RFC 9110), recalculada como máximo una vez por segundo."""
+    ahora = int(time.time())
+    if _cache[0] != ahora:
+        _cache[:] = [ahora, formatdate(ahora, usegmt=True)]
+    return _cache[1]
+
+
+def _respuesta(codigo, contenido, mantener=True):
+    datos = json.dumps(contenido, ensure_ascii=False).encode()
+    conexion = "" if mantener else "Connection: close\r\n"
+    cabeceras = (f"HTTP/1.1 {codigo} {HTTPStatus(codigo).phrase}\r\n"
+                 f"Date: {_fecha_http()}\r\n"
+                 "Content-Type: application/json; charset=utf-8\r\n"
+                 f"Content-Length: {len(datos)}\r\n{conexion}\r\n")
+    return cabeceras.encode("latin-1") + datos
+
+
+def _leer_cabeceras(bloque):
+    """Línea de solicitud y cabeceras (nombres en minúscula) de un bloque sin el \\r\\n\\r\\n final."""
+    lineas = bloque.decode("latin-1").split("\r\n")
+    partes = lineas[0].split(" ")
+    if len(partes) != 3 or not partes[2].startswith("HTTP/1."):
+        raise ValueError(f"Línea de solicitud inválida: {lineas[0][:100]!r}")
+    cabeceras = {}
+    for linea in lineas[1:]:
+        nombre, separador, valor = linea.partition(":")
+        if not separador or not nombre or nombre != nombre.strip():
+            raise ValueError(f"Cabecera inválida: {linea[:100]!r}")
+        cabeceras[nombre.lower()] = valor.strip()
+    return partes[0], partes[1], partes[2], cabeceras
+
+
+class ProtocoloCotizaciones(asyncio.Protocol):
+    """
+    Una conexión HTTP/1.1 persistente (keep-alive) atendida en el bucle de eventos.
+
+    Las solicitudes de la conexión se atienden en orden. Una conexión sin
+    actividad durante `inactividad` segundos se cierra: las conexiones ociosas
+    no ocupan hilos, pero sí descriptores de archivo.
+    """
+
+    def __init__(self, inactividad=INACTIVIDAD):
+        self.inactividad = inactividad
+        self.transporte = None
+        self.bucle = None
+        self.buffer = bytearray()
+        self.pendiente = None  # (método, destino, mantener, largo del cuerpo) si ya llegaron las cabeceras
+        self.ultima_actividad = 0.0
+
+    def connection_made(self, transporte):
+        self.transporte = transporte
+        self.bucle = asyncio.get_running_loop()
+        self.ultima_actividad = self.bucle.time()
+        self.bucle.call_later(self.inactividad, self._revisar_inactividad)
+
+    def _revisar_inactividad(self):
+        # Un solo temporizador por conexión: se reprograma por lo que falta en lugar de reiniciarlo en cada solicitud.
+        if self.transporte.is_closing():
+            return
+        restante = self.ultima_actividad + self.inactividad - self.bucle.time()
+        if restante <= 0:
+            self.transporte.close()
+        else:
+            self.bucle.call_later(restante, self._revisar_inactividad)
+
+    def data_received(self, datos):
+        self.ultima_actividad = self.bucle.time()
+        self.buffer += datos
+        while not self.transporte.is_closing():
+            if self.pendiente is None and not self._leer_pendiente():
+                return
+            metodo, destino, mantener, largo = self.pendiente
+            if len(self.buffer) < largo:
+                return
+            cuerpo = bytes(self.buffer[:largo])
+            del self.buffer[:largo]
+            self.pendiente = None
+            codigo, contenido = resolver(metodo, destino, cuerpo)
+            self.transporte.write(_respuesta(codigo, contenido, mantener))
+            if not mantener:
+                self.transporte.close()
+
+    def _leer_pendiente(self):
+        """Procesa las cabeceras de la siguiente solicitud si ya llegaron completas."""
+        fin = self.buffer.find(b"\r\n\r\n")
+        if fin < 0:
+            if len(self.buffer) > MAX_CABECERAS:
+                self._cerrar_con_error(431, "Cabeceras demasiado grandes.")
+            return False
+        try:
+            metodo, destino, version, cabeceras = _leer_cabeceras(bytes(self.buffer[:fin]))
+            largo = int(cabeceras.get("content-length", 0))
+            if largo < 0:
+                raise ValueError(f"Content-Length inválido: {largo}")
+        except ValueError as e:
+            self._cerrar_con_error(400, f"Solicitud HTTP inválida: {e}")
+            return False
+        if "transfer-encoding" in cabeceras:
+            self._cerrar_con_error(501, "Transfer-Encoding no soportado; envíe Content-Length.")
+            return False
+        if largo > MAX_CUERPO:
+            self._cerrar_con_error(413, f"El cuerpo supera {MAX_CUERPO:,} bytes.")
+            return False
+        del self.buffer[:fin + 4]
+        conexion = cabeceras.get("connection", "").lower()
+        mantener = conexion == "keep-alive" if version == "HTTP/1.0" else conexion != "close"
+        self.pendiente = (metodo, destino, mantener, largo)
+        if largo > len(self.buffer) and cabeceras.get("expect", "").lower() == "100-continue":
+            self.transporte.write(b"HTTP/1.1 100 Continue\r\n\r\n")
+        return True
+
+    def _cerrar_con_error(self, codigo, mensaje):
+        self.transporte.write(_respuesta(codigo, {"error": mensaje}, mantener=False))
+        self.transporte.close()
+
+    def pause_writing(self):
+        # El cliente no lee las respuestas: se deja de leer solicitudes hasta que vacíe el búfer.
+        self.transporte.pause_reading()
+
+    def resume_writing(self):
+        self.transporte.resume_reading()
+
+
+def socket_escucha(host, puerto, compartido=False):
+    """Socket TCP en escucha; con `compartido`, SO_REUSEPORT para que varios procesos usen el mismo puerto."""
+    familia = socket.getaddrinfo(host, puerto, type=socket.SOCK_STREAM)[0][0]
+    return socket.create_server((host, puerto), family=familia, backlog=1024, reuse_port=compartido)
+
+
+async def servir(escucha, inactividad=INACTIVIDAD, listo=None):
+    """Atiende conexiones en `escucha` hasta que se cancele la tarea."""
+    bucle = asyncio.get_running_loop()
+    servidor = await bucle.create_server(lambda: ProtocoloCotizaciones(inactividad), sock=escucha)
+    if listo is not None:
+        listo.set()
+    async with servidor:
+        await servidor.serve_forever()
+
+
+def _proceso_trabajador(host, puerto, inactividad, listo):
+    """Proceso adicional: su propio socket en el mismo puerto; el kernel reparte las conexiones."""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # lo detiene el proceso principal
+    obtener_tarifario()
+    try:
+        asyncio.run(servir(socket_escucha(host, puerto, compartido=True), inactividad, listo))
+    except KeyboardInterrupt:
+        pass
+
+
+def _detener(senal, marco):
+    raise KeyboardInterrupt
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servicio HTTP local de cotizaciones ESAP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=PUERTO)
+    parser.add_argument("--procesos", type=int, default=PROCESOS,
+                        help="Procesos que atienden el puerto (por defecto, uno por núcleo)")
+    parser.add_argument("--inactividad", type=float, default=INACTIVIDAD,
+                        help="Segundos sin solicitudes tras los que se cierra una conexión persistente")
+    args = parser.parse_args(argv)
+
+    obtener_tarifario()  # falla al arrancar, y no en la primera solicitud, si no hay tarifario
+    procesos = max(args.procesos, 1)
+    if procesos > 1 and not hasattr(socket, "SO_REUSEPORT"):
+        print("SO_REUSEPORT no está disponible en esta plataforma: se usa un solo proceso.", file=sys.stderr)
+        procesos = 1
+    escucha = socket_escucha(args.host, args.puerto, compartido=procesos > 1)
+    puerto = escucha.getsockname()[1]
+
+    contexto = multiprocessing.get_context("spawn")  # sin heredar el socket ni el estado del proceso principal
+    trabajadores = []
+    for _ in range(procesos - 1):
+        listo = contexto.Event()
+        trabajador = contexto.Process(target=_proceso_trabajador, args=(args.host, puerto, args.inactividad, listo),
+                                      daemon=True)
+        trabajador.start()
+        trabajadores.append((trabajador, listo))
+    for trabajador, listo in trabajadores:
+        while not listo.wait(0.1):
+            if not trabajador.is_alive():
+                raise RuntimeError(f"Un proceso del servicio terminó al arrancar (código {trabajador.exitcode})")
+
+    signal.signal(signal.SIGTERM, _detener)
+    print(f"Servicio de cotizaciones en http://{args.host}:{puerto} ({procesos} proceso(s))", flush=True)
+    try:
+        asyncio.run(servir(escucha, args.inactividad))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for trabajador, _ in trabajadores:
+            trabajador.terminate()
+        for trabajador, _ in trabajadores:
+            trabajador.join()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,175 @@
+"""
+Simulación Monte Carlo de la incertidumbre de costos ESAP.
+
+Parte de las mismas reglas que `calcular_costo_parametrico` y hace variar:
+
+- cada tarifa del tarifario y el precio de impresión (multiplicador triangular
+  alrededor de 1),
+- la tasa de ausentismo (los recursos se dimensionan para los citados que
+  efectivamente se presentan),
+- el factor de transporte de la ciudad (triangular alrededor del factor del
+  modelo).
+
+Las muestras se procesan en bloques de tamaño fijo y los percentiles se
+estiman con histogramas de rango acotado, de modo que la memoria no crece con
+el número de simulaciones. Sin variación (todos los rangos en cero) la
+distribución colapsa exactamente en la estimación puntual.
+"""
+import numpy as np
+import pandas as pd
+
+from modelo_parametrico import (
+    ASPIRANTES_POR_SITIO, RECURSOS_INSUMOS, RECURSOS_PERSONAL, _techo, calcular_costo_parametrico,
+    cantidades_por_recurso, factor_ciudad_lote, precio_impresion_lote,
+)
+from tarifario import resolver_tarifario
+
+RUBROS = ["Impresión", "Personal", "Insumos", "Logística", "Total"]
+PERCENTILES = {"P10": 10, "P50": 50, "P90": 90}
+
+PARAMETROS_SIMULACION = {
+    "variacion_tarifas": 0.10,       # ± sobre cada tarifa (triangular)
+    "ausentismo": (0.0, 0.0),        # rango uniforme de la tasa de no presentación
+    "dispersion_transporte": 0.25,   # ± sobre el factor de ciudad (triangular)
+}
+
+N_BINS_HISTOGRAMA = 20_000
+
+
+def _triangular(rng, dispersion, tamano):
+    if dispersion == 0:
+        return np.ones(tamano)
+    return rng.triangular(1 - dispersion, 1.0, 1 + dispersion, tamano)
+
+
+def _cotas(tarifario, n_aspirantes, tipo_prueba, factor_ciudad, variacion, ausentismo, dispersion):
+    """Cotas inferior y superior de cada rubro, para fijar el rango de los histogramas."""
+    precios = tarifario["precio"]
+    costo_sitio = tarifario["costo_transporte_sitio"]
+    n_min = max(1, int(np.floor(n_aspirantes * (1 - ausentismo[1]))))
+    n_max = max(1, int(np.ceil(n_aspirantes * (1 - ausentismo[0]))))
+    bajo, alto = 1 - variacion, 1 + variacion
+    precios_impresion = tarifario["precios_impresion"].tolist()
+    cant_min = cantidades_por_recurso(n_min, tipo_prueba)
+    cant_max = cantidades_por_recurso(n_max, tipo_prueba)
+
+    def rango(recursos):
+        return (sum(int(cant_min[r]) * precios[r] for r in recursos) * bajo,
+                sum(int(cant_max[r]) * precios[r] for r in recursos) * alto)
+
+    sitios = [_techo(n, ASPIRANTES_POR_SITIO) for n in (n_min, n_max)]
+    cotas = {
+        "Impresión": (n_min * min(precios_impresion) * bajo, n_max * max(precios_impresion) * alto),
+        "Personal": rango(RECURSOS_PERSONAL),
+        "Insumos": rango(RECURSOS_INSUMOS),
+        "Logística": (costo_sitio * sitios[0] * factor_ciudad * (1 - dispersion),
+                      costo_sitio * sitios[1] * factor_ciudad * (1 + dispersion)),
+    }
+    cotas["Total"] = (sum(c[0] for c in cotas.values()), sum(c[1] for c in cotas.values()))
+    return cotas
+
+
+def _simular_bloque(rng, tamano, tarifario, n_aspirantes, tipo_prueba, factor_ciudad, variacion, ausentismo,
+                    dispersion):
+    """Costos por rubro de un bloque de `tamano` escenarios simulados."""
+    precios = tarifario["precio"]
+    if ausentismo[1] > 0:
+        tasa = rng.uniform(ausentismo[0], ausentismo[1], tamano)
+        n = np.maximum(1, np.rint(n_aspirantes * (1 - tasa)).astype(np.int64))
+    else:
+        n = np.full(tamano, n_aspirantes, dtype=np.int64)
+
+    cantidades = cantidades_por_recurso(n, tipo_prueba)
+    costo_impresion = n * precio_impresion_lote(n, tarifario) * _triangular(rng, variacion, tamano)
+    costo_staff = sum(cantidades[r] * (precios[r] * _triangular(rng, variacion, tamano))
+                      for r in RECURSOS_PERSONAL)
+    costo_insumos = sum(cantidades[r] * (precios[r] * _triangular(rng, variacion, tamano))
+                        for r in RECURSOS_INSUMOS)
+    costo_transporte = tarifario["costo_transporte_sitio"] * cantidades['Delegado'] * (
+        factor_ciudad * _triangular(rng, dispersion, tamano))
+    total = costo_impresion + costo_staff + costo_insumos + costo_transporte
+    return dict(zip(RUBROS, (costo_impresion, costo_staff, costo_insumos, costo_transporte, total)))
+
+
+def _acumular_histograma(conteos, bordes, valores):
+    """Suma `valores` al histograma de bins uniformes (sin búsqueda binaria)."""
+    ancho = bordes[1] - bordes[0]
+    indices = ((valores - bordes[0]) / ancho).astype(np.int64)
+    np.clip(indices, 0, len(conteos) - 1, out=indices)
+    conteos += np.bincount(indices, minlength=len(conteos))
+
+
+def _percentil_histograma(conteos, bordes, q, minimo, maximo):
+    """Percentil `q` (0-100) interpolando linealmente dentro del bin."""
+    acumulado = np.cumsum(conteos)
+    objetivo = q / 100 * acumulado[-1]
+    i = int(np.searchsorted(acumulado, objetivo, side="left"))
+    previo = acumulado[i - 1] if i > 0 else 0
+    fraccion = (objetivo - previo) / conteos[i] if conteos[i] else 0.0
+    valor = bordes[i] + fraccion * (bordes[i + 1] - bordes[i])
+    return min(max(valor, minimo), maximo)
+
+
+def simular_costos(n_aspirantes, ciudad, tipo_prueba, n_simulaciones=100_000, semilla=None,
+                   tamano_bloque=100_000, tarifario=None, **parametros):
+    """
+    Distribución del costo por rubro para una cotización.
+
+    Los parámetros de incertidumbre (`variacion_tarifas`, `ausentismo`,
+    `dispersion_transporte`) toman por defecto los valores de
+    `PARAMETROS_SIMULACION`. Devuelve un diccionario con:
+
+    - "resumen": DataFrame con filas P10/P50/P90/Media y una columna por rubro,
+    - "punto": la estimación puntual de `calcular_costo_parametrico`,
+    - "histograma": (conteos, bordes) del costo total,
+    - "n_simulaciones" y "tarifario" (versión usada).
+    """
+    tarifario = resolver_tarifario(tarifario)
+    desconocidos = set(parametros) - set(PARAMETROS_SIMULACION)
+    if desconocidos:
+        raise TypeError(f"Parámetros de simulación desconocidos: {sorted(desconocidos)}")
+    config = {**PARAMETROS_SIMULACION, **parametros}
+    variacion = config["variacion_tarifas"]
+    ausentismo = tuple(config["ausentismo"])
+    dispersion = config["dispersion_transporte"]
+    if isinstance(dispersion, dict):
+        dispersion = dispersion.get(ciudad, PARAMETROS_SIMULACION["dispersion_transporte"])
+    if not 0 <= ausentismo[0] <= ausentismo[1] < 1:
+        raise ValueError("El rango de ausentismo debe cumplir 0 <= mínimo <= máximo < 1.")
+
+    factor_ciudad = float(factor_ciudad_lote(ciudad, tarifario))
+    cotas = _cotas(tarifario, n_aspirantes, tipo_prueba, factor_ciudad, variacion, ausentismo, dispersion)
+    bordes = {r: np.linspace(lo, max(hi, lo * (1 + 1e-9) + 1), N_BINS_HISTOGRAMA + 1)
+              for r, (lo, hi) in cotas.items()}
+    conteos = {r: np.zeros(N_BINS_HISTOGRAMA, dtype=np.int64) for r in RUBROS}
+    sumas = dict.fromkeys(RUBROS, 0.0)
+    minimos = dict.fromkeys(RUBROS, np.inf)
+    maximos = dict.fromkeys(RUBROS, -np.inf)
+
+    rng = np.random.default_rng(semilla)
+    restantes = n_simulaciones
+    while restantes > 0:
+        tamano = min(tamano_bloque, restantes)
+        bloque = _simular_bloque(rng, tamano, tarifario, n_aspirantes, tipo_prueba, factor_ciudad,
+                                 variacion, ausentismo, dispersion)
+        for rubro, valores in bloque.items():
+            _acumular_histograma(conteos[rubro], bordes[rubro], valores)
+            sumas[rubro] += float(valores.sum())
+            minimos[rubro] = min(minimos[rubro], float(valores.min()))
+            maximos[rubro] = max(maximos[rubro], float(valores.max()))
+        restantes -= tamano
+
+    resumen = pd.DataFrame(
+        {rubro: [_percentil_histograma(conteos[rubro], bordes[rubro], q, minimos[rubro], maximos[rubro])
+                 for q in PERCENTILES.values()]
+                + [sumas[rubro] / n_simulaciones]
+         for rubro in RUBROS},
+        index=list(PERCENTILES) + ["Media"],
+    )
+    return {
+        "resumen": resumen,
+        "punto": calcular_costo_parametrico(n_aspirantes, ciudad, tipo_prueba, tarifario)["financiero"],
+        "histograma": (conteos["Total"], bordes["Total"]),
+        "n_simulaciones": n_simulaciones,
+        "tarifario": tarifario["version"],
+    }
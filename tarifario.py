@@ -0,0 +1,198 @@
+"""
+Tarifario versionado del modelo paramétrico ESAP.
+
+Cada versión del tarifario es un archivo JSON en `tarifas/` (o en la carpeta
+indicada por la variable de entorno `ESAP_TARIFAS`) con precios por recurso,
+tramos de impresión y factores de transporte por ciudad. Los factores pueden
+derivarse de una red de transporte (`"transporte": {"red": "redes/x.json"}`,
+ver `red_transporte.py`); los de `factor_ciudad` tienen prioridad.
+`tarifas/ejemplos/` tiene un tarifario de ejemplo con una red de costos
+aproximados; las subcarpetas no se cargan. Los archivos se procesan una sola
+vez a arreglos de NumPy y se recargan automáticamente cuando cambian en
+disco, sin reiniciar el servidor.
+
+El contenido de una versión publicada no debe modificarse: para cambiar
+tarifas se agrega un archivo nuevo con otra `version` y una `vigente_desde`
+posterior. Así cada cotización puede reproducirse con la versión que registró.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+import numpy as np
+
+from red_transporte import cargar_red, factores_red
+
+RUTA_TARIFAS = os.environ.get("ESAP_TARIFAS", os.path.join(os.path.dirname(os.path.abspath(__file__)), "tarifas"))
+
+# Segundos entre revisiones de la carpeta (evita un stat por cada cotización)
+INTERVALO_REVISION = 2.0
+
+_cache_archivos = {}   # ruta -> (mtime_ns del tarifario y de su red, tarifario)
+_errores = {}          # ruta -> mtime_ns del archivo inválido ya reportado
+_log = logging.getLogger(__name__)
+_estado = {"revisado": -np.inf, "versiones": {}, "vigente": None}
+_bloqueo = threading.Lock()
+
+
+def _precios_enteros(valores, campo):
+    """Precios en pesos como int64; un precio con decimales es un error, no se trunca."""
+    try:
+        precios = np.asarray(valores, dtype=np.float64)
+    except (TypeError, ValueError):
+        raise ValueError(f"Los precios de {campo} deben ser números: {valores!r}") from None
+    if not np.all(np.isfinite(precios)) or np.any(precios != np.round(precios)):
+        raise ValueError(f"Los precios de {campo} deben ser enteros (COP): {valores!r}")
+    return precios.astype(np.int64)
+
+
+def procesar_tarifario(datos, huella="", carpeta=None):
+    """
+    Convierte el JSON de un tarifario en la tabla compacta que usa el modelo.
+
+    La ruta de la red de transporte, si la hay, es relativa a `carpeta` (por
+    defecto `RUTA_TARIFAS`).
+    """
+    red = None
+    try:
+        recursos = tuple(datos["precios"])
+        tramos = datos["impresion"]["tramos"]
+        transporte = datos["transporte"]
+        factores = transporte.get("factor_ciudad", {})
+        if transporte.get("red"):
+            ruta_red = os.path.join(carpeta or RUTA_TARIFAS, transporte["red"])
+            red = {**cargar_red(ruta_red), "ruta": ruta_red}
+            factores = {**factores_red(red, int(_precios_enteros(transporte["costo_sitio"], "transporte"))),
+                        **factores}
+            huella = f"{huella}-{red['huella']}"
+        tarifario = {
+            "version": str(datos["version"]),
+            "vigente_desde": str(datos.get("vigente_desde", "")),
+            "huella": huella,
+            "recursos": recursos,
+            "precios": _precios_enteros([datos["precios"][r] for r in recursos], "recursos"),
+            "limites_impresion": np.array([t["hasta"] for t in tramos], dtype=np.int64),
+            "precios_impresion": _precios_enteros(
+                [t["precio"] for t in tramos] + [datos["impresion"]["precio_base"]], "impresión"),
+            "costo_transporte_sitio": int(_precios_enteros(transporte["costo_sitio"], "transporte")),
+            "ciudades": tuple(factores),
+            "factor_ciudad": np.array(list(factores.values()), dtype=np.float64),
+            "factor_ciudad_defecto": float(transporte["factor_defecto"]),
+            "red": red,
+        }
+    except (KeyError, TypeError) as e:
+        raise ValueError(f"Tarifario inválido: falta o sobra el campo {e}") from e
+    if np.any(np.diff(tarifario["limites_impresion"]) <= 0):
+        raise ValueError("Los tramos de impresión deben estar en orden creciente.")
+
+    # Vistas escalares (enteros de Python) para el cálculo de una sola cotización
+    tarifario["precio"] = dict(zip(recursos, tarifario["precios"].tolist()))
+    tarifario["tramos_impresion"] = tuple(zip(tarifario["limites_impresion"].tolist(),
+                                              tarifario["precios_impresion"][:-1].tolist()))
+    tarifario["precio_impresion_base"] = int(tarifario["precios_impresion"][-1])
+    tarifario["factor_por_ciudad"] = dict(zip(tarifario["ciudades"], tarifario["factor_ciudad"].tolist()))
+    return tarifario
+
+
+def cargar_tarifario(ruta):
+    """Lee y procesa un archivo de tarifario, reutilizando el resultado si no cambió."""
+    en_cache = _cache_archivos.get(ruta)
+    if en_cache and en_cache[0] == _mtimes(ruta, en_cache[1]):
+        return en_cache[1]
+    with open(ruta, "rb") as f:
+        contenido = f.read()
+    tarifario = procesar_tarifario(json.loads(contenido), hashlib.sha1(contenido).hexdigest()[:12],
+                                   os.path.dirname(ruta))
+    tarifario["ruta"] = ruta
+    _cache_archivos[ruta] = (_mtimes(ruta, tarifario), tarifario)
+    return tarifario
+
+
+def _mtimes(ruta, tarifario):
+    """Modificación del archivo del tarifario y de su red de transporte (si la tiene)."""
+    red = tarifario["red"]
+    return os.stat(ruta).st_mtime_ns, os.stat(red["ruta"]).st_mtime_ns if red else None
+
+
+def _cargar_o_ultimo_valido(ruta):
+    """
+    Tarifario de `ruta`, o su última versión válida si el archivo está dañado o a medio escribir.
+
+    El error se registra una vez por modificación del archivo; devuelve None
+    si el archivo nunca se pudo leer.
+    """
+    try:
+        tarifario = cargar_tarifario(ruta)
+    except (OSError, ValueError) as e:  # json.JSONDecodeError es un ValueError
+        try:
+            modificacion = os.stat(ruta).st_mtime_ns
+        except OSError:
+            modificacion = None
+        if _errores.get(ruta) != modificacion:
+            _errores[ruta] = modificacion
+            _log.error("Tarifario inválido en %s (se conserva la última versión válida): %s", ruta, e)
+        en_cache = _cache_archivos.get(ruta)
+        return en_cache[1] if en_cache else None
+    _errores.pop(ruta, None)
+    return tarifario
+
+
+def _revisar_carpeta(forzar=False):
+    """Recarga las versiones disponibles si pasó el intervalo de revisión."""
+    ahora = time.monotonic()
+    if not forzar and ahora - _estado["revisado"] < INTERVALO_REVISION:
+        return
+    with _bloqueo:
+        rutas = sorted(os.path.join(RUTA_TARIFAS, nombre) for nombre in os.listdir(RUTA_TARIFAS)
+                       if nombre.endswith(".json"))
+        versiones = {}
+        for ruta in rutas:
+            tarifario = _cargar_o_ultimo_valido(ruta)
+            if tarifario is not None:
+                versiones[tarifario["version"]] = tarifario
+        if not versiones:
+            raise FileNotFoundError(f"No hay tarifarios válidos en {RUTA_TARIFAS}")
+        _estado["versiones"] = versiones
+        _estado["vigente"] = max(versiones.values(), key=lambda t: (t["vigente_desde"], t["version"]))
+        _estado["revisado"] = ahora
+
+
+def obtener_tarifario(version=None):
+    """
+    Tarifario vigente, o el de una `version` específica para reproducir cotizaciones.
+    """
+    _revisar_carpeta()
+    if version is None:
+        return _estado["vigente"]
+    if version not in _estado["versiones"]:
+        _revisar_carpeta(forzar=True)
+    try:
+        return _estado["versiones"][version]
+    except KeyError:
+        raise KeyError(f"Versión de tarifario desconocida: {version}") from None
+
+
+def listar_versiones():
+    """Versiones disponibles, de la más antigua a la más reciente."""
+    _revisar_carpeta()
+    return sorted(_estado["versiones"], key=lambda v: (_estado["versiones"][v]["vigente_desde"], v))
+
+
+def resolver_tarifario(tarifario=None):
+    """
+    Acepta un tarifario ya procesado, una versión (str) o None (vigente).
+
+    Se llama en cada cotización individual: un tarifario procesado se
+    devuelve sin más, y el vigente se toma del estado mientras no toque
+    revisar la carpeta.
+    """
+    if type(tarifario) is dict:
+        return tarifario
+    if tarifario is None and time.monotonic() - _estado["revisado"] < INTERVALO_REVISION:
+        return _estado["vigente"]
+    if tarifario is None or isinstance(tarifario, str):
+        return obtener_tarifario(tarifario)
+    return tarifario
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from asignacion_ciudades import optimizar_asignacion
+from modelo_parametrico import calcular_costo_lote, calcular_costo_parametrico
+
+
+def _costo(n, ciudad, tipo_prueba):
+    """Costo de cada n (arreglo) en una ciudad; una ciudad sin aspirantes no cuesta nada."""
+    total = calcular_costo_lote(np.maximum(n, 1), ciudad, tipo_prueba)["financiero"]["Total"]
+    return np.where(n > 0, total, 0.0)
+
+
+def _fuerza_bruta(total, ciudades, tipo_prueba, minimos, maximos):
+    """Mínimo sobre todos los repartos (n_1, ..., n_k) con Σ n = total."""
+    rangos = [np.arange(minimos.get(c, 0), min(maximos.get(c, total), total) + 1) for c in ciudades[:-1]]
+    repartos = np.stack([m.ravel() for m in np.meshgrid(*rangos, indexing="ij")])
+    ultimo = total - repartos.sum(axis=0)
+    factible = (ultimo >= minimos.get(ciudades[-1], 0)) & (ultimo <= maximos.get(ciudades[-1], total))
+    repartos = np.vstack([repartos, ultimo])[:, factible]
+    costos = sum(_costo(repartos[i], c, tipo_prueba) for i, c in enumerate(ciudades))
+    return costos.min()
+
+
+@pytest.mark.parametrize("total, ciudades, tipo_prueba, minimos, maximos", [
+    (37, ["Bogotá", "Cali"], "Escrita", {}, {}),
+    (260, ["Cali", "Bogotá"], "Virtual", {"Cali": 40}, {"Bogotá": 200}),
+    (1030, ["Bogotá", "Medellín"], "Escrita", {"Medellín": 510}, {}),
+    (8000, ["Medellín", "Bogotá"], "Escrita", {"Medellín": 1}, {"Bogotá": 6000}),  # tramo final periódico
+    (130, ["Bogotá", "Cali", "Quibdó"], "Escrita", {"Quibdó": 26}, {"Bogotá": 60}),
+    (520, ["Cali", "Medellín", "Bogotá"], "Virtual", {}, {"Bogotá": 480}),
+])
+def test_optimo_igual_a_fuerza_bruta(total, ciudades, tipo_prueba, minimos, maximos):
+    resultado = optimizar_asignacion(total, ciudades, tipo_prueba, minimos, maximos)
+    assert resultado["costo_total"] == pytest.approx(_fuerza_bruta(total, ciudades, tipo_prueba, minimos, maximos),
+                                                     rel=1e-12)
+
+    asignacion = resultado["asignacion"].set_index("Ciudad")
+    assert asignacion["Aspirantes"].sum() == total
+    for ciudad, fila in asignacion.iterrows():
+        assert minimos.get(ciudad, 0) <= fila["Aspirantes"] <= maximos.get(ciudad, total)
+        esperado = (calcular_costo_parametrico(int(fila["Aspirantes"]), ciudad, tipo_prueba)["financiero"]["Total"]
+                    if fila["Aspirantes"] else 0.0)
+        assert fila["Costo"] == pytest.approx(esperado, rel=1e-12)
+
+
+def test_limites_imposibles():
+    with pytest.raises(ValueError, match="no permiten repartir"):
+        optimizar_asignacion(100, ["Bogotá", "Cali"], maximos={"Bogotá": 40, "Cali": 40})
@@ -0,0 +1,64 @@
+import io
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from asignacion_salones import asignar_salones, cargar_catalogo, catalogo_ejemplo, costos_apertura
+
+
+def _catalogo_pequeno(semilla):
+    rng = np.random.default_rng(semilla)
+    filas = [("Bogotá", f"S{s}", f"A{a}", int(rng.choice([15, 20, 25, 30, 40, 45])))
+             for s in range(3) for a in range(rng.integers(1, 5))]
+    return pd.DataFrame(filas, columns=["Ciudad", "Sitio", "Salón", "Capacidad"])
+
+
+def _optimo_exacto(n, catalogo, costo_sitio, costo_salon):
+    """Menor costo de apertura abriendo en cada sitio sus k salones más grandes (k = 0 si no se abre)."""
+    capacidades = [np.sort(g.to_numpy())[::-1].cumsum() for _, g in catalogo.groupby("Sitio")["Capacidad"]]
+    mejor = np.inf
+    for ks in itertools.product(*[range(len(c) + 1) for c in capacidades]):
+        cupos = sum(c[k - 1] for c, k in zip(capacidades, ks) if k)
+        if cupos >= n:
+            mejor = min(mejor, sum(costo_sitio + costo_salon * k for k in ks if k))
+    return mejor
+
+
+def _costo_apertura(resultado, costo_sitio, costo_salon):
+    return costo_sitio * len(resultado["sitios"]) + costo_salon * len(resultado["salones"])
+
+
+@pytest.mark.parametrize("semilla", range(8))
+@pytest.mark.parametrize("tipo_prueba", ["Escrita", "Virtual"])
+def test_cota_exacto_y_heuristica_ordenados(semilla, tipo_prueba):
+    catalogo = _catalogo_pequeno(semilla)
+    costo_sitio, costo_salon = costos_apertura(tipo_prueba)
+    for n in np.linspace(1, catalogo["Capacidad"].sum(), 6).astype(int):
+        resultado = asignar_salones(int(n), catalogo, tipo_prueba)
+        heuristica = _costo_apertura(resultado, costo_sitio, costo_salon)
+        exacto = _optimo_exacto(n, catalogo, costo_sitio, costo_salon)
+        assert resultado["cota_inferior"] <= exacto + 1e-6 <= heuristica + 2e-6
+        assert heuristica == pytest.approx(resultado["cota_inferior"] * (1 + resultado["brecha"]))
+
+
+@pytest.mark.parametrize("n", [30, 1_234, 20_000, 80_000])
+def test_brecha_contra_la_cota_en_catalogo_grande(n):
+    resultado = asignar_salones(n, catalogo_ejemplo())
+    salones = resultado["salones"]
+    assert salones["Asignados"].sum() == n
+    assert (salones["Asignados"] <= salones["Capacidad"]).all()
+    assert 0 <= resultado["brecha"] < (0.1 if n < 1_000 else 0.01)
+    assert resultado["costo"]["logistica"]["Salones"] == len(salones)
+
+
+def test_capacidad_insuficiente():
+    with pytest.raises(ValueError, match="no alcanza"):
+        asignar_salones(10_000, _catalogo_pequeno(0))
+
+
+def test_catalogo_desde_archivo_en_memoria():
+    contenido = "Ciudad,Sitio,Salón,Capacidad\nBogotá,S1,A1,30\nBogotá,S1,A2,0\n".encode()
+    catalogo = cargar_catalogo(io.BytesIO(contenido), ".csv")
+    assert catalogo.to_dict("records") == [{"Ciudad": "Bogotá", "Sitio": "S1", "Salón": "A1", "Capacidad": 30}]
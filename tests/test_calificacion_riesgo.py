@@ -0,0 +1,82 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from calificacion_riesgo import RUBRIC_DATA, calificar_cohorte, leer_cohorte, main, matriz_puntajes
+
+CRITERIOS = [c["id"] for componente in RUBRIC_DATA.values() for c in componente["criteria"]]
+
+
+def _calculate_results(puntajes):
+    """`calculate_results` de la aplicación, leyendo los puntajes de un diccionario en lugar de st.session_state."""
+    total_score_pct = 0
+    filas = []
+    for comp_data in RUBRIC_DATA.values():
+        comp_score_pct = 0
+        for criterion in comp_data["criteria"]:
+            comp_score_pct += (puntajes[criterion["id"]] / 5.0) * criterion["weight"]
+        normalizado = (comp_score_pct / comp_data["weight"]) if comp_data["weight"] else 0
+        total_score_pct += comp_score_pct
+        filas.append({"Componente": comp_data.get("short_name", comp_data["name"]), "Peso (%)": comp_data["weight"],
+                      "Puntaje obtenido (pts)": comp_score_pct, "Avance (%)": normalizado * 100,
+                      "Calificación (0-5)": normalizado * 5})
+    return {"final_grade": total_score_pct / 100.0 * 5.0, "total_score_pct": total_score_pct,
+            "component_summary_df": pd.DataFrame(filas)}
+
+
+def _cohorte(tamano, semilla=0):
+    rng = np.random.default_rng(semilla)
+    return pd.DataFrame(np.round(rng.uniform(0, 5, (tamano, len(CRITERIOS))), 1), columns=CRITERIOS,
+                        index=pd.Index([f"E{i:03d}" for i in range(tamano)], name="Estudiante"))
+
+
+def test_cohorte_igual_a_calculate_results_por_estudiante():
+    cohorte = _cohorte(60)
+    resultado = calificar_cohorte(cohorte)
+    resumen = resultado["component_summary_df"]
+    for estudiante, puntajes in cohorte.iterrows():
+        esperado = _calculate_results(puntajes.to_dict())
+        assert resultado["final_grade"][estudiante] == pytest.approx(esperado["final_grade"], abs=1e-12)
+        assert resultado["total_score_pct"][estudiante] == pytest.approx(esperado["total_score_pct"], abs=1e-12)
+        propio = resumen[resumen["Estudiante"] == estudiante].drop(columns="Estudiante").reset_index(drop=True)
+        pd.testing.assert_frame_equal(propio, esperado["component_summary_df"], check_dtype=False, atol=1e-12)
+    assert resultado["grades_df"]["Calificación final (0-5)"].equals(resultado["final_grade"])
+
+
+def test_puntajes_fuera_de_rango():
+    cohorte = _cohorte(5)
+    cohorte.loc["E002", "B3"] = 5.5
+    cohorte.loc["E004", "A1"] = -0.1
+    with pytest.raises(ValueError, match=r"fuera de 0.0 - 5.0 en 2 evaluaciones .*'E002', 'E004'"):
+        matriz_puntajes(cohorte)
+
+
+def test_celdas_vacias_son_error_salvo_relleno():
+    cohorte = _cohorte(4)
+    cohorte.loc["E001", ["A1", "C5"]] = np.nan
+    with pytest.raises(ValueError, match=r"2 puntajes sin calificar en 1 evaluaciones .*'E001'"):
+        calificar_cohorte(cohorte)
+    relleno = calificar_cohorte(cohorte, relleno=3.0)["final_grade"]["E001"]
+    assert relleno == pytest.approx(_calculate_results(cohorte.loc["E001"].fillna(3.0).to_dict())["final_grade"])
+
+
+def test_estudiantes_repetidos_son_error():
+    cohorte = _cohorte(4).rename(index={"E003": "E001"})
+    with pytest.raises(ValueError, match=r"1 estudiantes tienen más de una evaluación .*'E001'"):
+        calificar_cohorte(cohorte)
+
+
+def test_carpeta_con_csv_y_json(tmp_path):
+    cohorte = _cohorte(3)
+    cohorte.iloc[:2].reset_index().assign(Correo="x@y.co").to_csv(tmp_path / "curso.csv", index=False)
+    puntajes = cohorte.iloc[2].to_dict()
+    (tmp_path / "E002.json").write_text(json.dumps({"project_info": {"project_name": "E002"}, "scores": puntajes}))
+
+    leida = leer_cohorte(str(tmp_path))
+    pd.testing.assert_frame_equal(leida.sort_index(), cohorte, check_dtype=False)
+
+    (tmp_path / "repetido.json").write_text(json.dumps({"Estudiante": "E000", **puntajes}))
+    with pytest.raises(SystemExit):
+        main([str(tmp_path), str(tmp_path / "notas.csv")])
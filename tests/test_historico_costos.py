@@ -0,0 +1,39 @@
+import pandas as pd
+from openpyxl import Workbook
+
+import historico_costos
+from historico_costos import _a_numero, cargar_historico, normalizar_historico
+
+
+def test_punto_de_miles_en_formato_colombiano():
+    valores = pd.Series(["$ 850.000", "1.200", "$ 1.234.567,50", "1234567", "12.5", "1,5"], dtype=object)
+    assert _a_numero(valores).tolist() == [850_000, 1_200, 1_234_567.5, 1_234_567, 12.5, 1.5]
+
+
+def test_columna_mixta_conserva_los_numeros():
+    valores = pd.Series([1.234, 1200, "1.234", "$ 2.500,5", None], dtype=object)
+    assert _a_numero(valores).tolist()[:4] == [1.234, 1_200, 1_234, 2_500.5]
+    assert pd.isna(_a_numero(valores).iloc[4])
+
+
+def test_ciudades_sin_tilde_se_unifican():
+    df = normalizar_historico(pd.DataFrame({
+        "Aspirantes": ["1.200", "800", "300", "500"],
+        "Valor total": ["$ 85.000.000", "$ 60.000.000", "$ 20.000.000", "$ 30.000.000"],
+        "Ciudad": ["Bogota", "BOGOTÁ D.C.", "Medellin", "Medellín"],
+    }))
+    assert sorted(df["Ciudad"].unique()) == ["Bogotá", "Medellín"]
+    assert df["Aspirantes"].max() == 1_200
+    assert df["Costo_Total"].max() == 85_000_000
+
+
+def test_cargar_historico_devuelve_copia(tmp_path, monkeypatch):
+    monkeypatch.setattr(historico_costos, "RUTA_CACHE", str(tmp_path / "cache"))
+    libro = Workbook()
+    libro.active.append(["Aspirantes", "Valor total", "Ciudad"])
+    libro.active.append([1200, 85_000_000, "Bogotá"])
+    libro.save(tmp_path / "historico.xlsx")
+
+    df = cargar_historico(str(tmp_path / "historico.xlsx"))
+    df.loc[0, "Aspirantes"] = -1
+    assert cargar_historico(str(tmp_path / "historico.xlsx")).loc[0, "Aspirantes"] == 1_200
@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from intervalos_conformales import calibrar, cuantil_conformal, intervalo, intervalos_lote
+from modelo_parametrico import calcular_costo_dataframe
+
+
+def _historico(tamano, semilla):
+    """Concursos sintéticos cuyo costo real es el cotizado con un error relativo que depende de la ciudad."""
+    rng = np.random.default_rng(semilla)
+    df = pd.DataFrame({
+        "Aspirantes": rng.integers(20, 8_000, tamano),
+        "Ciudad": rng.choice(["Bogotá", "Cali", "Quibdó"], tamano, p=[.6, .38, .02]),
+        "Modalidad": rng.choice(["Escrita", "Virtual"], tamano),
+    })
+    cotizado = calcular_costo_dataframe(df)["Total"].to_numpy()
+    dispersion = df["Ciudad"].map({"Bogotá": 0.05, "Cali": 0.2, "Quibdó": 0.1}).to_numpy()
+    df["Costo_Total"] = cotizado * np.exp(rng.normal(0, dispersion))
+    return df, cotizado
+
+
+def test_cuantil_conformal():
+    assert cuantil_conformal(np.arange(1, 10), 0.9) == 9
+    assert cuantil_conformal(np.arange(1, 10), 0.5) == 5
+    assert cuantil_conformal(np.arange(1, 5), 0.9) == np.inf
+
+
+def test_cobertura_en_residuos_sinteticos():
+    calibracion = calibrar(_historico(20_000, 1)[0])
+    df, cotizado = _historico(40_000, 2)
+    real = df["Costo_Total"].to_numpy()
+    for nivel in calibracion["niveles"]:
+        inferior, superior = intervalos_lote(cotizado, df["Ciudad"], df["Modalidad"], calibracion, nivel)
+        cubierto = (inferior <= real) & (real <= superior)
+        assert cubierto.mean() == pytest.approx(nivel, abs=0.01)
+        # Estratificado: cada ciudad tiene su propia dispersión y aun así se cubre al nivel pedido
+        for ciudad in ("Bogotá", "Cali"):
+            assert cubierto[df["Ciudad"] == ciudad].mean() == pytest.approx(nivel, abs=0.03)
+
+
+def test_lote_igual_al_intervalo_individual():
+    calibracion = calibrar(_historico(1_000, 3)[0])
+    costos = np.array([1e6, 5e7, 2e8, 3e8])
+    ciudades = pd.Categorical(["Bogotá", "Cali", "Quibdó", "Pasto"])
+    modalidades = ["Escrita", "Virtual", "Virtual", "Presencial"]
+    inferior, superior = intervalos_lote(costos, ciudades, modalidades, calibracion, 0.8)
+    esperado = [intervalo(c, ci, m, calibracion, 0.8) for c, ci, m in zip(costos, ciudades, modalidades)]
+    assert list(zip(inferior, superior)) == pytest.approx(esperado)
+
+
+def test_historico_insuficiente():
+    with pytest.raises(ValueError, match="no alcanza"):
+        calibrar(_historico(10, 4)[0])
+    with pytest.raises(ValueError, match="no calibrado"):
+        intervalo(1e6, "Bogotá", "Escrita", calibrar(_historico(200, 5)[0]), 0.99)
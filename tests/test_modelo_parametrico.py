@@ -0,0 +1,69 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from modelo_parametrico import (
+    CIUDADES, MODALIDADES, calcular_costo_dataframe, calcular_costo_lote, calcular_costo_parametrico,
+)
+from tarifario import obtener_tarifario, procesar_tarifario
+
+BASE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tarifas", "2025.1.json")
+
+
+def _tarifario_muchas_ciudades():
+    """Un factor propio por ciudad, para pasar por la codificación en lugar de las comparaciones directas."""
+    with open(BASE, encoding="utf-8") as f:
+        datos = json.load(f)
+    datos["transporte"]["factor_ciudad"] = {c: 1.0 + i / 10 for i, c in enumerate(CIUDADES)}
+    datos["transporte"]["factor_ciudad"]["San Andrés Isla"] = 3.5  # comparte los primeros caracteres
+    return procesar_tarifario(datos, huella="prueba")
+
+
+def _escenarios(tamano, semilla, max_aspirantes=20_000):
+    rng = np.random.default_rng(semilla)
+    ciudades = CIUDADES + ["Pasto", "Bogota", "San Andrés Isla"]  # incluye ciudades sin factor propio
+    return (rng.integers(1, max_aspirantes + 1, tamano), rng.choice(ciudades, tamano),
+            rng.choice(MODALIDADES, tamano))
+
+
+def _comparar(resultado, n, ciudad, tipo, tarifario):
+    for i in range(len(n)):
+        esperado = calcular_costo_parametrico(int(n[i]), str(ciudad[i]), str(tipo[i]), tarifario)
+        for grupo in ("logistica", "financiero"):
+            for clave, valor in esperado[grupo].items():
+                assert resultado[grupo][clave][i] == valor, (grupo, clave, n[i], ciudad[i], tipo[i])
+
+
+@pytest.mark.parametrize("tarifario", [None, "muchas"], ids=["vigente", "muchas_ciudades"])
+@pytest.mark.parametrize("tamano, max_aspirantes", [(3000, 20_000), (7, 2_000_000)], ids=["tabla", "directo"])
+@pytest.mark.parametrize("entrada", ["texto", "objeto", "categorical", "serie"])
+def test_lote_igual_al_calculo_escalar(tarifario, tamano, max_aspirantes, entrada):
+    tarifario = _tarifario_muchas_ciudades() if tarifario == "muchas" else obtener_tarifario()
+    n, ciudad, tipo = _escenarios(tamano, semilla=tamano, max_aspirantes=max_aspirantes)
+    convertir = {"texto": lambda x: x, "objeto": lambda x: x.astype(object), "categorical": pd.Categorical,
+                 "serie": lambda x: pd.Series(x, dtype="str")}[entrada]
+    _comparar(calcular_costo_lote(n, convertir(ciudad), convertir(tipo), tarifario), n, ciudad, tipo, tarifario)
+
+
+def test_escalares_difundidos_y_dataframe():
+    tarifario = _tarifario_muchas_ciudades()
+    n, ciudad, tipo = _escenarios(2000, semilla=7)
+    _comparar(calcular_costo_lote(n, "Quibdó", "Virtual", tarifario), n, ["Quibdó"] * len(n), ["Virtual"] * len(n),
+              tarifario)
+    df = calcular_costo_dataframe(pd.DataFrame({"Aspirantes": n, "Ciudad": ciudad, "Modalidad": tipo}),
+                                  tarifario=tarifario)
+    esperado = [calcular_costo_parametrico(int(a), c, t, tarifario)["financiero"]["Total"]
+                for a, c, t in zip(n, ciudad, tipo)]
+    assert df["Total"].tolist() == esperado
+
+
+def test_texto_mas_corto_que_una_ciudad_no_la_confunde():
+    # '<U4' truncaría "Cali" solo si fuera más larga; "Barr" no debe tomar el factor de "Barranquilla".
+    tarifario = _tarifario_muchas_ciudades()
+    ciudad = np.array(["Barr", "Cali", "Pas"] * 10)
+    factor = calcular_costo_lote(np.full(len(ciudad), 600), ciudad, "Escrita", tarifario)["financiero"]["Logística"]
+    esperado = [calcular_costo_parametrico(600, c, "Escrita", tarifario)["financiero"]["Logística"] for c in ciudad]
+    assert factor.tolist() == esperado
@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from modelo_parametrico import calcular_costo_parametrico
+from portafolio_concursos import calcular_portafolio
+
+
+def _portafolio(tamano, semilla):
+    rng = np.random.default_rng(semilla)
+    fechas = pd.to_datetime(["2025-03-02", "2025-03-09", "2025-04-06"])
+    return pd.DataFrame({
+        "Fecha": rng.choice(fechas, tamano),
+        "Ciudad": rng.choice(["Bogotá", "Cali", "Quibdó"], tamano),
+        "Modalidad": rng.choice(["Escrita", "Virtual"], tamano),
+        "Aspirantes": rng.integers(1, 6_000, tamano),
+    })
+
+
+def _por_separado(df):
+    return np.array([calcular_costo_parametrico(int(n), c, t)["financiero"]["Total"]
+                     for n, c, t in zip(df["Aspirantes"], df["Ciudad"], df["Modalidad"])])
+
+
+@pytest.mark.parametrize("semilla", range(5))
+def test_totales_contra_concursos_cotizados_por_separado(semilla):
+    df = _portafolio(40, semilla)
+    resultado = calcular_portafolio(df)
+    separado = _por_separado(df)
+    concursos, grupos = resultado["concursos"], resultado["grupos"]
+
+    assert concursos["Total"].to_numpy() == pytest.approx(separado, rel=1e-12)
+    assert resultado["costo_separado"] == pytest.approx(separado.sum(), rel=1e-12)
+    assert resultado["costo_conjunto"] == pytest.approx(concursos["Total Conjunto"].sum(), rel=1e-12)
+    assert resultado["ahorro"] == pytest.approx(resultado["costo_separado"] - resultado["costo_conjunto"])
+    # Compartir sitios nunca cuesta más que cotizar cada grupo por separado
+    assert (grupos["Costo Conjunto"] <= grupos["Costo Separado"] + 1e-6).all()
+    assert (grupos["Sitios Conjuntos"] <= grupos["Sitios Separados"]).all()
+    assert grupos["Concursos"].sum() == len(df) and grupos["Aspirantes"].sum() == df["Aspirantes"].sum()
+
+
+def test_grupo_de_un_concurso_cuesta_lo_mismo_que_la_cotizacion_individual():
+    df = _portafolio(12, 0).assign(Fecha=pd.date_range("2025-01-01", periods=12))
+    concursos = calcular_portafolio(df)["concursos"]
+    assert concursos["Total Conjunto"].to_numpy() == pytest.approx(_por_separado(df), rel=1e-12)
+    assert concursos["Ahorro"].abs().max() < 1e-6
+
+
+def test_concursos_sin_fecha_no_comparten_sitio():
+    df = pd.DataFrame({"Fecha": [pd.NaT, pd.NaT], "Ciudad": ["Cali", "Cali"], "Modalidad": ["Escrita"] * 2,
+                       "Aspirantes": [30, 30]})
+    resultado = calcular_portafolio(df)
+    assert len(resultado["grupos"]) == 2
+    assert resultado["ahorro"] == pytest.approx(0)
+
+
+def test_mismo_dia_y_ciudad_comparte_sitio():
+    df = pd.DataFrame({"Fecha": ["2025-03-02"] * 2, "Ciudad": ["Cali"] * 2, "Modalidad": ["Escrita"] * 2,
+                       "Aspirantes": [30, 30]})
+    grupos = calcular_portafolio(df)["grupos"]
+    assert grupos["Sitios Separados"].tolist() == [2] and grupos["Sitios Conjuntos"].tolist() == [1]
+    assert grupos["Ahorro"].iloc[0] > 0
@@ -0,0 +1,24 @@
+from indice_escalones import costo_total, max_aspirantes_presupuesto
+from modelo_parametrico import calcular_costo_parametrico
+from proyeccion_tarifas import indices_constantes, tarifario_proyectado
+from tarifario import obtener_tarifario
+
+
+def test_tarifario_proyectado_no_reutiliza_el_indice_del_base():
+    base = obtener_tarifario("2025.1")
+    costo_base = costo_total(5000, "Cali", "Escrita", base)  # llena la caché del índice con el tarifario base
+
+    proyectado = tarifario_proyectado(base, 2030, indices_constantes(2026, 5))
+    assert proyectado["huella"] != base["huella"]
+    costo = costo_total(5000, "Cali", "Escrita", proyectado)
+    assert costo > costo_base
+    assert costo == calcular_costo_parametrico(5000, "Cali", "Escrita", proyectado)["financiero"]["Total"]
+    assert max_aspirantes_presupuesto(costo_base, "Cali", "Escrita", proyectado) < 5000
+
+
+def test_series_distintas_dan_huellas_distintas():
+    base = obtener_tarifario("2025.1")
+    bajo = tarifario_proyectado(base, 2030, indices_constantes(2026, 5, {"IPC": 0.03, "Salario Mínimo": 0.05}))
+    alto = tarifario_proyectado(base, 2030, indices_constantes(2026, 5))
+    assert bajo["huella"] != alto["huella"]
+    assert costo_total(5000, "Cali", "Escrita", bajo) < costo_total(5000, "Cali", "Escrita", alto)
@@ -0,0 +1,26 @@
+import numpy as np
+
+from modelo_parametrico import ASPIRANTES_POR_SITIO, calcular_costo_lote
+from regresion_segmentada import ajustar_segmentada
+from tarifario import obtener_tarifario
+
+
+def test_recupera_tramos_de_impresion_y_sitios_sin_ruido():
+    tarifario = obtener_tarifario("2025.1")
+    x = np.arange(1, 5001)
+    y = calcular_costo_lote(x, tarifario=tarifario)["financiero"]["Total"]
+    modelo = ajustar_segmentada(x, y, cortes_conocidos=tarifario["limites_impresion"] + 1)
+
+    tramos_impresion = (tarifario["limites_impresion"] + 1).tolist()
+    sitios = list(range(ASPIRANTES_POR_SITIO + 1, 5000, ASPIRANTES_POR_SITIO))
+    assert set(tramos_impresion) <= set(modelo["cortes"])
+    assert set(sitios) <= set(modelo["cortes"])
+
+
+def test_cortes_conocidos_en_la_rejilla_de_la_pestana():
+    tarifario = obtener_tarifario("2025.1")
+    x = np.arange(100, 5000, 50)
+    y = calcular_costo_lote(x, tarifario=tarifario)["financiero"]["Total"]
+    y = y * np.random.default_rng(2025).uniform(0.95, 1.05, len(x))
+    modelo = ajustar_segmentada(x, y, cortes_conocidos=tarifario["limites_impresion"] + 1)
+    assert {1050.0, 1550.0} <= set(modelo["cortes"])
@@ -0,0 +1,145 @@
+import numpy as np
+import pytest
+
+from rubricas import calificar, compilar_rubrica, vector_puntajes
+
+NIVELES_0_4 = {i: f"Nivel {i}" for i in range(5)}
+
+COMPONENTES = {
+    "C1": {"name": "Informe", "weight": 60, "criteria": [{"id": "A1", "weight": 25}, {"id": "A2", "weight": 35}]},
+    "C2": {"name": "Código", "weight": 40, "criteria": [{"id": "B1", "weight": 10}, {"id": "B2", "weight": 30}]},
+}
+PONDERACIONES = {
+    "Informe": {"ponderacion_total": 0.6, "criterios": {"1.1": {"ponderacion": 0.25}, "1.2": {"ponderacion": 0.35}}},
+    "Sustentación": {"ponderacion_total": 0.4, "criterios": {"2.1": {"ponderacion": 0.4}}},
+}
+PLANO = {"Problema": {"weight": 0.3, "levels": [1, 2, 3, 4, 5]},
+         "Método": {"weight": 0.45, "levels": [1, 2, 3, 4, 5]},
+         "Impacto": {"weight": 0.25, "levels": [1, 2, 3, 4, 5]}}
+PUNTOS = {
+    "Datos": {"puntos_componente": 40, "max_raw_score": 8,
+              "criterios": {"Fuentes": {"niveles": NIVELES_0_4}, "Limpieza": {"niveles": NIVELES_0_4}}},
+    "Modelo": {"puntos_componente": 60, "max_raw_score": 12,
+               "criterios": {c: {"niveles": NIVELES_0_4} for c in ("Ajuste", "Validación", "Supuestos")}},
+    "Vacía": {"puntos_componente": 0, "max_raw_score": 0, "criterios": {}},
+}
+NIVELES = {
+    "Documento": {"peso": 0.5, "criterios": {"Estructura": {"niveles": NIVELES_0_4},
+                                             "Redacción": {"niveles": NIVELES_0_4}}},
+    "Presentación Oral / Demostración": {"peso": 0.3, "opcional": True,
+                                          "criterios": {"Claridad": {"niveles": NIVELES_0_4}}},
+    "Contribución del Equipo": {"peso": 0.2, "opcional": True,
+                                "criterios": {"Roles": {"niveles": NIVELES_0_4}, "Bitácora": {"niveles": NIVELES_0_4}}},
+}
+SECCIONES = {"Introducción": ["Contexto", "Objetivos"], "Resultados": ["Tablas", "Análisis", "Discusión"]}
+PESOS_SECCIONES = {"Introducción": 0.35, "Resultados": 0.65}
+
+
+# Fórmulas originales de cada aplicación, con los mismos bucles
+def _componentes_original(puntajes):
+    total = 0
+    for datos in COMPONENTES.values():
+        total += sum(puntajes[c["id"]] / 5.0 * c["weight"] for c in datos["criteria"])
+    return total / 100.0 * 5.0
+
+
+def _ponderaciones_original(puntajes):
+    return sum(puntajes[c] * d["ponderacion"] for s in PONDERACIONES.values() for c, d in s["criterios"].items())
+
+
+def _plano_original(puntajes):
+    total = 0
+    for clave, item in PLANO.items():
+        total += (puntajes[clave] / 5) * (item["weight"] * 100)
+    return total
+
+
+def _puntos_original(puntajes):
+    total = 0
+    for seccion, detalles in PUNTOS.items():
+        crudo = sum(puntajes[seccion][c] for c in detalles["criterios"] if puntajes[seccion][c] is not None)
+        maximo = detalles["max_raw_score"]
+        total += (crudo / maximo) * detalles["puntos_componente"] if maximo > 0 else 0
+    return total
+
+
+def _niveles_original(puntajes, activas):
+    ponderada, peso_efectivo = 0, 0
+    for seccion, detalles in NIVELES.items():
+        if not activas[seccion]:
+            continue
+        obtenido = maximo = 0
+        for criterio in detalles["criterios"]:
+            if puntajes[seccion][criterio] is not None:
+                obtenido += puntajes[seccion][criterio]
+                maximo += 4
+        ponderada += (obtenido / maximo if maximo > 0 else 0) * detalles["peso"]
+        peso_efectivo += detalles["peso"]
+    return ponderada / peso_efectivo * 100 if peso_efectivo > 0 else 0
+
+
+def _secciones_original(puntajes):
+    total = 0
+    for seccion, criterios in SECCIONES.items():
+        evaluados = [puntajes[seccion][c] for c in criterios if puntajes[seccion][c] is not None]
+        total += (sum(evaluados) / len(evaluados) if evaluados else 0.0) * PESOS_SECCIONES[seccion]
+    return total
+
+
+def _o_none(rng, valor):
+    return None if rng.random() < 0.25 else valor
+
+
+CASOS = {
+    "componentes": (COMPONENTES, None, lambda rng: {c["id"]: round(rng.uniform(0, 5), 1)
+                                                    for d in COMPONENTES.values() for c in d["criteria"]},
+                    _componentes_original),
+    "ponderaciones": (PONDERACIONES, None, lambda rng: {c: round(rng.uniform(0, 5), 1)
+                                                        for s in PONDERACIONES.values() for c in s["criterios"]},
+                      _ponderaciones_original),
+    "plano": (PLANO, None, lambda rng: {c: int(rng.integers(1, 6)) for c in PLANO}, _plano_original),
+    "puntos": (PUNTOS, None, lambda rng: {s: {c: _o_none(rng, int(rng.integers(0, 5))) for c in d["criterios"]}
+                                          for s, d in PUNTOS.items()}, _puntos_original),
+    "secciones": (SECCIONES, PESOS_SECCIONES,
+                  lambda rng: {s: {c: _o_none(rng, int(rng.integers(0, 101))) for c in criterios}
+                               for s, criterios in SECCIONES.items()}, _secciones_original),
+}
+
+
+@pytest.mark.parametrize("esquema", list(CASOS))
+def test_esquema_igual_a_la_formula_original(esquema):
+    rubrica, pesos, generar, original = CASOS[esquema]
+    compilada = compilar_rubrica(rubrica, pesos)
+    assert compilada["esquema"] == esquema
+    rng = np.random.default_rng(0)
+    evaluaciones = [generar(rng) for _ in range(200)]
+    lote = np.array([vector_puntajes(compilada, e) for e in evaluaciones])
+    finales = calificar(compilada, lote)["final"]
+    for evaluacion, vector, final in zip(evaluaciones, lote, finales):
+        assert calificar(compilada, vector)["final"] == pytest.approx(original(evaluacion), abs=1e-12)
+        assert final == pytest.approx(original(evaluacion), abs=1e-12)
+
+
+def test_niveles_con_secciones_opcionales():
+    compilada = compilar_rubrica(NIVELES)
+    assert compilada["esquema"] == "niveles"
+    rng = np.random.default_rng(1)
+    for _ in range(200):
+        puntajes = {s: {c: _o_none(rng, int(rng.integers(0, 5))) for c in d["criterios"]} for s, d in NIVELES.items()}
+        activas = {s: not d.get("opcional") or rng.random() < 0.6 for s, d in NIVELES.items()}
+        resultado = calificar(compilada, vector_puntajes(compilada, puntajes), list(activas.values()))
+        assert resultado["final"] == pytest.approx(_niveles_original(puntajes, activas), abs=1e-12)
+
+
+def test_secciones_sin_calificar_y_todo_na():
+    compilada = compilar_rubrica(SECCIONES, PESOS_SECCIONES)
+    puntajes = {"Introducción": {"Contexto": None, "Objetivos": None},
+                "Resultados": {"Tablas": 80, "Análisis": None, "Discusión": 60}}
+    resultado = calificar(compilada, vector_puntajes(compilada, puntajes))
+    assert resultado["calificados"].tolist() == [0, 2]
+    assert resultado["final"] == pytest.approx(70 * 0.65)
+
+
+def test_esquema_desconocido():
+    with pytest.raises(ValueError, match="Esquema de rúbrica desconocido"):
+        compilar_rubrica({"X": {"otra": 1}})
@@ -0,0 +1,88 @@
+import asyncio
+import contextlib
+import http.client
+import json
+import socket
+import threading
+import time
+
+import pytest
+
+from modelo_parametrico import calcular_costo_parametrico
+from servicio_cotizaciones import atender, servir, socket_escucha
+
+
+@pytest.fixture
+def servicio():
+    """Servicio en un hilo aparte, con conexiones ociosas cerradas a los 0.5 s."""
+    escucha = socket_escucha("127.0.0.1", 0)
+    bucle = asyncio.new_event_loop()
+    listo = threading.Event()
+    tarea = bucle.create_task(servir(escucha, inactividad=0.5, listo=listo))
+
+    def atender_hasta_cancelar():
+        with contextlib.suppress(asyncio.CancelledError):
+            bucle.run_until_complete(tarea)
+
+    hilo = threading.Thread(target=atender_hasta_cancelar, daemon=True)
+    hilo.start()
+    listo.wait(5)
+    yield escucha.getsockname()[1]
+    bucle.call_soon_threadsafe(tarea.cancel)
+    hilo.join(5)
+    bucle.close()
+
+
+def _post(puerto, cuerpo):
+    conexion = http.client.HTTPConnection("127.0.0.1", puerto, timeout=5)
+    conexion.request("POST", "/cotizar", cuerpo, {"Content-Type": "application/json"})
+    respuesta = conexion.getresponse()
+    resultado = respuesta.status, json.loads(respuesta.read())
+    conexion.close()
+    return resultado
+
+
+@pytest.mark.parametrize("cuerpo, mensaje", [
+    ({"cotizaciones": [1]}, r"cotizaciones\[0\]: Cada solicitud debe ser un objeto JSON"),
+    ({"aspirantes": 5, "tarifario": {}}, "'tarifario' debe ser el nombre de una versión"),
+    ({"aspirantes": 5, "tarifario": "no-existe"}, "^Versión de tarifario desconocida: no-existe$"),
+    ({"aspirantes": 1200.9}, "'aspirantes' debe ser un entero: 1200.9"),
+    ({"aspirantes": True}, "no un booleano"),
+    ({"aspirantes": "abc"}, "^'aspirantes' debe ser un entero: 'abc'$"),
+    ({"aspirantes": 0}, "mayor que cero"),
+    ({"ciudad": "Cali"}, "Falta el campo 'aspirantes'"),
+    ({"aspirantes": 5, "ciudad": ["Cali"]}, "'ciudad' debe ser un texto"),
+    ({"aspirantes": 5, "modalidad": {}}, "Modalidad desconocida"),
+    ([{"aspirantes": 5}], "El cuerpo debe ser un objeto JSON"),
+])
+def test_cuerpos_invalidos_dan_error_legible(cuerpo, mensaje):
+    with pytest.raises(ValueError, match=mensaje):
+        atender(cuerpo)
+
+
+def test_cotizacion_igual_al_motor():
+    for n in (1, 25, 26, 1000, 1001, 1200, 49_999):
+        esperado = calcular_costo_parametrico(n, "Cali", "Virtual")
+        for cuerpo in ({"aspirantes": n, "ciudad": "Cali", "modalidad": "Virtual"},
+                       {"aspirantes": float(n), "ciudad": "Cali", "modalidad": "Virtual"},
+                       {"aspirantes": str(n), "ciudad": "Cali", "modalidad": "Virtual"}):
+            assert atender(cuerpo) == esperado
+
+
+@pytest.mark.parametrize("cuerpo", ['{"cotizaciones":[1]}', '{"aspirantes":5,"tarifario":{}}',
+                                    '{"aspirantes":1200.9}', '{"aspirantes":true}', "no es json", b"\xff"])
+def test_http_responde_400_a_cuerpos_invalidos(servicio, cuerpo):
+    estado, contenido = _post(servicio, cuerpo)
+    assert estado == 400 and contenido["error"]
+
+
+def test_http_conexiones_ociosas_no_bloquean_y_se_cierran(servicio):
+    ociosas = [socket.create_connection(("127.0.0.1", servicio)) for _ in range(20)]
+    estado, contenido = _post(servicio, '{"aspirantes": 30, "ciudad": "Cali"}')
+    assert estado == 200 and contenido == calcular_costo_parametrico(30, "Cali", "Escrita")
+
+    time.sleep(1.0)
+    for conexion in ociosas:
+        conexion.settimeout(2)
+        assert conexion.recv(1) == b""
+        conexion.close()
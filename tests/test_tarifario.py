@@ -0,0 +1,40 @@
+import json
+import os
+import shutil
+
+import pytest
+
+import tarifario
+from tarifario import obtener_tarifario, procesar_tarifario
+
+BASE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tarifas", "2025.1.json")
+
+
+@pytest.fixture
+def carpeta(tmp_path, monkeypatch):
+    shutil.copy(BASE, tmp_path / "2025.1.json")
+    monkeypatch.setattr(tarifario, "RUTA_TARIFAS", str(tmp_path))
+    monkeypatch.setitem(tarifario._estado, "revisado", float("-inf"))
+    return tmp_path
+
+
+def test_archivo_danado_conserva_la_ultima_version_valida(carpeta, caplog):
+    valido = obtener_tarifario("2025.1")
+    datos = json.loads((carpeta / "2025.1.json").read_text(encoding="utf-8"))
+    (carpeta / "2025.1.json").write_text(json.dumps(datos)[:200], encoding="utf-8")  # escritura a medias
+    (carpeta / "2026.1.json").write_text("{", encoding="utf-8")
+    os.utime(carpeta / "2025.1.json", ns=(1, 1))
+
+    tarifario._revisar_carpeta(forzar=True)
+    assert obtener_tarifario() is valido
+    assert "Tarifario inválido" in caplog.text
+
+
+def test_precios_con_decimales_se_rechazan():
+    with open(BASE, encoding="utf-8") as f:
+        datos = json.load(f)
+    datos["precios"]["Delegado"] = 1234.9
+    with pytest.raises(ValueError, match="enteros"):
+        procesar_tarifario(datos)
+    datos["precios"]["Delegado"] = 1234.0
+    assert procesar_tarifario(datos)["precio"]["Delegado"] == 1234